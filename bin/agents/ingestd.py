@@ -8,7 +8,6 @@ Extracts agent data from cache directory files.
 
 # Standard libraries
 import sys
-import time
 
 # Infoset libraries
 try:
@@ -17,7 +16,10 @@ except:
     print('You need to set your PYTHONPATH to include the infoset library')
     sys.exit(2)
 from infoset.cache import cache
+from infoset.cache import workers
+from infoset.cache import watch
 from infoset.utils import hidden
+from infoset.utils import jm_configuration
 
 
 class PollingAgent(object):
@@ -72,10 +74,24 @@ class PollingAgent(object):
             None
 
         """
+        # Start the long running ingest workers. This is done here,
+        # after the daemon has forked, so that the workers are children
+        # of the daemon process.
+        pool = workers.ShardedPool()
+        pool.start()
+
+        # Watch the cache directory for new files
+        config = jm_configuration.Config()
+        watcher = watch.Watcher(config.ingest_cache_directory())
+
         # Do the daemon thing
         while True:
-            cache.process(self.agent_name)
-            time.sleep(5)
+            cache.process(
+                self.agent_name, pool=pool, filenames=watcher.filenames())
+
+            # Wait for new files. Files left behind by failed ingests
+            # are retried at least every 5 seconds.
+            watcher.wait(5)
 
             # Update the PID file timestamp (important)
             update = hidden.Touch()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""Infoset data summary daemon.
+
+Summarizes ingested data into hourly and daily tables, and manages the
+partitions of the data table.
+
+"""
+
+# Standard libraries
+import sys
+from time import sleep
+
+# Infoset libraries
+try:
+    from infoset.agents import agent as Agent
+except:
+    print('You need to set your PYTHONPATH to include the infoset library')
+    sys.exit(2)
+from infoset.db import db_rollup
+from infoset.db import db_partition
+from infoset.utils import hidden
+
+
+class PollingAgent(object):
+    """Infoset agent that summarizes data.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        populate:
+        post:
+    """
+
+    def __init__(self):
+        """Method initializing the class.
+
+        Args:
+            config_dir: Configuration directory
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.agent_name = 'rollupd'
+
+    def name(self):
+        """Return agent name.
+
+        Args:
+            None
+
+        Returns:
+            value: Name of agent
+
+        """
+        # Return
+        value = self.agent_name
+        return value
+
+    def query(self):
+        """Summarize new data.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Do the daemon thing
+        while True:
+            # Create future partitions and drop expired ones
+            db_partition.maintain()
+
+            # Keep going until there is nothing left to summarize
+            while db_rollup.process() > 0:
+                # Update the PID file timestamp (important)
+                update = hidden.Touch()
+                update.pid(self.name())
+
+            # Update the PID file timestamp (important)
+            update = hidden.Touch()
+            update.pid(self.name())
+
+            # Summaries are hourly. Check for new data every 5 minutes.
+            sleep(300)
+
+
+def main():
+    """Process agent data.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Get configuration
+    cli = Agent.AgentCLI()
+    poller = PollingAgent()
+
+    # Do control
+    cli.control(poller)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ Extracts agent data from cache directory files.
 
 # Standard libraries
 import sys
+import asyncio
 from collections import defaultdict
 from time import sleep
 
@@ -20,10 +21,10 @@ from infoset.utils import jm_configuration
 from infoset.utils import jm_general
 from infoset.utils import log
 from infoset.utils import hidden
-from infoset.db import db_oid
 from infoset.db import db_host
 from infoset.db import db_hostoid
 from infoset.snmp import snmp_manager
+from infoset.snmp import snmp_async
 
 
 class PollingAgent(object):
@@ -105,6 +106,12 @@ class PollingAgent(object):
         # Initialize key variables
         pollers = []
 
+        # Query hosts concurrently from a single thread if possible
+        if snmp_async.available() is True:
+            engine = snmp_async.Engine()
+        else:
+            engine = None
+
         # Create a list of polling objects
         hostnames = self.config.agent_hostnames()
 
@@ -120,12 +127,17 @@ class PollingAgent(object):
                 continue
 
             # Add poller
-            poller = Poller(hostname, self.agent_name)
+            poller = Poller(hostname, self.agent_name, engine=engine)
             pollers.append(poller)
 
-        # Start threaded polling
+        # Start polling
         if bool(pollers) is True:
-            Agent.threads(self.agent_name, pollers)
+            if engine is None:
+                Agent.threads(self.agent_name, pollers)
+            else:
+                Agent.coroutines(self.agent_name, pollers)
+        if engine is not None:
+            engine.close()
 
 
 class Poller(object):
@@ -139,16 +151,17 @@ class Poller(object):
 
     Functions:
         __init__:
-        populate:
-        post:
+        query:
+        query_async:
     """
 
-    def __init__(self, hostname, agent_name):
+    def __init__(self, hostname, agent_name, engine=None):
         """Method initializing the class.
 
         Args:
             hostname: Hostname to poll
             agent_name: Name of agent
+            engine: snmp_async.Engine object used by query_async
 
         Returns:
             None
@@ -157,6 +170,7 @@ class Poller(object):
         # Initialize key variables
         self.agent_name = agent_name
         self.hostname = hostname
+        self.engine = engine
 
         # Get configuration
         config = jm_configuration.ConfigAgent(self.agent_name)
@@ -165,12 +179,10 @@ class Poller(object):
         self.agent = Agent.Agent(config, hostname)
 
         # Get snmp configuration information from infoset
-        snmp_config = jm_configuration.ConfigSNMP()
-        validate = snmp_manager.Validate(hostname, snmp_config.snmp_auth())
-        self.snmp_params = validate.credentials()
+        self.snmp_config = jm_configuration.ConfigSNMP()
 
     def query(self):
-        """Query all remote hosts for data.
+        """Query the host for data.
 
         Args:
             None
@@ -179,44 +191,94 @@ class Poller(object):
             None
 
         """
-        # Check SNMP supported
-        if bool(self.snmp_params) is True:
-            # Get datapoints
-            self._datapoints()
+        try:
+            # Check SNMP supported
+            validate = snmp_manager.Validate(
+                self.hostname, self.snmp_config.snmp_auth())
+            snmp_params = validate.credentials()
+            if bool(snmp_params) is False:
+                return
 
-    def _datapoints(self):
-        """Create the master dictionary for the host.
+            # Walk the columns of each table, stopping at the first failure
+            master = self._master()
+            snmp_object = snmp_manager.Interact(snmp_params)
+            tables = {}
+            for labels_oid in master.keys():
+                tables[labels_oid] = snmp_object.walk_columns(
+                    _columns(master, labels_oid), safe=True)
+                if bool(tables[labels_oid]) is False:
+                    break
+        finally:
+            # Close the SNMP sessions opened by this poll
+            snmp_manager.close()
+
+        # Post data
+        if self._datapoints(master, tables) is True:
+            self.agent.post()
+
+    async def query_async(self):
+        """Query the host for data concurrently with other hosts.
 
         Args:
             None
+
         Returns:
-            value: Index value
+            None
 
         """
-        # Initialize key variables
-        snmp_params = self.snmp_params
+        # Check SNMP supported
+        validate = snmp_async.Validate(
+            self.hostname, self.snmp_config.snmp_auth(), self.engine)
+        snmp_params = await validate.credentials()
+        if bool(snmp_params) is False:
+            return
+
+        # Walk the columns of each table
         master = self._master()
+        snmp_object = snmp_async.Interact(snmp_params, self.engine)
+        labels_oids = list(master.keys())
+        results = await asyncio.gather(*[
+            snmp_object.walk_columns(
+                _columns(master, labels_oid), safe=True)
+            for labels_oid in labels_oids])
+        tables = dict(zip(labels_oids, results))
+
+        # Post data without blocking the event loop
+        if self._datapoints(master, tables) is True:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.agent.post)
+
+    def _datapoints(self, master, tables):
+        """Add the datapoints of the host to the agent.
+
+        Args:
+            master: Master dictionary
+            tables: Dict of the rows of the columns walked for each
+                labels OID, keyed by labels OID
+
+        Returns:
+            success: True if all the OIDs were walked
 
-        # Get sources
-        snmp_object = snmp_manager.Interact(snmp_params)
+        """
         for labels_oid in master.keys():
-            sources = {}
-            oid_results = snmp_object.swalk(labels_oid)
+            rows = tables.get(labels_oid)
 
             # Return if there is an error
-            if bool(oid_results) is False:
+            if bool(rows) is False:
                 log_message = (
                     'Failed to contact SNMP host %s. '
                     'Will collect data on next poll.'
                     '') % (self.hostname)
                 log.log2warn(1024, log_message)
-                return
+                return False
 
-            for key, value in oid_results.items():
-                sources[_index(labels_oid, key)] = jm_general.decode(value)
+            # Get sources
+            sources = {}
+            for index, values in rows.items():
+                if labels_oid in values:
+                    sources[index] = jm_general.decode(values[labels_oid])
 
-        # Get values
-        for labels_oid in master.keys():
+            # Get values
             for agent_label in master[labels_oid].keys():
                 # Initialize datapoints
                 datapoints = defaultdict(lambda: defaultdict(dict))
@@ -226,31 +288,27 @@ class Poller(object):
                 base_type = master[labels_oid][agent_label]['base_type']
                 multiplier = master[labels_oid][agent_label]['multiplier']
 
-                # Get OID values
-                values = {}
-                oid_results = snmp_object.swalk(values_oid)
-
                 # Return if there is an error
+                oid_results = {
+                    index: values[values_oid]
+                    for index, values in rows.items() if values_oid in values}
                 if bool(oid_results) is False:
                     log_message = (
                         'Failed to contact SNMP host %s. '
                         'Will collect data on next poll.'
                         '') % (self.hostname)
                     log.log2warn(1022, log_message)
-                    return
+                    return False
 
                 # Only process floating point values
-                for key, value in oid_results.items():
+                data = []
+                for index, value in oid_results.items():
                     try:
                         _ = float(value)
                     except:
                         continue
-                    values[_index(labels_oid, key)] = value * multiplier
-
-                # Create list of data for json
-                data = []
-                for index, value in values.items():
-                    data.append([index, value, sources[index]])
+                    data.append(
+                        [_index(index), value * multiplier, sources[index]])
 
                 # Finish up dict for json
                 datapoints[agent_label]['data'] = data
@@ -259,77 +317,66 @@ class Poller(object):
                 # Populate agent
                 self.agent.populate(datapoints)
 
-        # Post data
-        self.agent.post()
+        # Return
+        return True
 
     def _master(self):
-        """Create the master dictionary for the host.
+        """Get the master dictionary for the host.
 
         Args:
             None
 
         Returns:
-            master: Master dictionary
+            master: Master dictionary. The cached poll plan of the host,
+                which is shared and must not be modified.
 
         """
-        # Initialize key variables
-        hostname = self.hostname
-        master = defaultdict(lambda: defaultdict(dict))
-
-        # Get all oid IDX values tied to the hostname
-        idx_host = db_host.GetHost(hostname).idx()
-        oid_indices = db_hostoid.oid_indices(idx_host)
-
-        # Get OID metadata
-        for idx_oid in oid_indices:
-            oid_object = db_oid.GetIDX(idx_oid)
-
-            # Assign OIDs for values to the OID that
-            # will be used to label the results
-            labels_oid = oid_object.oid_labels()
-            values_oid = oid_object.oid_values()
-            agent_label = oid_object.agent_label()
-            base_type = oid_object.base_type()
-            multiplier = oid_object.multiplier()
-
-            # Stuff to do
-            master[labels_oid][agent_label]['values_oid'] = values_oid
-            master[labels_oid][agent_label]['base_type'] = base_type
-            master[labels_oid][agent_label]['multiplier'] = multiplier
-
         # Return
+        master = db_hostoid.oid_plan(self.hostname)
         return master
 
 
-def _index(labels_oid, oid):
-    """Find the index value of an OID.
+def _columns(master, labels_oid):
+    """Get the columns to walk for a labels OID.
 
     Args:
+        master: Master dictionary
         labels_oid: OID used for labels
-        oid: OID value
 
     Returns:
-        value: Index value
+        oids: List of OIDs. The labels OID comes first.
 
     """
     # Initialize key variables
-    value = None
+    oids = [labels_oid]
 
-    # Get all the nodes in the oids
-    nodes_label = labels_oid.split('.')
-    nodes_oid = oid.split('.')
+    # Add the values OIDs
+    for agent_label in master[labels_oid].keys():
+        values_oid = master[labels_oid][agent_label]['values_oid']
+        if values_oid not in oids:
+            oids.append(values_oid)
 
-    # Calculate the difference in lenth in terms of OID nodes
-    nodes_in_index = len(nodes_oid) - len(nodes_label)
+    # Return
+    return oids
 
-    # Calculate what the index should be
-    value_nodes = nodes_oid[-nodes_in_index:]
-    if nodes_in_index == 1:
-        value = int(value_nodes[0])
-    else:
-        value = '.'.join(value_nodes)
 
+def _index(index):
+    """Convert the index of a table row.
+
+    Args:
+        index: Index of the row, which is the part of the OID of a value
+            that follows the OID of its column
+
+    Returns:
+        value: Integer if the index has a single node, otherwise the
+            index itself
+
+    """
     # Return
+    if '.' in index:
+        value = index
+    else:
+        value = int(index)
     return value
 
 
@@ -21,6 +21,7 @@ from infoset.utils import jm_general
 from infoset.utils import log
 from infoset.snmp import snmp_info
 from infoset.snmp import snmp_manager
+from infoset.snmp import snmp_async
 
 
 class PollingAgent(object):
@@ -116,11 +117,28 @@ class PollingAgent(object):
         # Create a list of polling objects
         hostnames = self.agent_config.agent_hostnames()
 
+        # Find the SNMP credentials of all hosts concurrently if possible.
+        # Otherwise each poller finds them when it runs.
+        if snmp_async.available() is True:
+            credentials = snmp_async.credentials(hostnames, self.snmp_config)
+        else:
+            credentials = None
+
         for hostname in hostnames:
+            # Skip hosts that are known to be uncontactable
+            if credentials is None:
+                snmp_params = None
+            else:
+                snmp_params = credentials[hostname]
+                if bool(snmp_params) is False:
+                    _uncontactable(hostname)
+                    continue
+
             # Add poller
             poller = Poller(
                 hostname, self.agent_config,
-                self.server_config, self.snmp_config)
+                self.server_config, self.snmp_config,
+                snmp_params=snmp_params)
             pollers.append(poller)
 
         # Start threaded polling
@@ -143,13 +161,18 @@ class Poller(object):
         post:
     """
 
-    def __init__(self, hostname, agent_config, server_config, snmp_config):
+    def __init__(
+            self, hostname, agent_config, server_config, snmp_config,
+            snmp_params=None):
         """Method initializing the class.
 
         Args:
             hostname: Hostname to poll
-            agent_name: Name of agent
-            perm_dir: Directory where permanent YAML files should reside.
+            agent_config: ConfigAgent object
+            server_config: Config object
+            snmp_config: ConfigSNMP object
+            snmp_params: SNMP credentials of the host. They are found
+                when the host is queried if None.
 
         Returns:
             None
@@ -159,15 +182,12 @@ class Poller(object):
         self.agent_name = agent_config.agent_name()
         self.hostname = hostname
         self.server_config = server_config
+        self.snmp_config = snmp_config
+        self.snmp_params = snmp_params
 
         # Initialize key variables
         self.agent = Agent.Agent(agent_config, hostname)
 
-        # Get snmp configuration information from infoset
-        validate = snmp_manager.Validate(hostname, snmp_config.snmp_auth())
-        self.snmp_params = validate.credentials()
-        self.snmp_object = snmp_manager.Interact(self.snmp_params)
-
     def query(self):
         """Query all remote hosts for data.
 
@@ -178,15 +198,23 @@ class Poller(object):
             None
 
         """
-        # Check SNMP supported
-        if bool(self.snmp_params) is True:
-            # Get datapoints
-            self._create_yaml()
-        else:
-            log_message = (
-                'Uncontactable host %s or no valid SNMP '
-                'credentials found for it.') % (self.hostname)
-            log.log2quiet(1021, log_message)
+        try:
+            # Get snmp configuration information from infoset
+            if self.snmp_params is None:
+                validate = snmp_manager.Validate(
+                    self.hostname, self.snmp_config.snmp_auth())
+                self.snmp_params = validate.credentials()
+
+            # Check SNMP supported
+            if bool(self.snmp_params) is True:
+                # Get datapoints
+                self.snmp_object = snmp_manager.Interact(self.snmp_params)
+                self._create_yaml()
+            else:
+                _uncontactable(self.hostname)
+        finally:
+            # Close the SNMP sessions opened by this poll
+            snmp_manager.close()
 
     def _create_yaml(self):
         """Create the master dictionary for the host.
@@ -228,6 +256,23 @@ class Poller(object):
         os.rmdir(temp_dir)
 
 
+def _uncontactable(hostname):
+    """Log that a host could not be queried.
+
+    Args:
+        hostname: Hostname
+
+    Returns:
+        None
+
+    """
+    # Log
+    log_message = (
+        'Uncontactable host %s or no valid SNMP '
+        'credentials found for it.') % (hostname)
+    log.log2quiet(1021, log_message)
+
+
 def main():
     """Start the infoset agent.
 
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Infoset ingest benchmark.
+
+Creates synthetic agent cache files and measures how fast they are
+ingested into an SQLite database standing in for MySQL.
+
+"""
+
+# Standard libraries
+import os
+import argparse
+import tempfile
+import textwrap
+
+# Infoset libraries
+from infoset.cache import benchmark
+
+
+def cli():
+    """Return all the CLI options.
+
+    Args:
+        None
+
+    Returns:
+        args: Namespace() containing all of our CLI arguments as objects
+
+    """
+    # Header for the help menu of the application
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter)
+
+    # Size of the synthetic data
+    parser.add_argument(
+        '--hosts', type=int, default=10,
+        help='Number of hosts. Default 10.')
+    parser.add_argument(
+        '--agents', type=int, default=1,
+        help='Number of agents per host. Default 1.')
+    parser.add_argument(
+        '--labels', type=int, default=10,
+        help='Number of chartable labels per agent. Default 10.')
+    parser.add_argument(
+        '--ports', type=int, default=48,
+        help='Number of datapoints per label. Default 48.')
+    parser.add_argument(
+        '--backlog', type=int, default=12,
+        help='Number of cache files per agent. Default 12.')
+
+    # Database
+    parser.add_argument(
+        '--database',
+        type=str,
+        default='sqlite://',
+        help=textwrap.fill(
+            'SQLalchemy URL of the SQLite database to use. '
+            'Default is an in memory database.', width=80)
+    )
+
+    # Get the parser value
+    args = parser.parse_args()
+
+    # Return
+    return args
+
+
+def main():
+    """Run the benchmark.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Process CLI
+    cli_args = cli()
+
+    # Setup database
+    benchmark.database(cli_args.database)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Create files
+        (files, _) = benchmark.generate(
+            directory, hosts=cli_args.hosts, agents=cli_args.agents,
+            labels=cli_args.labels, ports=cli_args.ports,
+            backlog=cli_args.backlog)
+        print(('Created %s cache files in %s') % (files, directory))
+
+        # Ingest them
+        results = benchmark.run(directory)
+
+        # Report files that were not ingested
+        remaining = len(os.listdir(directory))
+        if bool(remaining) is True:
+            print(('%s cache files were not ingested') % (remaining))
+
+    # Report
+    for line in benchmark.report(results):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
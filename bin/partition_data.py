@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Partition the infoset data table.
+
+Run once on installations created before the data table was partitioned.
+The table is rebuilt, which locks it until done. This can take a long
+time if it has a lot of data, so stop the ingester and agents first.
+
+"""
+
+# Standard libraries
+import argparse
+import sys
+
+# Infoset libraries
+from infoset.db import db_partition
+
+
+def cli():
+    """Return all the CLI options.
+
+    Args:
+        None
+
+    Returns:
+        args: Namespace() containing all of our CLI arguments as objects
+
+    """
+    # Header for the help menu of the application
+    parser = argparse.ArgumentParser(
+        description=(
+            'Partition the iset_data table by month. The table is rebuilt '
+            'and locked until done.'),
+        formatter_class=argparse.RawTextHelpFormatter)
+
+    # Get the parser value
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    """Partition the data table.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Process CLI
+    cli()
+
+    # Partition
+    if db_partition.maintain(partition=True) is False:
+        print('Partitioning failed. Check the infoset log file.')
+        sys.exit(2)
+    print('OK')
+
+
+if __name__ == "__main__":
+    main()
@@ -92,6 +92,7 @@ def main():
 
     # Get OIDs
     oids = db_oid.all_oids()
+    updated = False
 
     # Process each hostname
     for hostname in hostnames:
@@ -129,6 +130,11 @@ def main():
                         record = HostOID(idx_host=idx_host, idx_oid=idx_oid)
                         database = db.Database()
                         database.add(record, 1090)
+                        updated = True
+
+    # Make the snmp agent read the OIDs of its hosts again
+    if updated is True:
+        db_hostoid.invalidate()
 
 
 if __name__ == "__main__":
@@ -21,6 +21,7 @@ from random import random
 import argparse
 import queue as Queue
 import threading
+import asyncio
 from copy import deepcopy
 
 # pip3 libraries
@@ -275,8 +276,7 @@ class Agent(object):
                     self.cache_dir, timestamp, uid, hosthash)
 
                 # Save data
-                with open(filename, 'w') as f_handle:
-                    json.dump(data, f_handle)
+                jm_general.write_json(filename, data)
 
         # Define success
         if response is True:
@@ -311,10 +311,12 @@ class Agent(object):
         # Initialize key variables
         uid = self.data['uid']
 
-        # Add files in cache directory to list
+        # Add files in cache directory to list. Skip hidden temporary
+        # files that are still being written.
         filenames = [filename for filename in os.listdir(
             self.cache_dir) if os.path.isfile(
-                os.path.join(self.cache_dir, filename))]
+                os.path.join(self.cache_dir, filename)) and (
+                    filename.startswith('.') is False)]
 
         # Read cache file
         for filename in filenames:
@@ -669,22 +671,9 @@ def threads(agent_name, pollers):
     # Spawn processes only if we have files to process
     if bool(pollers) is True:
         # Process lock file
-        f_obj = hidden.File()
-        lockfile = f_obj.lock(agent_name)
-        if os.path.exists(lockfile) is True:
-            # Return if lock file is present
-            log_message = (
-                'Agent lock file %s exists. Multiple agent daemons '
-                'running or the daemon may have died '
-                'catastrophically in the past, in which case the lockfile '
-                'should be deleted. Exiting agent process. '
-                'Will try again later.'
-                '') % (lockfile)
-            log.log2warn(1044, log_message)
+        lockfile = _lock(agent_name)
+        if lockfile is None:
             return
-        else:
-            # Create lockfile
-            open(lockfile, 'a').close()
 
         # Spawn a pool of threads, and pass them queue instance
         for _ in range(
@@ -740,3 +729,113 @@ def threads(agent_name, pollers):
         # Return if lock file is present
         if os.path.exists(lockfile) is True:
             os.remove(lockfile)
+
+
+def coroutines(agent_name, pollers):
+    """Function where agents poll devices concurrently using asyncio.
+
+    Args:
+        agent_name: Agent name
+        pollers: List of polling objects with a query_async coroutine
+
+    Returns:
+        None
+
+    """
+    # Poll only if there are devices to poll
+    if bool(pollers) is True:
+        # Process lock file
+        lockfile = _lock(agent_name)
+        if lockfile is None:
+            return
+
+        # Poll from a new event loop
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            results = loop.run_until_complete(_gather(pollers))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+            # Remove the lock file
+            if os.path.exists(lockfile) is True:
+                os.remove(lockfile)
+
+        # Log failures
+        for poller, result in zip(pollers, results):
+            if isinstance(result, Exception) is True:
+                log_message = (
+                    'Agent "%s" failed to poll %s: %s'
+                    '') % (agent_name, poller.hostname, result)
+                log.log2warn(1138, log_message)
+
+
+async def _gather(pollers):
+    """Run the queries of pollers concurrently.
+
+    Args:
+        pollers: List of polling objects with a query_async coroutine
+
+    Returns:
+        results: List of the results of each query. Exceptions raised by
+            a query are returned as its result.
+
+    """
+    # Return
+    results = await asyncio.gather(
+        *[_query(poller) for poller in pollers],
+        return_exceptions=True)
+    return results
+
+
+async def _query(poller):
+    """Run the query of a poller without stopping the other pollers.
+
+    log.log2die() raises SystemExit, which asyncio.gather() doesn't
+    return as a result. It is converted so that only this poller stops.
+
+    Args:
+        poller: Polling object with a query_async coroutine
+
+    Returns:
+        result: Result of the query
+
+    """
+    # Return
+    try:
+        result = await poller.query_async()
+    except SystemExit as exception:
+        result = RuntimeError(
+            ('Fatal error, exit status %s') % (exception.code))
+    return result
+
+
+def _lock(agent_name):
+    """Create the lock file of an agent.
+
+    Args:
+        agent_name: Agent name
+
+    Returns:
+        lockfile: Name of the lock file. None if it already exists.
+
+    """
+    # Process lock file
+    f_obj = hidden.File()
+    lockfile = f_obj.lock(agent_name)
+    if os.path.exists(lockfile) is True:
+        # Return if lock file is present
+        log_message = (
+            'Agent lock file %s exists. Multiple agent daemons '
+            'running or the daemon may have died '
+            'catastrophically in the past, in which case the lockfile '
+            'should be deleted. Exiting agent process. '
+            'Will try again later.'
+            '') % (lockfile)
+        log.log2warn(1044, log_message)
+        return None
+
+    # Create lockfile
+    open(lockfile, 'a').close()
+    return lockfile
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+"""Measure the throughput of the ingester.
+
+Creates synthetic agent cache files and ingests them into an SQLite
+database that stands in for MySQL, timing each stage of the ingest.
+
+"""
+
+# Standard libraries
+import os
+import re
+import json
+import time
+import resource
+from collections import defaultdict
+
+# PIP libraries
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session
+from sqlalchemy.dialects.mysql import BIGINT
+from sqlalchemy.ext.compiler import compiles
+
+# Infoset libraries
+from infoset.db import db
+from infoset.db import db_orm
+from infoset.db import db_identity
+from infoset.utils import jm_configuration
+from infoset.utils import jm_general
+from infoset.cache import cache
+from infoset.cache import drain
+
+# Functions whose duration is reported, keyed by stage name
+STAGES = [
+    ('drain', drain, 'Drain'),
+    ('insert_datapoints', cache, '_insert_datapoints'),
+    ('datapoints_by_did', cache, '_datapoints_by_did'),
+    ('update_chartable', cache.UpdateDB, '_update_chartable'),
+    ('update_unchartable', cache.UpdateDB, '_update_unchartable'),
+    ('update_agent', cache, '_update_agent_last_update'),
+    ('update_host_agent', cache, '_host_agent_last_update'),
+    ('purge', drain.Drain, 'purge')
+]
+
+
+@compiles(BIGINT, 'sqlite')
+def _compile_bigint(element, compiler, **kwargs):
+    """Create SQLite BIGINT columns as INTEGER so they can autoincrement.
+
+    Args:
+        element: Column type
+        compiler: SQL compiler
+        kwargs: Keyword arguments
+
+    Returns:
+        result: SQL type
+
+    """
+    # Return
+    result = 'INTEGER'
+    return result
+
+
+def generate(
+        directory, hosts=10, agents=1, labels=10, ports=48, backlog=12,
+        timestamp=None):
+    """Create synthetic agent cache files.
+
+    Args:
+        directory: Directory in which to create files
+        hosts: Number of hosts
+        agents: Number of agents per host
+        labels: Number of chartable labels per agent
+        ports: Number of datapoints per label
+        backlog: Number of files per agent, 300 seconds apart
+        timestamp: Timestamp of the newest file. Now if None.
+
+    Returns:
+        result: Tuple of (files, datapoints) created
+
+    """
+    # Initialize key variables
+    files = 0
+    datapoints = 0
+    base_types = [1, 32, 64]
+    newest = jm_general.normalized_timestamp(timestamp)
+
+    # Create files
+    for host in range(hosts):
+        hostname = ('host%05d.example.org') % (host)
+        host_hash = jm_general.hashstring(hostname, sha=1)
+        for agent in range(agents):
+            agent_name = ('agent%02d') % (agent)
+            uid = jm_general.hashstring(
+                ('%s%s') % (hostname, agent_name))
+
+            for step in range(backlog):
+                stamp = newest - (backlog - step - 1) * 300
+                data = {
+                    'timestamp': stamp,
+                    'uid': uid,
+                    'agent': agent_name,
+                    'hostname': hostname,
+                    'chartable': {},
+                    'other': {}
+                }
+
+                # Counters grow with time. Gauges vary with the port.
+                for label in range(labels):
+                    base_type = base_types[label % len(base_types)]
+                    values = []
+                    for port in range(ports):
+                        if base_type == 1:
+                            value = (port * 7 + step) % 100
+                        else:
+                            value = (port + 1) * 1000 * (step + 1)
+                        values.append([port, value, ('port%s') % (port)])
+                    data['chartable'][('label%03d') % (label)] = {
+                        'base_type': base_type,
+                        'description': ('Label %s') % (label),
+                        'data': values}
+
+                # Add a description per port as non chartable data
+                data['other']['description'] = {
+                    'base_type': None,
+                    'description': 'Port description',
+                    'data': [
+                        [port, ('Port %s') % (port), ('port%s') % (port)]
+                        for port in range(ports)]}
+
+                # Write file
+                filepath = ('%s/%s_%s_%s.json') % (
+                    directory, stamp, uid, host_hash)
+                jm_general.write_json(filepath, data)
+                files += 1
+                datapoints += (labels + 1) * ports
+
+    # Return
+    result = (files, datapoints)
+    return result
+
+
+def database(url='sqlite://'):
+    """Use an SQLite database instead of the configured MySQL database.
+
+    Args:
+        url: SQLalchemy URL of the SQLite database
+
+    Returns:
+        None
+
+    """
+    # SQLite can't update timestamps automatically
+    for table in db_orm.BASE.metadata.tables.values():
+        for column in table.columns:
+            if column.name in ['ts_modified', 'ts_created']:
+                column.server_default = None
+
+    # Create tables
+    engine = create_engine(url)
+    db_orm.BASE.metadata.create_all(engine)
+
+    # Replace the pool used by all database objects
+    db.POOL = scoped_session(sessionmaker(bind=engine))
+    db_identity.invalidate()
+
+
+def run(directory):
+    """Ingest the cache files in a directory, one UID at a time.
+
+    Args:
+        directory: Directory with cache files
+
+    Returns:
+        results: Dict of results
+
+    """
+    # Initialize key variables
+    config = jm_configuration.Config()
+    uid_metadata = defaultdict(list)
+    stages = defaultdict(float)
+    originals = []
+    regex = re.compile(r'^\d+_[0-9a-f]+_[0-9a-f]+.json')
+
+    # Get files per UID
+    files = 0
+    for filename in sorted(os.listdir(directory)):
+        if bool(regex.match(filename)) is False:
+            continue
+        (tstamp, uid, _) = filename.split('.')[0].split('_')
+        filepath = os.path.join(directory, filename)
+        uid_metadata[uid].append((int(tstamp), filepath, None))
+        files += 1
+
+    # Count datapoints before the files are purged
+    datapoints = 0
+    for metadata in uid_metadata.values():
+        for (_, filepath, _) in metadata:
+            with open(filepath, 'r') as f_handle:
+                data = json.load(f_handle)
+            for data_type in ['chartable', 'other']:
+                for group in data.get(data_type, {}).values():
+                    datapoints += len(group['data'])
+
+    # Start without cached DIDs and database indexes
+    drain._DID_CACHE.clear()
+    db_identity.invalidate()
+
+    # Time the stages
+    for (stage, parent, name) in STAGES:
+        function = getattr(parent, name)
+        originals.append((parent, name, function))
+        setattr(parent, name, _timer(stages, stage, function))
+
+    # Ingest
+    try:
+        ts_start = time.time()
+        for metadata in uid_metadata.values():
+            data = cache.ProcessUID(config, metadata)
+            data.process()
+        duration = time.time() - ts_start
+    finally:
+        for (parent, name, function) in originals:
+            setattr(parent, name, function)
+
+    # Return
+    results = {
+        'files': files,
+        'datapoints': datapoints,
+        'duration': duration,
+        'files_per_second': files / max(duration, 0.000001),
+        'datapoints_per_second': datapoints / max(duration, 0.000001),
+        'stages': dict(stages),
+        'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+    return results
+
+
+def report(results):
+    """Create a report of the results of run().
+
+    Args:
+        results: Dict of results
+
+    Returns:
+        lines: List of lines of text
+
+    """
+    # Initialize key variables
+    lines = []
+
+    # Summary
+    lines.append(('Files:            %s') % (results['files']))
+    lines.append(('Datapoints:       %s') % (results['datapoints']))
+    lines.append(('Duration:         %.3f s') % (results['duration']))
+    lines.append(
+        ('Files/s:          %.1f') % (results['files_per_second']))
+    lines.append(
+        ('Datapoints/s:     %.1f') % (results['datapoints_per_second']))
+    lines.append(('Peak RSS:         %s KB') % (results['peak_rss']))
+
+    # Stages
+    lines.append('Stages:')
+    for (stage, _, _) in STAGES:
+        duration = results['stages'].get(stage, 0)
+        lines.append(('    %-20s %.3f s') % (stage, duration))
+
+    # Return
+    return lines
+
+
+def _timer(stages, stage, function):
+    """Wrap a function to add its duration to a stage.
+
+    Args:
+        stages: Dict of total durations keyed by stage
+        stage: Name of stage
+        function: Function to wrap
+
+    Returns:
+        wrapper: Wrapped function
+
+    """
+    def wrapper(*args, **kwargs):
+        """Call the function and record its duration."""
+        ts_start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stages[stage] += time.time() - ts_start
+
+    # Return
+    return wrapper
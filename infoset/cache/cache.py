@@ -23,17 +23,23 @@ from infoset.db import db
 from infoset.db.db_orm import Data, Datapoint, Agent, Host, HostAgent
 from infoset.db import db_agent as agent
 from infoset.db import db_datapoint as dpoint
-from infoset.db import db_host as dhost
-from infoset.db import db_hostagent as hagent
+from infoset.db import db_identity as identity
 from infoset.utils import jm_configuration
 from infoset.utils import jm_general
 from infoset.utils import log
 from infoset.cache import drain
+from infoset.cache import watch
+from infoset.cache import spool
+from infoset.cache import validate
 from infoset.utils import hidden
 
 # Define a key global variable
 THREAD_QUEUE = Queue.Queue()
 
+# Number of datapoints read from a UID's cache files before they are
+# written to the database
+INGEST_BATCH_SIZE = 100000
+
 
 class ProcessUID(object):
     """Threaded ingestion of agent files.
@@ -51,36 +57,39 @@ class ProcessUID(object):
     def process(self):
         """Update the database using threads."""
         # Initialize key variables
-        updated = False
-        hostnames = []
-        uids = []
+        uid = None
         ingests = []
-        agent_names = []
-        agent_data = {
-            'hostname': None,
-            'uid': None,
-            'sources': [],
-            'chartable': [],
-            'unchartable': []
-        }
+        datapoints = 0
+        ingested = {}
 
         # Get the data_dict
         metadata = self.metadata
         config = self.config
 
-        # Initialize other values
-        max_timestamp = 0
-
         # Get start time for activity
         start_ts = time.time()
 
-        # Sort metadata by timestamp
-        metadata.sort()
+        # Sort metadata by timestamp. Spooled data dicts can't be compared
+        metadata.sort(key=lambda item: (item[0], item[1]))
 
         # Process file for each timestamp, starting from the oldes file
-        for (timestamp, filepath) in metadata:
+        for (timestamp, filepath, data) in metadata:
+            # Spooled records are read again until all the records read
+            # with them are ingested. Quietly skip those already ingested.
+            if data is not None:
+                key = (data['uid'], data['hostname'])
+                if key not in ingested:
+                    ingested[key] = validate.ingested_timestamp(*key)
+                if (ingested[key] is not None) and (
+                        timestamp <= ingested[key]):
+                    log_message = (
+                        'Spooled data %s was already ingested. Skipping.'
+                        '') % (filepath)
+                    log.log2quiet(1141, log_message)
+                    continue
+
             # Read in data
-            ingest = drain.Drain(filepath)
+            ingest = drain.Drain(filepath, data=data)
 
             # Make sure file is OK
             # Move it to a directory for further analysis
@@ -90,88 +99,61 @@ class ProcessUID(object):
                     'Cache ingest file %s is invalid. Moving.'
                     '') % (filepath)
                 log.log2warn(1054, log_message)
-                shutil.copy(
-                    filepath, config.ingest_failures_directory())
-                os.remove(filepath)
+                if data is None:
+                    shutil.copy(
+                        filepath, config.ingest_failures_directory())
+                    os.remove(filepath)
+                else:
+                    jm_general.write_json(os.path.join(
+                        config.ingest_failures_directory(),
+                        os.path.basename(filepath)), data)
                 continue
 
             # Append data
-            agent_data['chartable'].extend(ingest.chartable())
-            agent_data['unchartable'].extend(ingest.other())
-            agent_data['sources'].extend(ingest.sources())
-            hostnames.append(ingest.hostname())
-            uids.append(ingest.uid())
+            uid = ingest.uid()
             ingests.append(ingest)
-            agent_names.append(ingest.agent())
-
-            # Purge source file
-            # ingest.purge()
+            datapoints += len(ingest.chartable()) + len(ingest.other())
 
-            # Get the max timestamp
-            max_timestamp = max(timestamp, max_timestamp)
-
-            # Update update flag
-            updated = True
-
-        # Verify that we have only processed data for the same hostname
-        # UID and agent name
-        if (jm_general.all_same(hostnames) is False) or (
-                jm_general.all_same(uids) is False) or (
-                    jm_general.all_same(agent_names) is False):
-            log_message = (
-                'Cache ingest files error for hostname %s,'
-                'agent name %s, UID %s.'
-                '') % (hostnames[0], agent_names[0], uids[0])
-            log.log2quiet(1083, log_message)
+            # Update the database once enough data has been read so that
+            # UIDs with large backlogs of cache files don't have to be
+            # held in memory all at once
+            if datapoints >= INGEST_BATCH_SIZE:
+                _update(config, ingests)
+                ingests = []
+                datapoints = 0
 
         # Process the rest
-        if updated is True:
-            # Update remaining agent data
-            agent_data['hostname'] = hostnames[0]
-            agent_data['uid'] = uids[0]
-            agent_data['agent_name'] = agent_names[0]
-
-            # Update database
-            dbase = UpdateDB(agent_data)
-            dbase.update()
-
-            # Update the last time the agent was contacted
-            _update_agent_last_update(agent_data['uid'], max_timestamp)
-
-            # Update the host / agent table timestamp if
-            # hostname was processed
-            _host_agent_last_update(
-                agent_data['hostname'], agent_data['uid'], max_timestamp)
-
-            # Purge source files. Only done after complete
-            # success of database updates. If not we could lose data in the
-            # event of an ingester crash. Ingester would re-read the files
-            # and process the non-duplicates, while deleting the duplicates.
-            for ingest in ingests:
-                ingest.purge()
-
-            # Log duration of activity
+        if bool(ingests) is True:
+            _update(config, ingests)
+
+        # Log duration of activity
+        if uid is not None:
             duration = time.time() - start_ts
             log_message = (
                 'UID %s was processed in %s seconds.'
-                '') % (agent_data['uid'], duration)
+                '') % (uid, duration)
             log.log2quiet(1127, log_message)
 
 
 class UpdateDB(object):
     """Update database with agent data."""
 
-    def __init__(self, agent_data):
+    def __init__(self, agent_data, config=None):
         """Instantiate the class.
 
         Args:
             agent_data: Agent data obtained from Drain object
+            config: Configuration object. Read if None.
 
         Returns:
             None
 
         """
         self.agent_data = agent_data
+        if config is None:
+            self.config = jm_configuration.Config()
+        else:
+            self.config = config
 
     def update(self):
         """Update the database.
@@ -199,17 +181,11 @@ class UpdateDB(object):
             idx_agent = agent_object.idx()
 
             # Get idx of host
-            host_info = dhost.GetHost(hostname)
-            idx_host = host_info.idx()
+            idx_host = identity.idx_host(hostname)
 
             # Update datapoint metadata if not there
-            for source in self.agent_data['sources']:
-                did = source[1]
-
-                # We need the host that the data was generated for
-                # and the agent that got the data
-                if dpoint.did_exists(did) is False:
-                    _insert_datapoint(source, idx_agent, idx_host)
+            _insert_datapoints(
+                self.agent_data['sources'], idx_agent, idx_host)
 
             # Create map of DIDs to database row index values
             mapping = _datapoints_by_did(idx_agent)
@@ -233,7 +209,7 @@ class UpdateDB(object):
         agent_name = self.agent_data['agent_name']
 
         # Return if agent already exists in the table
-        if agent.uid_exists(uid) is True:
+        if identity.idx_agent(uid) is not None:
             return
 
         # Prepare SQL query to read a record from the database.
@@ -258,22 +234,21 @@ class UpdateDB(object):
         hostname = self.agent_data['hostname']
 
         # Update Host table
-        if dhost.hostname_exists(hostname) is False:
+        idx_host = identity.idx_host(hostname)
+        if idx_host is None:
             # Add to Host table
             record = Host(hostname=jm_general.encode(hostname))
             database = db.Database()
             database.add(record, 1080)
 
-        # Get idx of host
-        host_info = dhost.GetHost(hostname)
-        idx_host = host_info.idx()
+            # Get idx of host
+            idx_host = identity.idx_host(hostname)
 
         # Get idx of agent
-        uid_info = agent.GetUID(uid)
-        idx_agent = uid_info.idx()
+        idx_agent = identity.idx_agent(uid)
 
         # Update HostAgent table
-        if hagent.host_agent_exists(idx_host, idx_agent) is False:
+        if identity.host_agent_last_timestamp(idx_host, idx_agent) is None:
             # Add to HostAgent table
             record = HostAgent(idx_host=idx_host, idx_agent=idx_agent)
             database = db.Database()
@@ -305,13 +280,10 @@ class UpdateDB(object):
             # Only update with data collected after
             # the most recent DID update. Don't do anything more
             if timestamp > last_timestamp:
-                data_list.append(
-                    Data(
-                        idx_datapoint=idx_datapoint,
-                        value=value,
-                        timestamp=timestamp
-                    )
-                )
+                data_list.append({
+                    'idx_datapoint': idx_datapoint,
+                    'value': value,
+                    'timestamp': timestamp})
 
                 # Update DID's last updated timestamp
                 if idx_datapoint in timestamp_tracker:
@@ -322,28 +294,25 @@ class UpdateDB(object):
 
         # Update if there is data
         if bool(data_list) is True:
-            # Do performance data update
+            # Do performance data update. Values already in the database
+            # are skipped instead of failing the whole update.
             database = db.Database()
-            success = database.add_all(data_list, 1056, die=False)
+            if self.config.ingest_load_data() is True:
+                success = database.load_data(
+                    Data.__table__, data_list, 1056, die=False)
+            else:
+                success = database.insert_ignore(
+                    Data.__table__, data_list, 1056, die=False,
+                    chunk_size=self.config.ingest_chunk_size())
 
             # Change the last updated timestamp
             if success is True:
-                # Create a database session
-                # NOTE: We only do a single commit on the session.
-                # This is much faster (20x based on testing) than
-                # instantiating the database, updating records, and committing
-                # after every iteration of the "for loop"
+                # Update all the datapoints using as few UPDATE
+                # statements as possible instead of one per datapoint
                 database = db.Database()
-                session = database.session()
-
-                # Update the session
-                for idx_datapoint, last_timestamp in timestamp_tracker.items():
-                    data_dict = {'last_timestamp': last_timestamp}
-                    session.query(Datapoint).filter(
-                        Datapoint.idx == idx_datapoint).update(data_dict)
-
-                # Commit the session
-                database.commit(session, 1057)
+                database.update_many(
+                    Datapoint.__table__, 'idx',
+                    {'last_timestamp': timestamp_tracker}, 1057)
 
                 # Report success
                 log_message = (
@@ -363,7 +332,7 @@ class UpdateDB(object):
         """
         # Initialize key variables
         data = self.agent_data['unchartable']
-        data_list = []
+        value_tracker = {}
         timestamp_tracker = {}
 
         # Update data
@@ -376,9 +345,8 @@ class UpdateDB(object):
             # Only update with data collected after
             # the most recent update. Don't do anything more
             if timestamp > last_timestamp:
-                data_list.append(
-                    (idx_datapoint, value)
-                )
+                # Values from newer files overwrite older ones
+                value_tracker[idx_datapoint] = jm_general.encode(value)
 
                 # Update DID's last updated timestamp
                 if idx_datapoint in timestamp_tracker:
@@ -388,30 +356,14 @@ class UpdateDB(object):
                     timestamp_tracker[idx_datapoint] = timestamp
 
         # Update if there is data
-        if bool(data_list) is True:
-            # Create a database session
-            # NOTE: We only do a single commit on the session.
-            # This is much faster (20x based on testing) than
-            # instantiating the database, updating records, and committing
-            # after every iteration of the "for loop"
+        if bool(value_tracker) is True:
+            # Update uncharted data and the last updated timestamp
+            # of all the datapoints in the same UPDATE statements
             database = db.Database()
-            session = database.session()
-
-            # Update uncharted data
-            for item in data_list:
-                (idx_datapoint, value) = item
-                data_dict = {'uncharted_value': jm_general.encode(value)}
-                session.query(Datapoint).filter(
-                    Datapoint.idx == idx_datapoint).update(data_dict)
-
-            # Change the last updated timestamp
-            for idx_datapoint, last_timestamp in timestamp_tracker.items():
-                data_dict = {'last_timestamp': last_timestamp}
-                session.query(Datapoint).filter(
-                    Datapoint.idx == idx_datapoint).update(data_dict)
-
-            # Commit data
-            database.commit(session, 1128)
+            database.update_many(
+                Datapoint.__table__, 'idx',
+                {'uncharted_value': value_tracker,
+                 'last_timestamp': timestamp_tracker}, 1128)
 
             # Report success
             log_message = (
@@ -420,12 +372,84 @@ class UpdateDB(object):
             log.log2quiet(1045, log_message)
 
 
-def _insert_datapoint(metadata, idx_agent, idx_host):
-    """Insert new datapoint into database.
+def _update(config, ingests):
+    """Update the database with the data of valid cache files of a UID.
 
     Args:
-        metadata: Tuple of datapoint metadata.
-            (uid, did, label, source, description)
+        config: Configuration object
+        ingests: List of drain.Drain objects, oldest first
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    hostnames = []
+    uids = []
+    agent_names = []
+    max_timestamp = 0
+    agent_data = {
+        'hostname': None,
+        'uid': None,
+        'sources': [],
+        'chartable': [],
+        'unchartable': []
+    }
+
+    # Append data
+    for ingest in ingests:
+        agent_data['chartable'].extend(ingest.chartable())
+        agent_data['unchartable'].extend(ingest.other())
+        agent_data['sources'].extend(ingest.sources())
+        hostnames.append(ingest.hostname())
+        uids.append(ingest.uid())
+        agent_names.append(ingest.agent())
+
+        # Get the max timestamp
+        max_timestamp = max(ingest.timestamp(), max_timestamp)
+
+    # Verify that we have only processed data for the same hostname
+    # UID and agent name
+    if (jm_general.all_same(hostnames) is False) or (
+            jm_general.all_same(uids) is False) or (
+                jm_general.all_same(agent_names) is False):
+        log_message = (
+            'Cache ingest files error for hostname %s,'
+            'agent name %s, UID %s.'
+            '') % (hostnames[0], agent_names[0], uids[0])
+        log.log2quiet(1083, log_message)
+
+    # Update remaining agent data
+    agent_data['hostname'] = hostnames[0]
+    agent_data['uid'] = uids[0]
+    agent_data['agent_name'] = agent_names[0]
+
+    # Update database
+    dbase = UpdateDB(agent_data, config=config)
+    dbase.update()
+
+    # Update the last time the agent was contacted
+    _update_agent_last_update(agent_data['uid'], max_timestamp)
+
+    # Update the host / agent table timestamp if
+    # hostname was processed
+    _host_agent_last_update(
+        agent_data['hostname'], agent_data['uid'], max_timestamp)
+
+    # Purge source files. Only done after complete
+    # success of database updates. If not we could lose data in the
+    # event of an ingester crash. Ingester would re-read the files
+    # and process the non-duplicates, while deleting the duplicates.
+    for ingest in ingests:
+        ingest.purge()
+
+
+def _insert_datapoints(sources, idx_agent, idx_host):
+    """Insert new datapoints into database.
+
+    Args:
+        sources: List of tuples of datapoint metadata.
+            (uid, did, label, source, description, base_type)
             uid: Agent UID
             did: Datapoint ID
             label: Datapoint label created by agent
@@ -440,18 +464,35 @@ def _insert_datapoint(metadata, idx_agent, idx_host):
 
     """
     # Initialize key variables
-    (_, did, agent_label, agent_source, _, base_type) = metadata
-
-    # Insert record
-    record = Datapoint(
-        id=jm_general.encode(did),
-        idx_agent=idx_agent,
-        idx_host=idx_host,
-        agent_label=jm_general.encode(agent_label),
-        agent_source=jm_general.encode(agent_source),
-        base_type=base_type)
-    database = db.Database()
-    database.add(record, 1082)
+    data_list = []
+    metadata = {}
+
+    # Only keep a single entry per DID. The same DIDs appear in
+    # every cache file read for the UID
+    for source in sources:
+        metadata[source[1]] = source
+
+    # Find the DIDs already in the database using a single query
+    found = dpoint.dids_exist(list(metadata.keys()))
+
+    # Create rows for the DIDs not yet in the database
+    for did, source in sorted(metadata.items()):
+        if did in found:
+            continue
+        (_, _, agent_label, agent_source, _, base_type) = source
+        data_list.append({
+            'id': jm_general.encode(did),
+            'idx_agent': idx_agent,
+            'idx_host': idx_host,
+            'agent_label': jm_general.encode(agent_label),
+            'agent_source': jm_general.encode(agent_source),
+            'base_type': base_type})
+
+    # Insert all the new datapoints with a single statement.
+    # Rows added by another ingester in the meantime are skipped.
+    if bool(data_list) is True:
+        database = db.Database()
+        database.insert_ignore(Datapoint.__table__, data_list, 1082)
 
 
 def _datapoints_by_did(idx_agent):
@@ -507,8 +548,8 @@ def _host_agent_last_update(hostname, uid, last_timestamp):
 
     """
     # Initialize key variables
-    idx_agent = agent.GetUID(uid).idx()
-    idx_host = dhost.GetHost(hostname).idx()
+    idx_agent = identity.idx_agent(uid)
+    idx_host = identity.idx_host(hostname)
 
     # Update database
     database = db.Database()
@@ -520,6 +561,9 @@ def _host_agent_last_update(hostname, uid, last_timestamp):
     record.last_timestamp = last_timestamp
     database.commit(session, 1124)
 
+    # Keep the cached value in step with the database
+    identity.update_host_agent(idx_host, idx_agent, last_timestamp)
+
 
 def _update_agent_last_update(uid, last_timestamp):
     """Insert new datapoint into database.
@@ -544,14 +588,16 @@ def _update_agent_last_update(uid, last_timestamp):
     database.commit(session, 1055)
 
 
-def validate_cache_files():
+def validate_cache_files(filenames=None):
     """Method initializing the class.
 
     Args:
-        agent_name: agent name
+        filenames: List of filenames in the cache directory. The
+            directory is read if None.
 
     Returns:
-        None
+        uid_metadata: Dict of lists of (timestamp, filepath, None) tuples
+            keyed by [hosthash][uid]
 
     """
     # Initialize key variables
@@ -566,9 +612,10 @@ def validate_cache_files():
     regex = re.compile(r'^\d+_[0-9a-f]+_[0-9a-f]+.json')
 
     # Add files in cache directory to list
-    all_filenames = [filename for filename in os.listdir(
-        cache_dir) if os.path.isfile(
-            os.path.join(cache_dir, filename))]
+    if filenames is None:
+        all_filenames = watch.scan(cache_dir)
+    else:
+        all_filenames = filenames
 
     ######################################################################
     # Create threads
@@ -578,15 +625,11 @@ def validate_cache_files():
     for filename in all_filenames:
         # Add valid data to lists
         if bool(regex.match(filename)) is True:
-            # Create a complete filepath
+            # Create a complete filepath.
+            # Files are written atomically (jm_general.write_json), so
+            # they are complete as soon as they appear under this name.
             filepath = os.path.join(cache_dir, filename)
 
-            # Only read files that are 15 seconds or older
-            # to prevent corruption caused by reading a file that could be
-            # updating simultaneously
-            if time.time() - os.path.getmtime(filepath) < 15:
-                continue
-
             # Create a dict of UIDs, timestamps and filepaths
             (name, _) = filename.split('.')
             (tstamp, uid, hosthash) = name.split('_')
@@ -595,14 +638,60 @@ def validate_cache_files():
             # Keep track of hosts and the UIDs that track them
             # Create a list of timestamp, host filepath tuples for each UID
             if bool(uid_metadata[hosthash][uid]) is True:
-                uid_metadata[hosthash][uid].append((timestamp, filepath))
+                uid_metadata[hosthash][uid].append((timestamp, filepath, None))
             else:
-                uid_metadata[hosthash][uid] = [(timestamp, filepath)]
+                uid_metadata[hosthash][uid] = [(timestamp, filepath, None)]
 
     # Return
     return uid_metadata
 
 
+def validate_spool(uid_metadata, records):
+    """Add agent data read from the ingest spool to the files to process.
+
+    Args:
+        uid_metadata: Output of validate_cache_files()
+        records: List of (segment, offset, data) tuples from
+            spool.Spool.read()
+
+    Returns:
+        None
+
+    """
+    # Configuration setup
+    config = jm_configuration.Config()
+    cache_dir = config.ingest_cache_directory()
+
+    # Process records
+    for (_, _, data) in records:
+        # Skip the corrupted parts of segments
+        if data is None:
+            continue
+
+        # Give the data the filename it would have had as a cache file.
+        # Validation will reject data without these keys.
+        try:
+            filepath = spool.cache_filepath(cache_dir, data)
+            hosthash = jm_general.hashstring(data['hostname'], sha=1)
+            timestamp = int(data['timestamp'])
+            uid = data['uid']
+        except (AttributeError, KeyError, TypeError, ValueError):
+            log_message = (
+                'Ingest spool record is missing its primary keys. Moving.')
+            log.log2warn(1133, log_message)
+            filename = ('spool_%s.json') % (
+                jm_general.hashstring(str(data)))
+            jm_general.write_json(os.path.join(
+                config.ingest_failures_directory(), filename), data)
+            continue
+
+        # Add to the list of data for the UID
+        if bool(uid_metadata[hosthash][uid]) is True:
+            uid_metadata[hosthash][uid].append((timestamp, filepath, data))
+        else:
+            uid_metadata[hosthash][uid] = [(timestamp, filepath, data)]
+
+
 def _wrapper_process(argument_list):
     """Wrapper function to unpack arguments before calling the real function.
 
@@ -632,11 +721,16 @@ def _process(config, metadata):
     data.process()
 
 
-def process(agent_name):
+def process(agent_name, pool=None, filenames=None):
     """Method initializing the class.
 
     Args:
         agent_name: agent name
+        pool: workers.ShardedPool object of long running ingest workers.
+            A new multiprocessing Pool is created for the files
+            found if None.
+        filenames: List of filenames in the cache directory. The
+            directory is read if None.
 
     Returns:
         None
@@ -644,6 +738,8 @@ def process(agent_name):
     """
     # Initialize key variables
     argument_list = []
+    records = []
+    success = True
     uid_metadata = defaultdict(lambda: defaultdict(dict))
 
     # Configuration setup
@@ -660,7 +756,13 @@ def process(agent_name):
         return
 
     # Get meta data on files
-    uid_metadata = validate_cache_files()
+    uid_metadata = validate_cache_files(filenames=filenames)
+
+    # Add data from the spool
+    if config.ingest_spool() is True:
+        records_spool = spool.Spool(config.ingest_spool_directory())
+        records = records_spool.read()
+        validate_spool(uid_metadata, records)
 
     # Spawn processes only if we have files to process
     if bool(uid_metadata.keys()) is True:
@@ -682,26 +784,33 @@ def process(agent_name):
             # Create lockfile
             open(lockfile, 'a').close()
 
-        # Read each cache file
-        for hosthash in uid_metadata.keys():
-            for uid in uid_metadata[hosthash].keys():
-                # Create a list of arguments to process
-                argument_list.append(
-                    (config, uid_metadata[hosthash][uid])
-                )
-
-        # Create a pool of sub process resources
-        with Pool(processes=threads_in_pool) as pool:
+        if pool is not None:
+            # Hand the files to the long running workers
+            success = pool.process(uid_metadata)
+        else:
+            # Read each cache file
+            for hosthash in uid_metadata.keys():
+                for uid in uid_metadata[hosthash].keys():
+                    # Create a list of arguments to process
+                    argument_list.append(
+                        (config, uid_metadata[hosthash][uid])
+                    )
 
-            # Create sub processes from the pool
-            pool.map(_wrapper_process, argument_list)
+            # Create a pool of sub process resources
+            with Pool(processes=threads_in_pool) as sub_pool:
 
-        # Wait for all the processes to end
-        # pool.join()
+                # Create sub processes from the pool
+                sub_pool.map(_wrapper_process, argument_list)
 
         # Return if lock file is present
         if os.path.exists(lockfile) is True:
             os.remove(lockfile)
 
+    # Spooled data is only discarded after all of it has been ingested.
+    # If not, it is read again and the records already ingested are
+    # skipped by ProcessUID.
+    if (bool(records) is True) and (success is True):
+        records_spool.commit(records)
+
 if __name__ == "__main__":
         process('ingestd')
@@ -8,13 +8,18 @@ This could be a modified to be a daemon
 
 # Standard libraries
 import os
+import hashlib
 from collections import defaultdict
+from collections import OrderedDict
 
 # Infoset libraries
 from infoset.utils import log
-from infoset.utils import jm_general
 from infoset.cache import validate
 
+# Maximum number of DIDs remembered by each ingest process
+DID_CACHE_SIZE = 200000
+_DID_CACHE = OrderedDict()
+
 
 class Drain(object):
     """Infoset class that ingests agent data.
@@ -31,11 +36,13 @@ class Drain(object):
         post:
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, data=None):
         """Method initializing the class.
 
         Args:
             filename: Cache filename
+            data: Dict of agent data read from the ingest spool. The data
+                is read from filename if None.
 
         Returns:
             None
@@ -43,6 +50,7 @@ class Drain(object):
         """
         # Initialize key variables
         self.filename = filename
+        self.spooled = data is not None
         self.data = defaultdict(lambda: defaultdict(dict))
         self.metadata = []
         self.validated = False
@@ -50,9 +58,10 @@ class Drain(object):
         data_types = ['chartable', 'other']
         agent_meta_keys = ['timestamp', 'uid', 'agent', 'hostname']
 
-        # Ingest data
-        validator = validate.ValidateCache(filename)
-        information = validator.getinfo()
+        # Ingest data. The datapoints are validated as they are read
+        # below, so the data is only walked once.
+        validator = validate.ValidateCache(filename, data=data)
+        information = validator.getinfo(datapoints=False)
 
         # Log if data is bad
         if information is False:
@@ -60,61 +69,87 @@ class Drain(object):
                 'Cache ingest file %s is invalid.') % (filename)
             log.log2warn(1051, log_message)
             return
-        else:
-            self.validated = True
-
-        if self.validated is True:
-            # Get universal parameters from file. Convert to unicode
-            for key in agent_meta_keys:
-                if key == 'timestamp':
-                    self.agent_meta[key] = int(information[key])
-                else:
-                    self.agent_meta[key] = information[key]
-            timestamp = self.agent_meta['timestamp']
-            uid = self.agent_meta['uid']
-
-            # Process chartable data
-            for data_type in data_types:
-                # Skip if data type isn't in the data
-                if data_type not in information:
-                    continue
-
-                # Process the data type
-                for label, group in sorted(
-                        information[data_type].items()):
-                    # Get universal parameters for group
-                    base_type = _base_type(group['base_type'])
-                    description = group['description']
-
-                    # Initialize base type
-                    if base_type not in self.data[data_type]:
-                        self.data[data_type][base_type] = []
-
-                    # Process data
-                    for datapoint in group['data']:
-                        index = datapoint[0]
-                        value = datapoint[1]
-                        source = datapoint[2]
-                        did = _did(
-                            uid, label, index,
-                            self.agent_meta['agent'],
-                            self.agent_meta['hostname'])
-
-                        # Update data
-                        if base_type != 0:
-                            self.data[data_type][base_type].append(
-                                (uid, did, value, timestamp)
-                            )
-                        else:
-                            self.data[data_type][base_type].append(
-                                (uid, did, value, timestamp)
-                            )
-
-                        # Update sources after fixing encoding
-                        self.metadata.append(
-                            (uid, did, label, source,
-                             description, base_type)
-                        )
+
+        # Get universal parameters from file. Convert to unicode
+        for key in agent_meta_keys:
+            if key == 'timestamp':
+                self.agent_meta[key] = int(information[key])
+            else:
+                self.agent_meta[key] = information[key]
+        timestamp = self.agent_meta['timestamp']
+        uid = self.agent_meta['uid']
+
+        # Process chartable data
+        for data_type in data_types:
+            # Skip if data type isn't in the data
+            if data_type not in information:
+                continue
+
+            # Process the data type
+            for label, group in sorted(
+                    information[data_type].items()):
+                # Validate the group before using it
+                if validate.check_group(data_type, group) is False:
+                    self._invalid()
+                    return
+
+                # Get universal parameters for group
+                base_type = _base_type(group['base_type'])
+                description = group['description']
+
+                # Initialize base type
+                if base_type not in self.data[data_type]:
+                    self.data[data_type][base_type] = []
+                datapoints = self.data[data_type][base_type]
+
+                # Validate the datapoints before using them
+                for datapoint in group['data']:
+                    if validate.check_datapoint(
+                            data_type, datapoint) is False:
+                        self._invalid()
+                        return
+
+                # Get the DIDs of the whole group at once
+                group_dids = dids(
+                    uid, label,
+                    [datapoint[0] for datapoint in group['data']],
+                    self.agent_meta['agent'],
+                    self.agent_meta['hostname'])
+
+                # Process data
+                for did, (_, value, source) in zip(
+                        group_dids, group['data']):
+                    # Update data
+                    datapoints.append((uid, did, value, timestamp))
+
+                    # Update sources after fixing encoding
+                    self.metadata.append(
+                        (uid, did, label, source,
+                         description, base_type)
+                    )
+
+        # All the data is valid
+        self.validated = True
+
+    def _invalid(self):
+        """Discard the data read when invalid data is found.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Discard data
+        self.data = defaultdict(lambda: defaultdict(dict))
+        self.metadata = []
+        self.validated = False
+
+        # Log
+        log_message = (
+            'Cache ingest file %s has invalid data.') % (self.filename)
+        log.log2warn(1143, log_message)
 
     def valid(self):
         """Determine whether data is valid.
@@ -354,6 +389,10 @@ class Drain(object):
         # Initialize key variables
         success = True
 
+        # Spooled data is removed when the spool is committed
+        if self.spooled is True:
+            return success
+
         try:
             os.remove(self.filename)
         except:
@@ -386,14 +425,59 @@ def _did(uid, label, index, agent_name, hostname):
     Returns:
         did: Datapoint ID
 
+    """
+    # Return
+    did = dids(uid, label, [index], agent_name, hostname)[0]
+    return did
+
+
+def dids(uid, label, indexes, agent_name, hostname):
+    """Create the DIDs of all the datapoints of a label group.
+
+    An agent reports the same datapoints every time it polls, so DIDs
+    are remembered instead of being hashed again for every cache file.
+
+    Args:
+        uid: UID of device that created the cache data file
+        label: Label of the data
+        indexes: List of indexes of the data
+        agent_name: Name of agent
+        hostname: Hostname
+
+    Returns:
+        result: List of datapoint IDs in the same order as indexes
+
     """
     # Initialize key variables
-    prehash = ('%s%s%s%s%s') % (uid, label, index, agent_name, hostname)
-    result = jm_general.hashstring(prehash)
-    did = result
+    result = []
+    prefix = None
+    suffix = ('%s%s') % (agent_name, hostname)
+
+    for index in indexes:
+        key = (uid, label, ('%s') % (index), agent_name, hostname)
+        did = _DID_CACHE.get(key)
+        if did is None:
+            # Only hash the part of the string shared by the group once.
+            # The result is the same as jm_general.hashstring(uid + label
+            # + index + agent_name + hostname).
+            if prefix is None:
+                prefix = hashlib.sha256(
+                    (('%s%s') % (uid, label)).encode())
+            hasher = prefix.copy()
+            hasher.update((('%s%s') % (index, suffix)).encode())
+            did = hasher.hexdigest()
+
+            # Drop the least recently used DIDs
+            _DID_CACHE[key] = did
+            if len(_DID_CACHE) > DID_CACHE_SIZE:
+                _DID_CACHE.popitem(last=False)
+        else:
+            _DID_CACHE.move_to_end(key)
+
+        result.append(did)
 
     # Return
-    return did
+    return result
 
 
 def _base_type(data):
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+
+"""Append-only segmented spool for agent data received by the server.
+
+Instead of creating a file per agent post, records are appended to
+segment files. Each record is stored as:
+
+    [4 byte length][4 byte CRC32 of payload][JSON payload]
+
+Segments are rotated when they reach a maximum size. The ingester keeps
+a commit offset per segment, up to which all records have been stored in
+the database. Segments are deleted only after they have been rotated and
+all of their records have been committed, so an ingester crash at any
+point just causes records to be read again.
+
+Corrupted data, such as a record torn by a writer that crashed, is
+skipped by searching for the next valid record after it.
+
+"""
+
+# Standard libraries
+import os
+import re
+import json
+import zlib
+import fcntl
+import struct
+import threading
+
+# Infoset libraries
+from infoset.utils import jm_general
+from infoset.utils import log
+
+# Spool defaults
+SEGMENT_SIZE = 16 * 1024 * 1024
+BATCH_SIZE = 64 * 1024 * 1024
+HEADER = struct.Struct('>II')
+
+# Records are never larger than this, so bigger lengths are corrupted
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+# Results of parsing a record
+_VALID = 0
+_INCOMPLETE = 1
+_CORRUPT = 2
+
+
+class Spool(object):
+    """Spool of agent data records.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        append:
+        read:
+        commit:
+
+    """
+
+    # Serialize appends by threads of the same process. Appends by
+    # other processes are serialized using a lock file.
+    _thread_lock = threading.Lock()
+
+    def __init__(self, directory, segment_size=SEGMENT_SIZE):
+        """Method initializing the class.
+
+        Args:
+            directory: Directory in which segments are stored
+            segment_size: Size in bytes after which a segment is rotated
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.directory = directory
+        self.segment_size = segment_size
+        self.lockfile = os.path.join(directory, '.lock')
+
+        # Create the directory if necessary
+        if os.path.isdir(directory) is False:
+            os.makedirs(directory, exist_ok=True)
+
+    def append(self, data):
+        """Append a record to the newest segment.
+
+        Args:
+            data: Dict of agent data
+
+        Returns:
+            None
+
+        """
+        # Create the record
+        payload = json.dumps(data).encode()
+        if len(payload) > MAX_RECORD_SIZE:
+            raise ValueError(
+                ('Record of %s bytes is larger than the maximum of %s'
+                 '') % (len(payload), MAX_RECORD_SIZE))
+        record = HEADER.pack(
+            len(payload), zlib.crc32(payload) & 0xffffffff) + payload
+
+        with self._thread_lock:
+            with open(self.lockfile, 'a') as lock_handle:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+                try:
+                    # Rotate the segment if it is full
+                    segments = self.segments()
+                    if bool(segments) is False:
+                        segment = _segment_name(1)
+                    else:
+                        segment = segments[-1]
+                        filepath = os.path.join(self.directory, segment)
+                        if os.path.getsize(filepath) >= self.segment_size:
+                            segment = _segment_name(
+                                _segment_number(segment) + 1)
+
+                    # Write the whole record in a single write
+                    filepath = os.path.join(self.directory, segment)
+                    with open(filepath, 'ab') as f_handle:
+                        f_handle.write(record)
+                        f_handle.flush()
+                        os.fsync(f_handle.fileno())
+                finally:
+                    fcntl.flock(lock_handle, fcntl.LOCK_UN)
+
+    def read(self, max_bytes=BATCH_SIZE):
+        """Read uncommitted records.
+
+        Args:
+            max_bytes: Stop reading once this many bytes have been read
+
+        Returns:
+            records: List of (segment, offset, data) tuples, in the
+                order they were appended.
+                segment = Name of segment the record is in
+                offset = Offset of the end of the record in the segment
+                data = Dict of agent data
+
+        """
+        # Initialize key variables
+        records = []
+        total = 0
+        segments = self.segments()
+
+        # Process each segment starting with the oldest
+        for segment in segments:
+            sealed = segment != segments[-1]
+            filepath = os.path.join(self.directory, segment)
+            start = self._committed(segment)
+            with open(filepath, 'rb') as f_handle:
+                f_handle.seek(start)
+                buffer = f_handle.read()
+
+            position = 0
+            while (total < max_bytes) and (position < len(buffer)):
+                (status, data, end) = _parse(buffer, position)
+
+                # Skip corrupted data up to the next valid record. If
+                # there is none, the data may still be being written to
+                # the newest segment, but will never be completed in
+                # older ones.
+                if status != _VALID:
+                    following = _resync(buffer, position + 1)
+                    if following is None:
+                        if sealed is True:
+                            following = len(buffer)
+                        else:
+                            break
+                    self._skip(filepath, start + position, buffer[
+                        position:following])
+                    total = total + following - position
+                    position = following
+                    if position == len(buffer):
+                        records.append((segment, start + position, None))
+                    continue
+
+                # Update records
+                total = total + end - position
+                position = end
+                records.append((segment, start + position, data))
+
+            # Stop if we have read enough
+            if total >= max_bytes:
+                break
+
+        # Return
+        return records
+
+    def commit(self, records):
+        """Record that records have been ingested.
+
+        Segments that are no longer being appended to are deleted once
+        all their records have been committed.
+
+        Args:
+            records: List of (segment, offset, data) tuples from read()
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        offsets = {}
+
+        # Get the highest offset per segment
+        for (segment, offset, _) in records:
+            offsets[segment] = max(offset, offsets.get(segment, 0))
+
+        # Update
+        segments = self.segments()
+        for segment, offset in sorted(offsets.items()):
+            filepath = os.path.join(self.directory, segment)
+            sealed = segment != segments[-1]
+            if (sealed is True) and (offset >= os.path.getsize(filepath)):
+                os.remove(filepath)
+                if os.path.exists(_offset_file(filepath)) is True:
+                    os.remove(_offset_file(filepath))
+            else:
+                # Write atomically. An empty file would replay the segment.
+                jm_general.write_json(_offset_file(filepath), offset)
+
+    def _skip(self, filepath, offset, data):
+        """Keep a copy of corrupted data for administrators.
+
+        Args:
+            filepath: Path of segment
+            offset: Offset of the data in the segment
+            data: Corrupted data
+
+        Returns:
+            None
+
+        """
+        # Save the data once, as it may be read again before commit
+        corrupt_file = ('%s.%s.corrupt') % (filepath, offset)
+        if os.path.exists(corrupt_file) is True:
+            return
+        log_message = (
+            'Spool segment %s has %s corrupted bytes at offset %s. '
+            'Skipping them.'
+            '') % (filepath, len(data), offset)
+        log.log2warn(1132, log_message)
+        with open(corrupt_file, 'wb') as f_handle:
+            f_handle.write(data)
+
+    def segments(self):
+        """Get the names of all segments.
+
+        Args:
+            None
+
+        Returns:
+            result: Sorted list of segment names, oldest first
+
+        """
+        # Initialize key variables
+        regex = re.compile(r'^\d{20}\.seg$')
+
+        # Return
+        result = sorted([
+            filename for filename in os.listdir(self.directory)
+            if bool(regex.match(filename)) is True])
+        return result
+
+    def _committed(self, segment):
+        """Get the commit offset of a segment.
+
+        Args:
+            segment: Name of segment
+
+        Returns:
+            offset: Offset up to which records have been ingested
+
+        """
+        # Initialize key variables
+        offset = 0
+        filename = _offset_file(os.path.join(self.directory, segment))
+
+        # Read file
+        if os.path.isfile(filename) is True:
+            with open(filename, 'r') as f_handle:
+                try:
+                    offset = int(f_handle.read().strip())
+                except ValueError:
+                    offset = 0
+
+        # Return
+        return offset
+
+
+def cache_filepath(directory, data):
+    """Get the cache filename agent data would have if it were a file.
+
+    Args:
+        directory: Directory
+        data: Dict of agent data
+
+    Returns:
+        result: Filepath
+
+    """
+    # Create a hash of the hostname
+    host_hash = jm_general.hashstring(data['hostname'], sha=1)
+    result = ('%s/%s_%s_%s.json') % (
+        directory, data['timestamp'], data['uid'], host_hash)
+    return result
+
+
+def _parse(buffer, position):
+    """Parse the record at a position in spooled data.
+
+    Args:
+        buffer: Bytes read from a segment
+        position: Position of the record in the buffer
+
+    Returns:
+        result: Tuple of (status, data, end)
+            status = _VALID, _INCOMPLETE or _CORRUPT
+            data = Dict of agent data. None unless the record is valid.
+            end = Position of the end of the record in the buffer
+
+    """
+    # Initialize key variables
+    data = None
+    start = position + HEADER.size
+
+    # Check the header
+    if start > len(buffer):
+        return (_INCOMPLETE, data, len(buffer))
+    (length, checksum) = HEADER.unpack_from(buffer, position)
+    end = start + length
+    if length > MAX_RECORD_SIZE:
+        return (_CORRUPT, data, end)
+    if end > len(buffer):
+        return (_INCOMPLETE, data, end)
+
+    # Check the payload
+    payload = buffer[start:end]
+    if zlib.crc32(payload) & 0xffffffff != checksum:
+        return (_CORRUPT, data, end)
+    try:
+        data = json.loads(payload.decode())
+    except:
+        return (_CORRUPT, None, end)
+
+    # Return
+    return (_VALID, data, end)
+
+
+def _resync(buffer, position):
+    """Find the next valid record in spooled data.
+
+    Args:
+        buffer: Bytes read from a segment
+        position: Position in the buffer to start searching from
+
+    Returns:
+        result: Position of the next valid record. None if there is none.
+
+    """
+    # Payloads are JSON objects, so only the positions before a "{" need
+    # to be checked
+    result = None
+    brace = buffer.find(b'{', position + HEADER.size)
+    while brace != -1:
+        candidate = brace - HEADER.size
+        if _parse(buffer, candidate)[0] == _VALID:
+            result = candidate
+            break
+        brace = buffer.find(b'{', brace + 1)
+
+    # Return
+    return result
+
+
+def _segment_name(number):
+    """Get the name of a segment from its sequence number.
+
+    Args:
+        number: Sequence number
+
+    Returns:
+        name: Name of segment
+
+    """
+    # Return
+    name = ('%020d.seg') % (number)
+    return name
+
+
+def _segment_number(name):
+    """Get the sequence number of a segment from its name.
+
+    Args:
+        name: Name of segment
+
+    Returns:
+        number: Sequence number
+
+    """
+    # Return
+    number = int(name.split('.')[0])
+    return number
+
+
+def _offset_file(segment_path):
+    """Get the name of the file holding the commit offset of a segment.
+
+    Args:
+        segment_path: Path of segment
+
+    Returns:
+        filename: Filename
+
+    """
+    # Return
+    filename = ('%s.offset') % (segment_path)
+    return filename
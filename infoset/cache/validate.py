@@ -15,9 +15,7 @@ import time
 # Infoset libraries
 from infoset.utils import log
 from infoset.utils import jm_general
-from infoset.db import db_hostagent
-from infoset.db import db_agent
-from infoset.db import db_host
+from infoset.db import db_identity
 
 
 class ValidateCache(object):
@@ -40,7 +38,8 @@ class ValidateCache(object):
 
         Args:
             filepath: Cache filename
-            data: Data dict expected to be in a cache file (Agent or server)
+            data: Data dict expected to be in a cache file (Agent or server).
+                Read from filepath if None.
 
         Returns:
             None
@@ -51,19 +50,19 @@ class ValidateCache(object):
         self.information = {}
         self.filepath = filepath
 
-        # Assign data to self.information for future validity checks
-        if filepath is not None:
+        # Assign data to self.information for future validity checks.
+        # The filepath is only used for its name if data is supplied.
+        if isinstance(data, dict) is True:
+            self.information = data
+        elif filepath is not None:
             # Read data from file
             self.information = _read_data_from_file(self.filepath)
-        else:
-            if isinstance(data, dict) is True:
-                self.information = data
 
-    def getinfo(self):
+    def getinfo(self, datapoints=True):
         """Provide validated information when valid.
 
         Args:
-            None
+            datapoints: Also validate the datapoints in the data if True
 
         Returns:
             data: Data
@@ -73,15 +72,18 @@ class ValidateCache(object):
         data = False
 
         # Return
-        if self.valid() is True:
+        if self.valid(datapoints=datapoints) is True:
             data = self.information
         return data
 
-    def valid(self):
+    def valid(self, datapoints=True):
         """Master method that defines whether data is OK.
 
         Args:
-            None
+            datapoints: Also validate the datapoints in the data if True.
+                Callers that set this to False must validate each group
+                and datapoint with check_group() and check_datapoint()
+                as they read them.
 
         Returns:
             all_ok:
@@ -106,10 +108,9 @@ class ValidateCache(object):
                 self._check_primary_keys_in_file())
 
         # Check chartable and unchartable data in the data
-        if False not in validity:
-            validity.append(_check_reported_data(self.information))
-        if False not in validity:
-            validity.append(_check_chartable_data(self.information))
+        if datapoints is True:
+            if False not in validity:
+                validity.append(_check_reported_data(self.information))
 
         # Check if data to be validated is already in the database
         if False not in validity:
@@ -201,11 +202,14 @@ class ValidateCache(object):
         return valid
 
 
-def _check_chartable_data(information):
-    """Check the data types being reported by the agent.
+def check_group(data_type, reported_data):
+    """Check a labeled group of data reported by the agent.
+
+    Callers check the datapoints of the group with check_datapoint().
 
     Args:
-        information: Data to analyze
+        data_type: Type of data. Either "chartable" or "other"
+        reported_data: Dict of the group's base_type, description and data
 
     Returns:
         valid: True if valid
@@ -213,55 +217,65 @@ def _check_chartable_data(information):
     """
     # Initialize key variables
     valid = True
-    data_type = 'chartable'
 
-    # Check that we are evaluating a dict
-    if isinstance(information, dict) is False:
-        log_message = ('Ingest data is not a dictionary')
-        log.log2warn(1122, log_message)
-        valid = False
+    # Process keys
+    for key in ['base_type', 'description', 'data']:
+        if key not in reported_data:
+            log_message = (
+                '"%s" data type does not contain a "%s" key.'
+                '') % (data_type, key)
+            log.log2warn(1115, log_message)
+            valid = False
+    if valid is False:
         return valid
 
-    # Check for chartable data
-    if data_type in information:
+    # Make sure the base types of chartable data are numeric
+    if data_type == 'chartable':
+        try:
+            float(reported_data['base_type'])
+        except:
+            log_message = (
+                'Chartable "base_type" key is non numeric.')
+            log.log2warn(1120, log_message)
+            valid = False
 
-        # Process the data type
-        for _, reported_data in sorted(
-                information[data_type].items()):
+    # Return
+    return valid
 
-            # Make sure the base types are numeric
-            if 'base_type' in reported_data:
-                try:
-                    float(reported_data['base_type'])
-                except:
-                    log_message = (
-                        'Chartable "base_type" key is non numeric.')
-                    log.log2warn(1120, log_message)
-                    valid = False
-            else:
-                log_message = (
-                    'Chartable data has no "base_type" key.')
-                log.log2warn(1117, log_message)
-                valid = False
 
-            # Process data
-            if 'data' in reported_data:
-                for datapoint in reported_data['data']:
-                    # Check to make sure value is numeric
-                    value = datapoint[1]
-                    try:
-                        float(value)
-                    except:
-                        log_message = (
-                            'Chartable data has non numeric data values.')
-                        log.log2warn(1119, log_message)
-                        valid = False
-                        break
-            else:
-                log_message = (
-                    'Chartable data has no "data" key.')
-                log.log2warn(1118, log_message)
-                valid = False
+def check_datapoint(data_type, datapoint):
+    """Check a single datapoint reported by the agent.
+
+    Args:
+        data_type: Type of data. Either "chartable" or "other"
+        datapoint: List of index, value and source
+
+    Returns:
+        valid: True if valid
+
+    """
+    # Initialize key variables
+    valid = True
+
+    # Datapoints must have an index, value and source
+    if (isinstance(datapoint, list) is False) or (len(datapoint) != 3):
+        log_message = (
+            '"%s" data type does not contain valid '
+            'datapoints in it\'s "data" key.'
+            '') % (data_type)
+        log.log2warn(1114, log_message)
+        valid = False
+        return valid
+
+    # Check to make sure chartable values are numeric
+    if data_type == 'chartable':
+        try:
+            float(datapoint[1])
+        except:
+            log_message = (
+                'Chartable data has non numeric data values.')
+            log.log2warn(1119, log_message)
+            valid = False
 
     # Return
     return valid
@@ -297,25 +311,15 @@ def _check_reported_data(information):
         # Process the data type
         for _, reported_data in sorted(
                 information[data_type].items()):
-            # Process keys
-            for key in ['base_type', 'description', 'data']:
-                if key not in reported_data:
-                    log_message = (
-                        '"%s" data type does not contain a "%s" key.'
-                        '') % (data_type, key)
-                    log.log2warn(1115, log_message)
-                    valid = False
+            if check_group(data_type, reported_data) is False:
+                valid = False
+                continue
 
             # Process data
-            if 'data' in reported_data:
-                for datapoint in reported_data['data']:
-                    if len(datapoint) != 3:
-                        log_message = (
-                            '"%s" data type does not contain valid '
-                            'datapoints in it\'s "data" key.'
-                            '') % (data_type)
-                        log.log2warn(1114, log_message)
-                        valid = False
+            for datapoint in reported_data['data']:
+                if check_datapoint(data_type, datapoint) is False:
+                    valid = False
+                    break
 
     # Return
     return valid
@@ -352,33 +356,50 @@ def _check_duplicates(information):
     hostname = information['hostname']
 
     # Check if there is a duplicate entry for this UID
-    if db_agent.uid_exists(uid) is not False:
-        idx_agent = db_agent.GetUID(uid).idx()
-
-        # Check if host exists
-        if db_host.hostname_exists(hostname) is True:
-            idx_host = db_host.GetHost(hostname).idx()
-
-            # Check for host / agent entry existence
-            if db_hostagent.host_agent_exists(
-                    idx_host, idx_agent) is True:
-                # Check if this host / agent has been updated before
-                last_timesamp = db_hostagent.GetHostAgent(
-                    idx_host, idx_agent).last_timestamp()
-
-                # Validate
-                if timestamp <= last_timesamp:
-                    log_message = (
-                        'Data for UID %s, hostname %s at timestamp %s '
-                        'is already found in database.'
-                        '') % (uid, hostname, timestamp)
-                    log.log2warn(1113, log_message)
-                    valid = False
+    last_timestamp = ingested_timestamp(uid, hostname)
+    if last_timestamp is not None:
+        # Validate
+        if timestamp <= last_timestamp:
+            log_message = (
+                'Data for UID %s, hostname %s at timestamp %s '
+                'is already found in database.'
+                '') % (uid, hostname, timestamp)
+            log.log2warn(1113, log_message)
+            valid = False
 
     # Return
     return valid
 
 
+def ingested_timestamp(uid, hostname):
+    """Get the timestamp of the newest data of a host / agent in the database.
+
+    Data with this timestamp or older has already been ingested.
+
+    Args:
+        uid: Agent UID
+        hostname: Hostname
+
+    Returns:
+        last_timestamp: Timestamp. None if no data has been ingested.
+
+    """
+    # Initialize key variables
+    last_timestamp = None
+
+    # Check if the agent and host exist
+    idx_agent = db_identity.idx_agent(uid)
+    if idx_agent is not None:
+        idx_host = db_identity.idx_host(hostname)
+        if idx_host is not None:
+            # Check if this host / agent has been updated before
+            last_timestamp = db_identity.host_agent_last_timestamp(
+                idx_host, idx_agent)
+
+    # Return
+    return last_timestamp
+
+
 def _check_timestamp_key(information):
     """Check whether timestamp key is an integer value.
 
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+
+"""Watch the ingest cache directory for new agent data files.
+
+On Linux the directory is watched with inotify, so the ingester learns
+about new files as soon as their writers rename them into place and
+doesn't have to rescan the whole directory every cycle. On other systems,
+or if inotify cannot be used, the directory is rescanned with os.scandir.
+
+Writers must create cache files atomically (see jm_general.write_json) so
+that a file is complete once it appears under its final name.
+
+"""
+
+# Standard libraries
+import os
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# Infoset libraries
+from infoset.utils import log
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Watcher(object):
+    """Keep track of the files in a directory.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        filenames:
+        wait:
+        close:
+
+    """
+
+    def __init__(self, directory):
+        """Method initializing the class.
+
+        Args:
+            directory: Directory to watch
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.directory = directory
+        self.files = set()
+        self.rescan = True
+        self.fd = _inotify(directory)
+
+        # Log the mode
+        if self.fd is None:
+            log_message = (
+                'Cannot use inotify to watch directory %s. '
+                'Polling it instead.') % (directory)
+            log.log2quiet(1131, log_message)
+
+    def filenames(self):
+        """Get the names of the files in the directory.
+
+        Args:
+            None
+
+        Returns:
+            result: Sorted list of filenames
+
+        """
+        # Apply events that have not been read yet, such as the
+        # deletion of files that have just been ingested
+        if self.fd is not None:
+            while self._read_events(drain=True) is True:
+                pass
+
+        # Read the whole directory only when events can't be trusted
+        if (self.fd is None) or (self.rescan is True):
+            self.files = set(scan(self.directory))
+            self.rescan = False
+
+        # Return
+        result = sorted(self.files)
+        return result
+
+    def wait(self, timeout):
+        """Wait until new files are added to the directory.
+
+        Args:
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            found: True if new files were added
+
+        """
+        # Initialize key variables
+        found = False
+        deadline = time.time() + timeout
+
+        # Poll if inotify isn't available
+        if self.fd is None:
+            time.sleep(timeout)
+            found = True
+            return found
+
+        # Process events until a new file arrives or we time out.
+        # Deleted files don't end the wait.
+        while found is False:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            (readable, _, _) = select.select([self.fd], [], [], remaining)
+            if bool(readable) is False:
+                break
+            found = self._read_events()
+
+        # Return
+        return found
+
+    def close(self):
+        """Stop watching the directory.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Close
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _read_events(self, drain=False):
+        """Update the list of files from pending inotify events.
+
+        Args:
+            drain: Return True if any events were read, not just
+                those for new files
+
+        Returns:
+            found: True if new files were added
+
+        """
+        # Initialize key variables
+        found = False
+
+        try:
+            buffer = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return found
+
+        # Let the caller know there could be more events to read
+        if drain is True:
+            found = bool(buffer)
+
+        # Process each event
+        pointer = 0
+        while pointer + EVENT_HEADER.size <= len(buffer):
+            (_, mask, _, length) = EVENT_HEADER.unpack_from(buffer, pointer)
+            start = pointer + EVENT_HEADER.size
+            name = buffer[start:start + length].rstrip(b'\0').decode(
+                'utf-8', 'replace')
+            pointer = start + length
+
+            # Events were lost, read the whole directory next time
+            if mask & IN_Q_OVERFLOW:
+                self.rescan = True
+                found = True
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                self.files.add(name)
+                found = True
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.files.discard(name)
+
+        # Return
+        return found
+
+
+def scan(directory):
+    """Get the names of the regular files in a directory.
+
+    Args:
+        directory: Directory
+
+    Returns:
+        filenames: List of filenames
+
+    """
+    # Initialize key variables
+    filenames = []
+
+    # os.scandir gets the file type from the directory listing itself
+    # on most filesystems, so no extra stat() call is made per file.
+    for entry in os.scandir(directory):
+        if entry.is_file() is True:
+            filenames.append(entry.name)
+
+    # Return
+    return filenames
+
+
+def _inotify(directory):
+    """Create an inotify file descriptor watching a directory.
+
+    Args:
+        directory: Directory to watch
+
+    Returns:
+        result: File descriptor. None if inotify cannot be used.
+
+    """
+    # Initialize key variables
+    result = None
+    mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return result
+        if libc.inotify_add_watch(fd, directory.encode(), mask) < 0:
+            os.close(fd)
+            return result
+        result = fd
+    except (AttributeError, OSError, TypeError):
+        pass
+
+    # Return
+    return result
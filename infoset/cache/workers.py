@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+"""Long running ingest worker processes.
+
+Each worker process owns a shard of agent UIDs. All the cache files of
+a UID are always processed by the same worker, in the order they were
+received, so the database is updated in timestamp order per UID.
+
+Workers keep their database connections and metadata caches between
+ingest cycles instead of being forked again every few seconds.
+
+"""
+
+# Standard libraries
+import multiprocessing
+import queue as Queue
+
+# Infoset libraries
+from infoset.utils import jm_configuration
+from infoset.utils import log
+from infoset.cache import cache
+
+
+class ShardedPool(object):
+    """Fixed set of ingest worker processes sharded by UID.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        start:
+        process:
+        stop:
+
+    """
+
+    def __init__(self, workers=None):
+        """Method initializing the class.
+
+        Args:
+            workers: Number of worker processes. Uses the configured
+                ingest_threads value if None.
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if workers is None:
+            config = jm_configuration.Config()
+            workers = config.ingest_threads()
+        self.workers = max(1, int(workers))
+        self.queues = [None] * self.workers
+        self.processes = [None] * self.workers
+        self.generations = [0] * self.workers
+        self.results = multiprocessing.Queue()
+
+    def start(self):
+        """Start worker processes that are not running.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Start each shard
+        for shard in range(self.workers):
+            if self.processes[shard] is not None:
+                if self.processes[shard].is_alive() is True:
+                    continue
+            self._start_shard(shard)
+
+    def process(self, uid_metadata):
+        """Ingest cache files and wait until they have been processed.
+
+        Args:
+            uid_metadata: Dict of lists of (timestamp, filepath, data)
+                tuples keyed by [hosthash][uid]. This is the output of
+                cache.validate_cache_files()
+
+        Returns:
+            success: False if a worker died or failed to process files
+                before finishing its work
+
+        """
+        # Initialize key variables
+        success = True
+        pending = [0] * self.workers
+
+        # Make sure all workers are running
+        self.start()
+
+        # Send the files of each UID to the worker that owns it
+        for hosthash in uid_metadata.keys():
+            for uid, metadata in uid_metadata[hosthash].items():
+                shard = _shard(uid, self.workers)
+                self.queues[shard].put(metadata)
+                pending[shard] += 1
+
+        # Wait for all the workers to finish. Results of workers that
+        # have since been replaced are ignored, as their work is no longer
+        # counted as pending.
+        while sum(pending) > 0:
+            try:
+                (shard, generation, ok) = self.results.get(timeout=1)
+                if generation == self.generations[shard]:
+                    pending[shard] -= 1
+                    if ok is False:
+                        success = False
+                continue
+            except Queue.Empty:
+                pass
+
+            # Replace workers that have died. Their unprocessed files
+            # remain in the cache directory and are retried next cycle.
+            for shard in range(self.workers):
+                if pending[shard] == 0:
+                    continue
+                if self.processes[shard].is_alive() is False:
+                    log_message = (
+                        'Ingest worker %s died with %s UIDs unprocessed. '
+                        'Restarting it.'
+                        '') % (shard, pending[shard])
+                    log.log2warn(1129, log_message)
+                    pending[shard] = 0
+                    success = False
+                    self._start_shard(shard)
+
+        # Return
+        return success
+
+    def stop(self):
+        """Stop all worker processes.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Tell workers to exit after their current work
+        for shard in range(self.workers):
+            if self.processes[shard] is None:
+                continue
+            if self.processes[shard].is_alive() is True:
+                self.queues[shard].put(None)
+
+        # Wait for them
+        for shard in range(self.workers):
+            if self.processes[shard] is None:
+                continue
+            self.processes[shard].join(timeout=30)
+            if self.processes[shard].is_alive() is True:
+                self.processes[shard].terminate()
+            self.processes[shard] = None
+            self.queues[shard] = None
+
+    def _start_shard(self, shard):
+        """Start the worker process of a shard with a fresh work queue.
+
+        Args:
+            shard: Shard number
+
+        Returns:
+            None
+
+        """
+        # Start process
+        self.generations[shard] += 1
+        self.queues[shard] = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_worker, args=(
+                shard, self.generations[shard], self.queues[shard],
+                self.results))
+        process.daemon = True
+        process.start()
+        self.processes[shard] = process
+
+
+def _worker(shard, generation, work_queue, results):
+    """Process the cache files of UIDs sent to a shard until told to stop.
+
+    Args:
+        shard: Shard number
+        generation: Number of times the worker of the shard was started
+        work_queue: Queue of lists of (timestamp, filepath, data) tuples.
+            A None value stops the worker.
+        results: Queue on which a (shard, generation, ok) tuple is
+            placed after each list is processed. ok is False if the
+            files could not be processed.
+
+    Returns:
+        None
+
+    """
+    # Read the configuration once for the life of the worker
+    config = jm_configuration.Config()
+
+    # Process work
+    while True:
+        metadata = work_queue.get()
+        if metadata is None:
+            break
+
+        try:
+            data = cache.ProcessUID(config, metadata)
+            data.process()
+            ok = True
+        except Exception as exception_error:
+            log_message = (
+                'Ingest worker %s failed to process files %s: %s'
+                '') % (shard, metadata, exception_error)
+            log.log2warn(1130, log_message)
+            ok = False
+
+        # Report completion
+        results.put((shard, generation, ok))
+
+
+def _shard(uid, workers):
+    """Get the shard that owns a UID.
+
+    Args:
+        uid: Agent UID. This is a hex string.
+        workers: Number of shards
+
+    Returns:
+        shard: Shard number
+
+    """
+    # UIDs are hex SHA hashes, so they are evenly distributed
+    try:
+        shard = int(uid[-8:], 16) % workers
+    except ValueError:
+        shard = sum(uid.encode()) % workers
+    return shard
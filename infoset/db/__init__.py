@@ -51,10 +51,16 @@ def main():
             config.db_username(), config.db_password(),
             config.db_hostname(), config.db_name())
 
+        # LOAD DATA LOCAL INFILE must be allowed by the client
+        connect_args = {}
+        if config.ingest_load_data() is True:
+            connect_args['local_infile'] = True
+
         # Add MySQL to the pool
         db_engine = create_engine(
             DBURL, echo=False,
             encoding='utf8',
+            connect_args=connect_args,
             max_overflow=max_overflow,
             pool_size=pool_size, pool_recycle=3600)
 
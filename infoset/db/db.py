@@ -2,7 +2,11 @@
 
 """Class to process connection."""
 
-from sqlalchemy import and_
+# Standard libraries
+import os
+import tempfile
+
+from sqlalchemy import and_, case, text
 
 # Infoset libraries
 from infoset.utils import log
@@ -183,6 +187,268 @@ class Database(object):
         # Return
         return success
 
+    def insert_ignore(
+            self, table, data_list, error_code, die=True, chunk_size=1000):
+        """Do multi-row INSERTs that skip rows with duplicate keys.
+
+        Each statement inserts up to "chunk_size" rows. All the
+        statements are committed in a single transaction.
+
+        Args:
+            table: SQLalchemy table object (eg. Datapoint.__table__)
+            data_list: List of dicts of column values keyed by column name
+            error_code: Error number to use if one occurs
+            die: Don't die if False, just return success
+            chunk_size: Maximum number of rows per INSERT statement
+
+        Returns:
+            success: True is successful
+
+        """
+        # Initialize key variables
+        success = False
+
+        # Nothing to do
+        if bool(data_list) is False:
+            success = True
+            return success
+
+        # Check the chunk size
+        if (isinstance(chunk_size, int) is False) or (chunk_size < 1):
+            log_message = (
+                'Invalid INSERT chunk size %s. Must be a positive integer.'
+                '') % (chunk_size)
+            if die is True:
+                log.log2die(error_code, log_message)
+            else:
+                log.log2warn(error_code, log_message)
+            return success
+
+        # Open database connection. Prepare cursor
+        session = self.session()
+
+        try:
+            # Create a single INSERT statement for each chunk of rows
+            for pointer in range(0, len(data_list), chunk_size):
+                statement = table.insert().prefix_with(
+                    'IGNORE', dialect='mysql').prefix_with(
+                        'OR IGNORE', dialect='sqlite').values(
+                            data_list[pointer:pointer + chunk_size])
+
+                # Update the database
+                session.execute(statement)
+
+            # Commit  change
+            session.commit()
+
+            # Update success
+            success = True
+
+        except Exception as exception_error:
+            success = False
+            session.rollback()
+            log_message = (
+                'Unable to modify database connection. '
+                'Error: \"%s\"') % (exception_error)
+            if die is True:
+                log.log2die(error_code, log_message)
+            else:
+                log.log2warn(error_code, log_message)
+
+        except:
+            success = False
+            session.rollback()
+            log_message = ('Unexpected database exception')
+            if die is True:
+                log.log2die(error_code, log_message)
+            else:
+                log.log2warn(error_code, log_message)
+
+        # disconnect from server
+        self.close()
+
+        # Return
+        return success
+
+    def load_data(self, table, data_list, error_code, die=True):
+        """Insert rows using LOAD DATA LOCAL INFILE, skipping duplicates.
+
+        This is faster than INSERT statements for large numbers of rows
+        such as when replaying a backlog of cache files. It requires
+        MySQL to allow local_infile, which must be enabled using the
+        ingest_load_data configuration parameter.
+
+        Args:
+            table: SQLalchemy table object (eg. Data.__table__)
+            data_list: List of dicts of column values keyed by column name
+            error_code: Error number to use if one occurs
+            die: Don't die if False, just return success
+
+        Returns:
+            success: True is successful
+
+        """
+        # Initialize key variables
+        success = False
+
+        # Nothing to do
+        if bool(data_list) is False:
+            success = True
+            return success
+
+        # Write the rows to a tab separated file. NULL is written as \N
+        columns = sorted(data_list[0].keys())
+        (f_descriptor, filename) = tempfile.mkstemp(suffix='.tsv')
+        with os.fdopen(f_descriptor, 'w') as f_handle:
+            for row in data_list:
+                values = []
+                for column in columns:
+                    if row[column] is None:
+                        values.append('\\N')
+                    else:
+                        values.append(str(row[column]))
+                f_handle.write(('%s\n') % ('\t'.join(values)))
+
+        # Create statement
+        statement = text(
+            ('LOAD DATA LOCAL INFILE :filename IGNORE INTO TABLE %s (%s)'
+             '') % (table.name, ', '.join(columns)))
+
+        # Open database connection. Prepare cursor
+        session = self.session()
+
+        try:
+            # Update the database
+            session.execute(statement, {'filename': filename})
+
+            # Commit  change
+            session.commit()
+
+            # Update success
+            success = True
+
+        except Exception as exception_error:
+            success = False
+            session.rollback()
+            log_message = (
+                'Unable to modify database connection. '
+                'Error: \"%s\"') % (exception_error)
+            if die is True:
+                log.log2die(error_code, log_message)
+            else:
+                log.log2warn(error_code, log_message)
+
+        except:
+            success = False
+            session.rollback()
+            log_message = ('Unexpected database exception')
+            if die is True:
+                log.log2die(error_code, log_message)
+            else:
+                log.log2warn(error_code, log_message)
+
+        finally:
+            os.remove(filename)
+
+        # disconnect from server
+        self.close()
+
+        # Return
+        return success
+
+    def update_many(
+            self, table, key, updates, error_code, die=True, chunk_size=1000):
+        """Update column values of many rows with few UPDATE statements.
+
+        Each statement updates up to "chunk_size" rows using CASE
+        expressions keyed on the "key" column. Rows are processed in key
+        order to keep lock ordering consistent between concurrent updaters.
+
+        Args:
+            table: SQLalchemy table object (eg. Datapoint.__table__)
+            key: Name of the column identifying the rows to update
+            updates: Dict of dicts keyed by column name. Each dict holds
+                the new column values keyed by the "key" column value.
+                (eg. {'last_timestamp': {idx: timestamp, ...}})
+            error_code: Error number to use if one occurs
+            die: Don't die if False, just return success
+            chunk_size: Maximum number of rows per UPDATE statement
+
+        Returns:
+            success: True is successful
+
+        """
+        # Initialize key variables
+        success = False
+        key_column = table.c[key]
+        keys = set()
+        for column_values in updates.values():
+            keys.update(column_values.keys())
+        keys = sorted(keys)
+
+        # Nothing to do
+        if bool(keys) is False:
+            success = True
+            return success
+
+        # Open database connection. Prepare cursor
+        session = self.session()
+
+        try:
+            for pointer in range(0, len(keys), chunk_size):
+                chunk = keys[pointer:pointer + chunk_size]
+
+                # Create a CASE expression for each column to update.
+                # Rows without a new value for a column keep the old one.
+                values = {}
+                for column_name, column_values in updates.items():
+                    whens = {}
+                    for item in chunk:
+                        if item in column_values:
+                            whens[item] = column_values[item]
+                    if bool(whens) is False:
+                        continue
+                    values[column_name] = case(
+                        whens, value=key_column,
+                        else_=table.c[column_name])
+
+                # Update the rows in the chunk
+                statement = table.update().where(
+                    key_column.in_(chunk)).values(values)
+                session.execute(statement)
+
+            # Commit  change
+            session.commit()
+
+            # Update success
+            success = True
+
+        except Exception as exception_error:
+            success = False
+            session.rollback()
+            log_message = (
+                'Unable to modify database connection. '
+                'Error: \"%s\"') % (exception_error)
+            if die is True:
+                log.log2die(error_code, log_message)
+            else:
+                log.log2warn(error_code, log_message)
+
+        except:
+            success = False
+            session.rollback()
+            log_message = ('Unexpected database exception')
+            if die is True:
+                log.log2die(error_code, log_message)
+            else:
+                log.log2warn(error_code, log_message)
+
+        # disconnect from server
+        self.close()
+
+        # Return
+        return success
+
     def session(self):
         """Return a session to the database pool.
 
@@ -5,6 +5,10 @@ Classes for agent data
 """
 # Python standard libraries
 from collections import defaultdict
+from itertools import groupby
+
+# PIP libraries
+import numpy
 from sqlalchemy import and_
 
 # Infoset libraries
@@ -12,9 +16,12 @@ from infoset.utils import log
 from infoset.utils import jm_general
 from infoset.db import db_datapoint
 from infoset.db import db
-from infoset.db.db_orm import Data
+from infoset.db.db_orm import Data, DataHourly, DataDaily, Datapoint
 from infoset.db.db_datapoint import GetIDX
 
+# Summary tables of data, coarsest first, keyed by seconds per value
+TIERS = [(86400, DataDaily), (3600, DataHourly)]
+
 
 class GetIDX(object):
     """Class to return agent data.
@@ -29,13 +36,17 @@ class GetIDX(object):
 
     """
 
-    def __init__(self, idx, start=None, stop=None):
+    def __init__(self, idx, start=None, stop=None, points=None, since=None):
         """Function for intializing the class.
 
         Args:
             idx: idx of datapoint
             start: Starting timestamp
             stop: Ending timestamp
+            points: Number of values wanted. Used to select the coarsest
+                summary table that has enough values for the range.
+                All the data is returned if None.
+            since: Only return values newer than this timestamp
 
         Returns:
             None
@@ -43,33 +54,43 @@ class GetIDX(object):
         """
         # Initialize important variables
         self.data = defaultdict(dict)
+        self.step = 300
+        self.since = None
 
         # Get the datapoint's base_type
         datapointer = db_datapoint.GetIDX(idx)
         self.base_type = datapointer.base_type()
         self.agent_label = datapointer.agent_label()
 
-        # Redefine start times
-        if start is None:
-            self.ts_start = jm_general.normalized_timestamp() - (3600 * 24)
-        else:
-            self.ts_start = jm_general.normalized_timestamp(start)
-
-        # Redefine stop times
-        if stop is None:
-            self.ts_stop = jm_general.normalized_timestamp()
-        else:
-            self.ts_stop = jm_general.normalized_timestamp(stop)
-
-        # Fix edge cases
-        if self.ts_start > self.ts_stop:
-            self.ts_start = self.ts_stop
+        # Redefine start and stop times
+        (self.ts_start, self.ts_stop) = time_range(start, stop)
 
         # Make sure datapoint exists
         if db_datapoint.idx_exists(idx) is False:
             log_message = ('idx %s not found.') % (idx)
             log.log2die(1049, log_message)
 
+        # Only read the values after "since", and the value at "since"
+        # that the next counter value is compared with.
+        if since is not None:
+            self.since = jm_general.normalized_timestamp(since)
+            self.ts_start = min(
+                max(self.ts_start, self.since), self.ts_stop)
+            step = None
+        else:
+            step = _tier(self.ts_start, self.ts_stop, points)
+
+        # Read summaries of the data if they are enough for the range
+        if step is not None:
+            self.data = _summaries(
+                {int(idx): self.base_type}, self.ts_start, self.ts_stop,
+                step)[int(idx)]
+            (self.ts_start, self.ts_stop) = _align(
+                self.ts_start, self.ts_stop, step)
+            self.base_type = 1
+            self.step = step
+            return
+
         # Establish a database session
         database = db.Database()
         session = database.session()
@@ -85,6 +106,24 @@ class GetIDX(object):
         for instance in result:
             self.data[instance.timestamp] = instance.value
 
+    def state(self):
+        """Get the latest value read from the database.
+
+        Clients fetching values "since" a timestamp use this as the
+        timestamp of their next request.
+
+        Args:
+            None
+
+        Returns:
+            value: Tuple of (timestamp, value) before counter conversion.
+                None if there is no data, or if summaries were read.
+
+        """
+        # Return
+        value = _state(self.data, self.step)
+        return value
+
     def everything(self):
         """Get all datapoints.
 
@@ -99,18 +138,19 @@ class GetIDX(object):
         value = self._counter()
         return value
 
-    def chart_everything(self):
+    def chart_everything(self, points=None):
         """Get all datapoints.
 
         Args:
-            None
+            points: Maximum number of points to return. All the points
+                are returned if None.
 
         Returns:
             value: Dictionary of data_points
 
         """
         # Return data
-        values = self._counter()
+        values = _downsample(self._counter(), points)
         chart_values = self._d3_converter(values)
         return chart_values
 
@@ -124,81 +164,753 @@ class GetIDX(object):
             values: Converted dict of data keyed by timestamp
 
         """
-        # Initialize key variables
-        count = 0
-        step = 300
-
-        # Populate values dictionary with zeros. This ensures that
-        # all timestamp values are covered if we have lost contact
-        # with the agent at some point along the time series.
-        if self.base_type == 1:
-            values = dict.fromkeys(
-                range(self.ts_start, self.ts_stop + step, step), 0)
+        # Return
+        values = _counter_since(
+            self.data, self.base_type, self.ts_start, self.ts_stop,
+            self.since, step=self.step)
+        return values
+
+    def _d3_converter(self, values):
+        """Convert counter data to gauge.
+
+        Args:
+            values: Dict of data keyed by timestamp
+
+        Returns:
+            values: Converted dict of data keyed by timestamp
+
+        """
+        # Return
+        chart_values = _d3_converter(values, self.agent_label)
+        return chart_values
+
+
+class GetIDXs(object):
+    """Class to return the data of many datapoints at once.
+
+    Uses one query for the datapoints' metadata and one for their data,
+    instead of the three queries per datapoint made by GetIDX.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+
+    """
+
+    def __init__(
+            self, idx_list, start=None, stop=None, points=None, since=None):
+        """Function for intializing the class.
+
+        Args:
+            idx_list: List of datapoint idx values
+            start: Starting timestamp
+            stop: Ending timestamp
+            points: Number of values wanted per datapoint. Used to select
+                the coarsest summary table that has enough values for
+                the range. All the data is returned if None.
+            since: Only return values newer than this timestamp
+
+        Returns:
+            None
+
+        """
+        # Initialize important variables
+        self.idx_list = []
+        self.data = {}
+        self.base_type = {}
+        self.agent_label = {}
+        self.step = 300
+        self.since = None
+
+        # Redefine start and stop times
+        (self.ts_start, self.ts_stop) = time_range(start, stop)
+
+        # Only read the values after "since", and the value at "since"
+        # that the next counter value is compared with.
+        if since is not None:
+            self.since = jm_general.normalized_timestamp(since)
+            self.ts_start = min(
+                max(self.ts_start, self.since), self.ts_stop)
+            step = None
         else:
-            values = dict.fromkeys(
-                range(self.ts_start + step, self.ts_stop + step, step), 0)
-
-        # Start conversion
-        for timestamp, value in sorted(self.data.items()):
-            # Process counter values
-            if self.base_type != 1:
-                # Skip first value
-                if count == 0:
-                    old_timestamp = timestamp
-                    count += 1
-                    continue
-
-                #############################################################
-                # Treat missing data with caution
-                #############################################################
-                # These are usually due to outages and can cause spikes
-                # in the data. This ignores the first value after a zero.
-                #############################################################
-                if timestamp - old_timestamp > step:
-                    old_timestamp = timestamp
-                    continue
-                #############################################################
-                #############################################################
-                #############################################################
-
-                # Get new value
-                new_value = value - self.data[old_timestamp]
-
-                # Do conversion to values / second
-                if new_value >= 0:
-                    values[timestamp] = new_value / step
-                else:
-                    if self.base_type == 32:
-                        fixed_value = 4294967296 + abs(value) - 1
-                    else:
-                        fixed_value = (
-                            4294967296 * 4294967296) + abs(value) - 1
-                    values[timestamp] = fixed_value / step
+            step = _tier(self.ts_start, self.ts_stop, points)
+
+        # Nothing to do
+        if bool(idx_list) is False:
+            return
+
+        # Establish a database session
+        database = db.Database()
+        session = database.session()
+
+        # Get the datapoints' metadata
+        result = session.query(
+            Datapoint.idx, Datapoint.base_type,
+            Datapoint.agent_label).filter(Datapoint.idx.in_(idx_list))
+        for instance in result:
+            self.base_type[instance.idx] = instance.base_type
+            self.agent_label[instance.idx] = jm_general.decode(
+                instance.agent_label)
+            self.data[instance.idx] = {}
+
+        # Keep the requested order, skipping unknown datapoints
+        for idx in idx_list:
+            if int(idx) in self.data:
+                self.idx_list.append(int(idx))
             else:
-                # Process gauge values
-                values[timestamp] = self.data[timestamp]
+                log_message = ('idx %s not found.') % (idx)
+                log.log2warn(1134, log_message)
+
+        # Read summaries of the data if they are enough for the range
+        if (step is not None) and (bool(self.idx_list) is True):
+            self.data = _summaries(
+                {idx: self.base_type[idx] for idx in self.idx_list},
+                self.ts_start, self.ts_stop, step)
+            (self.ts_start, self.ts_stop) = _align(
+                self.ts_start, self.ts_stop, step)
+            self.base_type = dict.fromkeys(self.idx_list, 1)
+            self.step = step
+
+        # Get the data of all the datapoints, grouped by datapoint.
+        # Rows are fetched from the server in batches.
+        elif bool(self.idx_list) is True:
+            result = session.query(
+                Data.idx_datapoint, Data.timestamp, Data.value).filter(and_(
+                    Data.timestamp >= self.ts_start,
+                    Data.timestamp <= self.ts_stop,
+                    Data.idx_datapoint.in_(self.idx_list))).order_by(
+                        Data.idx_datapoint, Data.timestamp).yield_per(10000)
+            for idx, rows in groupby(
+                    result, key=lambda instance: instance.idx_datapoint):
+                self.data[idx] = {
+                    instance.timestamp: instance.value for instance in rows}
+
+        # Return the session to the database pool after processing
+        database.close()
+
+    def state(self):
+        """Get the latest values read from the database.
+
+        Args:
+            None
 
-            # Save old timestamp
-            old_timestamp = timestamp
+        Returns:
+            values: Dict of (timestamp, value) tuples keyed by datapoint
+                idx. See GetIDX.state().
 
+        """
         # Return
+        values = {
+            idx: _state(self.data[idx], self.step) for idx in self.idx_list}
         return values
 
-    def _d3_converter(self, values):
-        """Convert counter data to gauge.
+    def everything(self):
+        """Get all datapoints.
 
         Args:
             None
 
         Returns:
-            values: Converted dict of data keyed by timestamp
+            values: Dict of converted data keyed by timestamp, keyed
+                by datapoint idx
+
+        """
+        # Initialize key variables
+        values = {}
+
+        # Return data
+        for idx in self.idx_list:
+            values[idx] = _counter_since(
+                self.data[idx], self.base_type[idx],
+                self.ts_start, self.ts_stop, self.since, step=self.step)
+        return values
+
+    def chart_everything(self, points=None):
+        """Get all datapoints.
+
+        Args:
+            points: Maximum number of points to return per datapoint. All
+                the points are returned if None.
+
+        Returns:
+            chart_values: List of d3 chart dicts of all the datapoints,
+                in the order of the idx_list used to create the object
 
         """
         # Initialize key variables
         chart_values = []
 
-        # Assign data values to d3 dict
-        for timestamp, value in sorted(values.items()):
-            chart_values.append(
-                {'x': timestamp, 'y': value, 'group': self.agent_label})
+        # Return data
+        values = self.everything()
+        for idx in self.idx_list:
+            chart_values.extend(_d3_converter(
+                _downsample(values[idx], points), self.agent_label[idx]))
         return chart_values
+
+
+def time_range(start, stop):
+    """Get the normalized start and stop timestamps of a chart.
+
+    Args:
+        start: Starting timestamp. 24 hours ago if None.
+        stop: Ending timestamp. Now if None.
+
+    Returns:
+        result: Tuple of (start, stop)
+
+    """
+    # Redefine start times
+    if start is None:
+        ts_start = jm_general.normalized_timestamp() - (3600 * 24)
+    else:
+        ts_start = jm_general.normalized_timestamp(start)
+
+    # Redefine stop times
+    if stop is None:
+        ts_stop = jm_general.normalized_timestamp()
+    else:
+        ts_stop = jm_general.normalized_timestamp(stop)
+
+    # Fix edge cases
+    if ts_start > ts_stop:
+        ts_start = ts_stop
+
+    # Return
+    result = (ts_start, ts_stop)
+    return result
+
+
+def _align(ts_start, ts_stop, step):
+    """Align the start and stop timestamps of a chart with summaries.
+
+    Args:
+        ts_start: Starting timestamp
+        ts_stop: Ending timestamp
+        step: Number of seconds per summary
+
+    Returns:
+        result: Tuple of (start, stop) of the first and last summaries
+
+    """
+    # Return
+    result = (ts_start - (ts_start % step), ts_stop - (ts_stop % step))
+    return result
+
+
+def _tier(ts_start, ts_stop, points):
+    """Get the coarsest summary table with enough values for a range.
+
+    Args:
+        ts_start: Starting timestamp
+        ts_stop: Ending timestamp
+        points: Number of values wanted. The data itself is needed if
+            None, so that callers that didn't ask for fewer values get
+            all of them.
+
+    Returns:
+        step: Number of seconds per summary. None if the data itself
+            is needed.
+
+    """
+    # Initialize key variables
+    step = None
+    if points is None:
+        return step
+
+    # Use the first table with enough summaries
+    for (seconds, _) in TIERS:
+        if (ts_stop - ts_start) // seconds + 1 >= points:
+            step = seconds
+            break
+
+    # Return
+    return step
+
+
+def _summaries(base_types, ts_start, ts_stop, step):
+    """Get the averages of the summaries of many datapoints.
+
+    The data ingested since the last summary was created is summarized
+    on the fly.
+
+    Args:
+        base_types: Dict of base types keyed by datapoint idx
+        ts_start: Starting timestamp
+        ts_stop: Ending timestamp
+        step: Number of seconds per summary
+
+    Returns:
+        values: Dict of dicts of averages keyed by timestamp, keyed by
+            datapoint idx
+
+    """
+    # Initialize key variables
+    values = {idx: {} for idx in base_types.keys()}
+    table = dict(TIERS)[step]
+    (ts_start, ts_stop) = _align(ts_start, ts_stop, step)
+    tails = {}
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+
+    # Get the summaries. Periods without data have no samples.
+    result = session.query(
+        table.idx_datapoint, table.timestamp, table.value_avg,
+        table.samples).filter(and_(
+            table.timestamp >= ts_start,
+            table.timestamp <= ts_stop,
+            table.idx_datapoint.in_(list(base_types.keys())))).order_by(
+                table.idx_datapoint, table.timestamp)
+    for idx, rows in groupby(
+            result, key=lambda instance: instance.idx_datapoint):
+        for instance in rows:
+            if bool(instance.samples) is True:
+                values[idx][instance.timestamp] = instance.value_avg
+            tails[idx] = instance.timestamp + step
+
+    # Get the data of periods not summarized yet
+    tail_start = min(
+        [tails.get(idx, ts_start) for idx in base_types.keys()])
+    if tail_start <= ts_stop:
+        result = session.query(
+            Data.idx_datapoint, Data.timestamp, Data.value).filter(and_(
+                Data.timestamp >= tail_start - 300,
+                Data.timestamp < ts_stop + step,
+                Data.idx_datapoint.in_(list(base_types.keys())))).order_by(
+                    Data.idx_datapoint, Data.timestamp).yield_per(10000)
+        for idx, rows in groupby(
+                result, key=lambda instance: instance.idx_datapoint):
+            data = {
+                instance.timestamp: instance.value for instance in rows}
+            converted = rates(data, base_types[idx])
+            start = tails.get(idx, ts_start)
+            converted = {
+                timestamp: value for timestamp, value in converted.items()
+                if timestamp >= start}
+            for timestamp, summary in summarize(converted, step).items():
+                values[idx][timestamp] = summary[2]
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    return values
+
+
+def summarize(values, step):
+    """Summarize values over periods of time.
+
+    Args:
+        values: Dict of values keyed by timestamp
+        step: Number of seconds per period
+
+    Returns:
+        summaries: Dict of (minimum, maximum, average, last, samples)
+            tuples keyed by the starting timestamp of each period
+
+    """
+    # Nothing to do
+    if bool(values) is False:
+        return {}
+
+    # Load data into arrays sorted by timestamp
+    (timestamps, readings) = _arrays(values)
+
+    # Get the index of the first value of each period
+    periods = timestamps - (timestamps % step)
+    (starts, firsts) = numpy.unique(periods, return_index=True)
+    lasts = numpy.append(firsts[1:], len(readings)) - 1
+
+    # Summarize
+    samples = lasts - firsts + 1
+    summaries = dict(zip(starts.tolist(), zip(
+        numpy.minimum.reduceat(readings, firsts).tolist(),
+        numpy.maximum.reduceat(readings, firsts).tolist(),
+        (numpy.add.reduceat(readings, firsts) / samples).tolist(),
+        readings[lasts].tolist(),
+        samples.tolist())))
+
+    # Return
+    return summaries
+
+
+def _counter_since(data, base_type, ts_start, ts_stop, since, step=300):
+    """Convert counter data to gauge, keeping values newer than "since".
+
+    Missing values after the newest one aren't filled with zeros when
+    "since" is used, as they may still arrive.
+
+    Args:
+        data: Dict of values keyed by timestamp
+        base_type: Base type of the datapoint
+        ts_start: Starting timestamp
+        ts_stop: Ending timestamp
+        since: Timestamp. All values are returned if None.
+        step: Number of seconds between values
+
+    Returns:
+        values: Converted dict of data keyed by timestamp
+
+    """
+    # Convert all values
+    if since is None:
+        values = _counter(data, base_type, ts_start, ts_stop, step=step)
+        return values
+
+    # Convert values up to the newest one
+    if bool(data) is True:
+        ts_stop = min(ts_stop, max(data.keys()))
+    else:
+        ts_stop = ts_start
+    values = _counter(data, base_type, ts_start, ts_stop, step=step)
+
+    # Return
+    values = {
+        timestamp: value for timestamp, value in values.items()
+        if timestamp > since}
+    return values
+
+
+def _state(data, step):
+    """Get the latest value of a datapoint read from the database.
+
+    Args:
+        data: Dict of values keyed by timestamp
+        step: Number of seconds between values
+
+    Returns:
+        value: Tuple of (timestamp, value). None if there is no data or
+            the data are summaries.
+
+    """
+    # Return
+    if (bool(data) is False) or (step != 300):
+        return None
+    timestamp = max(data.keys())
+    value = (timestamp, data[timestamp])
+    return value
+
+
+def _counter_array(data, base_type, ts_start, ts_stop, step=300):
+    """Convert counter data to gauge using numpy arrays.
+
+    The results are the same as those of _counter_loop.
+
+    Args:
+        data: Dict of values keyed by timestamp
+        base_type: Base type of the datapoint
+        ts_start: Starting timestamp
+        ts_stop: Ending timestamp
+        step: Number of seconds between values
+
+    Returns:
+        values: Converted dict of data keyed by timestamp. None if
+            timestamps aren't multiples of step or values are None.
+
+    """
+    # Load data into arrays sorted by timestamp
+    arrays = _arrays(data)
+    if arrays is None:
+        return None
+    (timestamps, readings) = arrays
+    if bool(numpy.any(timestamps % step != 0)) is True:
+        return None
+
+    # Populate values dictionary with zeros. This ensures that
+    # all timestamp values are covered if we have lost contact
+    # with the agent at some point along the time series.
+    if base_type == 1:
+        values = dict.fromkeys(range(ts_start, ts_stop + step, step), 0)
+    else:
+        values = dict.fromkeys(
+            range(ts_start + step, ts_stop + step, step), 0)
+
+    # Update values
+    (timestamps, readings) = _rates_array(
+        timestamps, readings, base_type, step=step)
+    values.update(zip(timestamps.tolist(), readings.tolist()))
+
+    # Return
+    return values
+
+
+def _arrays(data):
+    """Load data into numpy arrays sorted by timestamp.
+
+    Args:
+        data: Dict of values keyed by timestamp
+
+    Returns:
+        result: Tuple of (timestamps, values) arrays. None if any
+            values are None.
+
+    """
+    # Load data
+    try:
+        timestamps = numpy.fromiter(data.keys(), dtype=numpy.int64)
+        readings = numpy.fromiter(data.values(), dtype=numpy.float64)
+    except TypeError:
+        return None
+
+    # Sort data
+    if bool(numpy.all(timestamps[1:] > timestamps[:-1])) is False:
+        order = numpy.argsort(timestamps)
+        timestamps = timestamps[order]
+        readings = readings[order]
+
+    # Return
+    result = (timestamps, readings)
+    return result
+
+
+def _rates_array(timestamps, readings, base_type, step=300):
+    """Convert arrays of counter values to values per second.
+
+    Args:
+        timestamps: Array of timestamps, sorted
+        readings: Array of values
+        base_type: Base type of the datapoint
+        step: Number of seconds between values
+
+    Returns:
+        result: Tuple of (timestamps, values) arrays of converted values
+
+    """
+    # Process gauge values
+    if base_type == 1:
+        result = (timestamps, readings)
+        return result
+
+    # Process counter values. The first value has nothing to be compared
+    # with. Values after missing data are ignored as they are usually due
+    # to outages and can cause spikes in the data.
+    deltas = readings[1:] - readings[:-1]
+    valid = (timestamps[1:] - timestamps[:-1]) <= step
+
+    # Do conversion to values / second, correcting counter wraps
+    if base_type == 32:
+        wrap = 4294967296
+    else:
+        wrap = 4294967296 * 4294967296
+    rates = numpy.where(
+        deltas >= 0,
+        deltas / step,
+        (wrap + numpy.abs(readings[1:]) - 1) / step)
+
+    # Return
+    result = (timestamps[1:][valid], rates[valid])
+    return result
+
+
+def rates(data, base_type, step=300):
+    """Convert counter data to values per second, without filling gaps.
+
+    Args:
+        data: Dict of values keyed by timestamp
+        base_type: Base type of the datapoint
+        step: Number of seconds between values
+
+    Returns:
+        values: Dict of converted data keyed by timestamp. Timestamps
+            without a converted value, such as that of the first
+            counter value, are left out.
+
+    """
+    # Ignore missing values
+    (timestamps, readings) = _arrays(
+        {key: value for key, value in data.items() if value is not None})
+
+    # Return
+    (timestamps, readings) = _rates_array(
+        timestamps, readings, base_type, step=step)
+    values = dict(zip(timestamps.tolist(), readings.tolist()))
+    return values
+
+
+def _counter(data, base_type, ts_start, ts_stop, step=300):
+    """Convert counter data to gauge.
+
+    Args:
+        data: Dict of values keyed by timestamp
+        base_type: Base type of the datapoint
+        ts_start: Starting timestamp
+        ts_stop: Ending timestamp
+        step: Number of seconds between values
+
+    Returns:
+        values: Converted dict of data keyed by timestamp
+
+    """
+    # Use arrays unless the data can't be placed on the grid
+    values = _counter_array(data, base_type, ts_start, ts_stop, step=step)
+    if values is None:
+        values = _counter_loop(
+            data, base_type, ts_start, ts_stop, step=step)
+
+    # Return
+    return values
+
+
+def _counter_loop(data, base_type, ts_start, ts_stop, step=300):
+    """Convert counter data to gauge one value at a time.
+
+    Args:
+        data: Dict of values keyed by timestamp
+        base_type: Base type of the datapoint
+        ts_start: Starting timestamp
+        ts_stop: Ending timestamp
+        step: Number of seconds between values
+
+    Returns:
+        values: Converted dict of data keyed by timestamp
+
+    """
+    # Initialize key variables
+    count = 0
+
+    # Populate values dictionary with zeros. This ensures that
+    # all timestamp values are covered if we have lost contact
+    # with the agent at some point along the time series.
+    if base_type == 1:
+        values = dict.fromkeys(range(ts_start, ts_stop + step, step), 0)
+    else:
+        values = dict.fromkeys(
+            range(ts_start + step, ts_stop + step, step), 0)
+
+    # Start conversion
+    for timestamp, value in sorted(data.items()):
+        # Process counter values
+        if base_type != 1:
+            # Skip first value
+            if count == 0:
+                old_timestamp = timestamp
+                count += 1
+                continue
+
+            #################################################################
+            # Treat missing data with caution
+            #################################################################
+            # These are usually due to outages and can cause spikes
+            # in the data. This ignores the first value after a zero.
+            #################################################################
+            if timestamp - old_timestamp > step:
+                old_timestamp = timestamp
+                continue
+            #################################################################
+            #################################################################
+            #################################################################
+
+            # Get new value
+            new_value = value - data[old_timestamp]
+
+            # Do conversion to values / second
+            if new_value >= 0:
+                values[timestamp] = new_value / step
+            else:
+                if base_type == 32:
+                    fixed_value = 4294967296 + abs(value) - 1
+                else:
+                    fixed_value = (
+                        4294967296 * 4294967296) + abs(value) - 1
+                values[timestamp] = fixed_value / step
+        else:
+            # Process gauge values
+            values[timestamp] = data[timestamp]
+
+        # Save old timestamp
+        old_timestamp = timestamp
+
+    # Return
+    return values
+
+
+def _d3_converter(values, agent_label):
+    """Convert a dict of data to a list of d3 chart dicts.
+
+    Args:
+        values: Dict of data keyed by timestamp
+        agent_label: Label of the datapoint
+
+    Returns:
+        chart_values: List of dicts sorted by timestamp
+
+    """
+    # Initialize key variables
+    chart_values = []
+
+    # Assign data values to d3 dict
+    for timestamp, value in sorted(values.items()):
+        chart_values.append(
+            {'x': timestamp, 'y': value, 'group': agent_label})
+    return chart_values
+
+
+def _downsample(values, points):
+    """Reduce the number of points of a chart, preserving its shape.
+
+    Uses the Largest-Triangle-Three-Buckets algorithm. The first and
+    last points are always kept. Each point in between is the one that
+    forms the largest triangle with the previously selected point and the
+    average of the next bucket of points, which keeps peaks and troughs.
+
+    Args:
+        values: Dict of data keyed by timestamp
+        points: Maximum number of points to return. No points are
+            removed if None.
+
+    Returns:
+        result: Dict of data keyed by timestamp
+
+    """
+    # Nothing to do
+    if (points is None) or (len(values) <= max(points, 2)):
+        result = values
+        return result
+
+    # Return the first and last points only
+    timestamps = sorted(values.keys())
+    if points < 3:
+        result = {
+            timestamps[0]: values[timestamps[0]],
+            timestamps[-1]: values[timestamps[-1]]}
+        return result
+
+    # Load data into arrays
+    x_values = numpy.array(timestamps, dtype=numpy.float64)
+    y_values = numpy.array(
+        [values[timestamp] for timestamp in timestamps], dtype=numpy.float64)
+    count = len(timestamps)
+    every = (count - 2) / (points - 2)
+    selected = 0
+    indexes = [0]
+
+    # Select a point from each bucket
+    for bucket in range(points - 2):
+        # Get the average point of the next bucket
+        next_start = int((bucket + 1) * every) + 1
+        next_stop = min(int((bucket + 2) * every) + 1, count)
+        x_average = x_values[next_start:next_stop].mean()
+        y_average = y_values[next_start:next_stop].mean()
+
+        # Get the point in this bucket with the largest triangle
+        start = int(bucket * every) + 1
+        stop = int((bucket + 1) * every) + 1
+        areas = numpy.abs(
+            (x_values[selected] - x_average) * (
+                y_values[start:stop] - y_values[selected]) -
+            (x_values[selected] - x_values[start:stop]) * (
+                y_average - y_values[selected]))
+        selected = start + int(numpy.argmax(areas))
+        indexes.append(selected)
+    indexes.append(count - 1)
+
+    # Return
+    result = {}
+    for index in indexes:
+        result[timestamps[index]] = values[timestamps[index]]
+    return result
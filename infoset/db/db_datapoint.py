@@ -504,6 +504,40 @@ def did_exists(did):
     return found
 
 
+def dids_exist(dids):
+    """Determine which of a list of DIDs already exist.
+
+    Args:
+        dids: List of DID values for datapoints
+
+    Returns:
+        found: Set of the DIDs found in the database
+
+    """
+    # Initialize key variables
+    found = set()
+    values = [did.encode() for did in set(dids)]
+
+    # Nothing to look for
+    if bool(values) is False:
+        return found
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    result = session.query(Datapoint.id).filter(Datapoint.id.in_(values))
+
+    # Massage data
+    for instance in result:
+        found.add(jm_general.decode(instance.id))
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    return found
+
+
 def idx_exists(idx):
     """Determine whether the idx exists.
 
@@ -536,6 +570,41 @@ def idx_exists(idx):
     return found
 
 
+def last_timestamps(idx_list):
+    """Get the timestamps of the latest data of many datapoints.
+
+    Args:
+        idx_list: List of datapoint idx values
+
+    Returns:
+        timestamps: Dict of last_timestamp values keyed by datapoint idx
+
+    """
+    # Initialize key variables
+    timestamps = {}
+
+    # Nothing to look for
+    if bool(idx_list) is False:
+        return timestamps
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    result = session.query(
+        Datapoint.idx, Datapoint.last_timestamp).filter(
+            Datapoint.idx.in_(idx_list))
+
+    # Massage data
+    for instance in result:
+        timestamps[instance.idx] = instance.last_timestamp
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    return timestamps
+
+
 def datapoint_host_idx(idx_host):
     """Get list of all datapoint indexes for a specific host_idx.
 
@@ -11,8 +11,9 @@ from sqlalchemy import and_
 
 # Infoset libraries
 from infoset.db import db
-from infoset.db.db_orm import HostAgent
+from infoset.db.db_orm import HostAgent, Host, Agent
 from infoset.utils import log
+from infoset.utils import jm_general
 
 
 class GetHostAgent(object):
@@ -191,3 +192,99 @@ def agent_indices(idx_host):
 
     # Return
     return idx_list
+
+
+def host_agents(enabled=None):
+    """Get the hosts and agents of all host / agent combinations.
+
+    Args:
+        enabled: Only return enabled agents if True, disabled agents if
+            False and all agents if None
+
+    Returns:
+        dict_list: List of dicts of host and agent data, ordered by host
+            and agent idx
+
+    """
+    # Initialize key variables
+    dict_list = []
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    result = session.query(
+        HostAgent.idx_host, HostAgent.idx_agent, Host.hostname,
+        Agent.name, Agent.id, Agent.enabled).join(
+            Host, Host.idx == HostAgent.idx_host).join(
+                Agent, Agent.idx == HostAgent.idx_agent)
+    if enabled is not None:
+        result = result.filter(Agent.enabled == int(enabled))
+    result = result.order_by(HostAgent.idx_host, HostAgent.idx_agent)
+
+    # Massage data
+    for instance in result:
+        dict_list.append(_host_agent_dict(instance))
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    return dict_list
+
+
+def host_agent(idx_host, idx_agent):
+    """Get the host and agent data of a host / agent combination.
+
+    Args:
+        idx_host: Host idx
+        idx_agent: Agent idx
+
+    Returns:
+        data_dict: Dict of host and agent data. None if the host or agent
+            doesn't exist.
+
+    """
+    # Initialize key variables
+    data_dict = None
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    result = session.query(
+        Host.idx.label('idx_host'), Agent.idx.label('idx_agent'),
+        Host.hostname, Agent.name, Agent.id, Agent.enabled).filter(and_(
+            Host.idx == idx_host, Agent.idx == idx_agent))
+
+    # Massage data
+    for instance in result:
+        data_dict = _host_agent_dict(instance)
+        break
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    return data_dict
+
+
+def _host_agent_dict(instance):
+    """Convert a host / agent query result row to a dict.
+
+    Args:
+        instance: Row with idx_host, idx_agent, hostname, name, id and
+            enabled columns
+
+    Returns:
+        data_dict: Dict of host and agent data
+
+    """
+    # Return
+    data_dict = {
+        'idx_host': instance.idx_host,
+        'idx_agent': instance.idx_agent,
+        'hostname': jm_general.decode(instance.hostname),
+        'agent_name': jm_general.decode(instance.name),
+        'uid': jm_general.decode(instance.id),
+        'enabled': bool(instance.enabled)
+    }
+    return data_dict
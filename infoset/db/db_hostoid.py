@@ -3,12 +3,28 @@
 Classes for oid data
 
 """
+# Python standard libraries
+import os
+import threading
+import time
+
 # Python libraries
 from sqlalchemy import and_
 
 # Infoset libraries
 from infoset.db import db
-from infoset.db.db_orm import HostOID
+from infoset.db.db_orm import HostOID, Host, OID
+from infoset.utils import hidden
+from infoset.utils import jm_general
+
+# Seconds before cached poll plans are read again, even if they weren't
+# invalidated. Catches changes made directly in the database.
+PLAN_LIFETIME = 3600
+
+# Poll plans keyed by hostname, with the state of the stamp file and the
+# time when they were read. Shared by the threads of the agent.
+_PLANS = {'plans': None, 'signature': None, 'timestamp': 0}
+_PLANS_LOCK = threading.Lock()
 
 
 def host_oid_exists(idx_host, idx_oid):
@@ -98,3 +114,120 @@ def oid_indices(idx_host):
 
     # Return
     return idx_list
+
+
+def oid_plans():
+    """Get the poll plans of all hosts with a single query.
+
+    Args:
+        None
+
+    Returns:
+        plans: Dict of poll plans keyed by hostname. Each plan is keyed by
+            labels OID and agent label, and contains the values OID,
+            base type and multiplier of the agent label.
+
+    """
+    # Initialize key variables
+    plans = {}
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    result = session.query(
+        Host.hostname, OID.oid_values, OID.oid_labels, OID.agent_label,
+        OID.base_type, OID.multiplier).join(
+            HostOID, HostOID.idx_host == Host.idx).join(
+                OID, OID.idx == HostOID.idx_oid)
+
+    # Massage data
+    for instance in result:
+        hostname = jm_general.decode(instance.hostname)
+        labels_oid = jm_general.decode(instance.oid_labels)
+        agent_label = jm_general.decode(instance.agent_label)
+        plan = plans.setdefault(hostname, {})
+        plan.setdefault(labels_oid, {})[agent_label] = {
+            'values_oid': jm_general.decode(instance.oid_values),
+            'base_type': instance.base_type,
+            'multiplier': instance.multiplier}
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    return plans
+
+
+def oid_plan(hostname):
+    """Get the cached poll plan of a host.
+
+    The plans of all hosts are read again when invalidate() is called by
+    any process, or after PLAN_LIFETIME seconds. The plan is shared by
+    all callers and must not be modified.
+
+    Args:
+        hostname: Hostname
+
+    Returns:
+        plan: Poll plan of the host, as returned by oid_plans(). Empty if
+            the host has no OIDs.
+
+    """
+    # Get the state of the stamp file
+    signature = _signature()
+    now = time.time()
+
+    # Read the plans if they are missing, invalidated or expired
+    with _PLANS_LOCK:
+        if (_PLANS['plans'] is None) or (
+                _PLANS['signature'] != signature) or (
+                    now - _PLANS['timestamp'] > PLAN_LIFETIME):
+            _PLANS['plans'] = oid_plans()
+            _PLANS['signature'] = signature
+            _PLANS['timestamp'] = now
+        plans = _PLANS['plans']
+
+    # Return
+    plan = plans.get(hostname, {})
+    return plan
+
+
+def invalidate():
+    """Make all processes read the poll plans of hosts again.
+
+    Call this after changing the iset_hostoid or iset_oid tables.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Update the stamp file checked by other processes
+    hidden.Touch().stamp('oid_plans')
+
+    # Forget the plans of this process
+    with _PLANS_LOCK:
+        _PLANS['plans'] = None
+
+
+def _signature():
+    """Get the state of the stamp file updated by invalidate().
+
+    Args:
+        None
+
+    Returns:
+        signature: Modification time of the file. None if it doesn't exist.
+
+    """
+    # Get the state of the file
+    filename = hidden.File().stamp('oid_plans')
+    try:
+        signature = os.stat(filename).st_mtime_ns
+    except FileNotFoundError:
+        signature = None
+
+    # Return
+    return signature
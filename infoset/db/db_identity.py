@@ -0,0 +1,283 @@
+"""Module of infoset database functions.
+
+Process-local cache of agent, host and host / agent index values.
+
+The ingester looks up the same agent UIDs and hostnames for every cache
+file it reads. These values almost never change, so they are kept in
+memory for a limited time instead of being queried from the database
+each time.
+
+"""
+# Python standard libraries
+import time
+import threading
+from collections import OrderedDict
+
+# PIP libraries
+from sqlalchemy import and_
+
+# Infoset libraries
+from infoset.utils import jm_general
+from infoset.db import db
+from infoset.db.db_orm import Agent, Host, HostAgent
+
+# Maximum number of entries per cache and their lifetime in seconds
+CACHE_SIZE = 10000
+CACHE_TTL = 300
+
+
+class IdentityCache(object):
+    """Bounded, thread safe dict whose entries expire after a while.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        get:
+        set:
+        delete:
+        clear:
+
+    """
+
+    def __init__(self, size=CACHE_SIZE, ttl=CACHE_TTL):
+        """Function for intializing the class.
+
+        Args:
+            size: Maximum number of entries kept. The least recently
+                used entries are dropped first.
+            ttl: Number of seconds an entry is valid
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.size = size
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get the value of a key.
+
+        Args:
+            key: Key
+
+        Returns:
+            value: Value of the key. None if not found or expired
+
+        """
+        # Initialize key variables
+        value = None
+        now = time.time()
+
+        with self.lock:
+            if key in self.data:
+                (expiry, result) = self.data[key]
+                if expiry > now:
+                    value = result
+                    self.data.move_to_end(key)
+                else:
+                    del self.data[key]
+
+        # Return
+        return value
+
+    def set(self, key, value):
+        """Set the value of a key.
+
+        Args:
+            key: Key
+            value: Value. None values are not cached.
+
+        Returns:
+            None
+
+        """
+        # Don't cache non existent values
+        if value is None:
+            self.delete(key)
+            return
+
+        with self.lock:
+            self.data[key] = (time.time() + self.ttl, value)
+            self.data.move_to_end(key)
+
+            # Drop the least recently used entries
+            while len(self.data) > self.size:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        """Delete a key.
+
+        Args:
+            key: Key
+
+        Returns:
+            None
+
+        """
+        with self.lock:
+            if key in self.data:
+                del self.data[key]
+
+    def clear(self):
+        """Delete all keys.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        with self.lock:
+            self.data.clear()
+
+
+# Caches shared by everything in the process
+AGENTS = IdentityCache()
+HOSTS = IdentityCache()
+HOST_AGENTS = IdentityCache()
+
+
+def idx_agent(uid):
+    """Get the idx_agent of an agent UID.
+
+    Args:
+        uid: UID of agent
+
+    Returns:
+        result: idx_agent value. None if the UID doesn't exist.
+
+    """
+    # Return cached value
+    result = AGENTS.get(uid)
+    if result is not None:
+        return result
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    query = session.query(Agent.idx).filter(
+        Agent.id == jm_general.encode(uid))
+
+    # Massage data
+    for instance in query:
+        result = instance.idx
+        break
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    AGENTS.set(uid, result)
+    return result
+
+
+def idx_host(hostname):
+    """Get the idx_host of a hostname.
+
+    Args:
+        hostname: Hostname
+
+    Returns:
+        result: idx_host value. None if the hostname doesn't exist.
+
+    """
+    # Return cached value
+    result = HOSTS.get(hostname)
+    if result is not None:
+        return result
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    query = session.query(Host.idx).filter(
+        Host.hostname == jm_general.encode(hostname))
+
+    # Massage data
+    for instance in query:
+        result = instance.idx
+        break
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    HOSTS.set(hostname, result)
+    return result
+
+
+def host_agent_last_timestamp(idx_host_value, idx_agent_value):
+    """Get the last_timestamp of a host / agent combination.
+
+    Args:
+        idx_host_value: Host idx
+        idx_agent_value: Agent idx
+
+    Returns:
+        result: last_timestamp value. None if the host / agent
+            combination doesn't exist.
+
+    """
+    # Return cached value
+    key = (idx_host_value, idx_agent_value)
+    result = HOST_AGENTS.get(key)
+    if result is not None:
+        return result
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    query = session.query(HostAgent.last_timestamp).filter(and_(
+        HostAgent.idx_host == idx_host_value,
+        HostAgent.idx_agent == idx_agent_value))
+
+    # Massage data
+    for instance in query:
+        result = instance.last_timestamp
+        break
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    HOST_AGENTS.set(key, result)
+    return result
+
+
+def update_host_agent(idx_host_value, idx_agent_value, last_timestamp):
+    """Update the cached last_timestamp of a host / agent combination.
+
+    Args:
+        idx_host_value: Host idx
+        idx_agent_value: Agent idx
+        last_timestamp: New last_timestamp value
+
+    Returns:
+        None
+
+    """
+    # Update
+    HOST_AGENTS.set((idx_host_value, idx_agent_value), last_timestamp)
+
+
+def invalidate():
+    """Empty all the caches.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Clear
+    AGENTS.clear()
+    HOSTS.clear()
+    HOST_AGENTS.clear()
@@ -157,7 +157,11 @@ class HostAgent(BASE):
 
 
 class Data(BASE):
-    """Class defining the iset_data table of the database."""
+    """Class defining the iset_data table of the database.
+
+    The table is partitioned by timestamp, so it can't have foreign keys.
+
+    """
 
     __tablename__ = 'iset_data'
     __table_args__ = (
@@ -168,13 +172,79 @@ class Data(BASE):
         }
         )
 
+    idx_datapoint = Column(
+        BIGINT(unsigned=True), nullable=False, server_default='1')
+
+    timestamp = Column(BIGINT(unsigned=True), nullable=False, default='1')
+
+    value = Column(FLOAT, default=None)
+
+
+class DataHourly(BASE):
+    """Class defining the iset_data_hourly table of the database.
+
+    Holds hourly summaries of the iset_data table. Counter values are
+    already converted to values per second.
+
+    """
+
+    __tablename__ = 'iset_data_hourly'
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            'idx_datapoint', 'timestamp'),
+        {
+            'mysql_engine': 'InnoDB'
+        }
+        )
+
     idx_datapoint = Column(
         BIGINT(unsigned=True), ForeignKey('iset_datapoint.idx'),
         nullable=False, server_default='1')
 
     timestamp = Column(BIGINT(unsigned=True), nullable=False, default='1')
 
-    value = Column(FLOAT, default=None)
+    value_min = Column(FLOAT, default=None)
+
+    value_max = Column(FLOAT, default=None)
+
+    value_avg = Column(FLOAT, default=None)
+
+    value_last = Column(FLOAT, default=None)
+
+    samples = Column(INTEGER(unsigned=True), nullable=False, default='0')
+
+
+class DataDaily(BASE):
+    """Class defining the iset_data_daily table of the database.
+
+    Holds daily summaries of the iset_data_hourly table.
+
+    """
+
+    __tablename__ = 'iset_data_daily'
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            'idx_datapoint', 'timestamp'),
+        {
+            'mysql_engine': 'InnoDB'
+        }
+        )
+
+    idx_datapoint = Column(
+        BIGINT(unsigned=True), ForeignKey('iset_datapoint.idx'),
+        nullable=False, server_default='1')
+
+    timestamp = Column(BIGINT(unsigned=True), nullable=False, default='1')
+
+    value_min = Column(FLOAT, default=None)
+
+    value_max = Column(FLOAT, default=None)
+
+    value_avg = Column(FLOAT, default=None)
+
+    value_last = Column(FLOAT, default=None)
+
+    samples = Column(INTEGER(unsigned=True), nullable=False, default='0')
 
 
 class Agent(BASE):
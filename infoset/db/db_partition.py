@@ -0,0 +1,241 @@
+"""Module of infoset database functions.
+
+Manages the monthly partitions of the iset_data table
+
+"""
+# Python standard libraries
+import time
+import calendar
+from datetime import datetime
+
+# PIP libraries
+from sqlalchemy import text
+
+# Infoset libraries
+from infoset.utils import log
+from infoset.utils import jm_configuration
+from infoset.db import db
+
+# Partitioned table
+TABLE = 'iset_data'
+
+# Number of months of empty partitions to keep ready for new data
+MONTHS_AHEAD = 3
+
+# Partition catching data beyond the newest monthly partition
+LAST_PARTITION = 'pmax'
+
+
+def maintain(config=None, timestamp=None, partition=False):
+    """Create future partitions of iset_data and drop expired ones.
+
+    Args:
+        config: Config object
+        timestamp: Current timestamp. Now if None.
+        partition: Partition the table if it isn't partitioned yet.
+            This rebuilds the table, which locks it for a long time if
+            it has a lot of data, so it is only done by setup.py and
+            bin/partition_data.py.
+
+    Returns:
+        success: True if successful
+
+    """
+    # Initialize key variables
+    success = False
+    if config is None:
+        config = jm_configuration.Config()
+    if timestamp is None:
+        timestamp = int(time.time())
+
+    # Get the time before which data is dropped
+    retention = config.data_retention()
+    if bool(retention) is True:
+        expiry = timestamp - (retention * 86400)
+    else:
+        expiry = None
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+
+    # Only MySQL tables can be partitioned
+    if session.bind.dialect.name != 'mysql':
+        database.close()
+        success = True
+        return success
+
+    try:
+        # Get the required changes
+        (existing, foreign_keys) = _describe(session)
+        if (bool(existing) is False) and (partition is False):
+            log_message = (
+                'Table %s is not partitioned, so expired data can\'t be '
+                'dropped. Run bin/partition_data.py to partition it.'
+                '') % (TABLE)
+            log.log2warn(1142, log_message)
+            sql_statements = []
+        else:
+            sql_statements = statements(
+                existing, foreign_keys, timestamp, expiry=expiry)
+
+        # Partitioning statements are committed implicitly
+        for sql_statement in sql_statements:
+            log_message = ('Updating partitions: %s') % (sql_statement)
+            log.log2quiet(1136, log_message)
+            session.execute(text(sql_statement))
+
+        # Update success
+        success = True
+
+    except Exception as exception_error:
+        log_message = (
+            'Unable to update the partitions of table %s. '
+            'Error: \"%s\"') % (TABLE, exception_error)
+        log.log2warn(1137, log_message)
+
+    # Return the session to the database pool after processing
+    database.close()
+
+    # Return
+    return success
+
+
+def statements(existing, foreign_keys, timestamp, expiry=None):
+    """Create the SQL statements needed to update the partitions.
+
+    Args:
+        existing: List of (name, boundary) tuples of the partitions of
+            the table. Boundaries are timestamps, or None for MAXVALUE.
+        foreign_keys: List of foreign key names of the table, which
+            must be dropped before the table can be partitioned
+        timestamp: Current timestamp
+        expiry: Partitions with data older than this timestamp only are
+            dropped. Nothing is dropped if None.
+
+    Returns:
+        sql_statements: List of SQL statements
+
+    """
+    # Initialize key variables
+    sql_statements = []
+    boundaries = [
+        month_start(timestamp, months=months)
+        for months in range(1, MONTHS_AHEAD + 2)]
+
+    # Partition the table. All older data goes to the first partition.
+    if bool(existing) is False:
+        for foreign_key in foreign_keys:
+            sql_statements.append(('ALTER TABLE %s DROP FOREIGN KEY %s') % (
+                TABLE, foreign_key))
+        sql_statements.append(
+            ('ALTER TABLE %s PARTITION BY RANGE (timestamp) (%s)') % (
+                TABLE, _definitions(
+                    [month_start(timestamp)] + boundaries)))
+        return sql_statements
+
+    # Add partitions by splitting the last one
+    newest = max([boundary for (_, boundary) in existing if bool(boundary)])
+    boundaries = [boundary for boundary in boundaries if boundary > newest]
+    if bool(boundaries) is True:
+        sql_statements.append(
+            ('ALTER TABLE %s REORGANIZE PARTITION %s INTO (%s)') % (
+                TABLE, LAST_PARTITION, _definitions(boundaries)))
+
+    # Drop expired partitions, keeping at least one
+    if expiry is not None:
+        expired = [
+            name for (name, boundary) in existing
+            if (boundary is not None) and (boundary <= expiry) and (
+                boundary < newest)]
+        if bool(expired) is True:
+            sql_statements.append(('ALTER TABLE %s DROP PARTITION %s') % (
+                TABLE, ', '.join(expired)))
+
+    # Return
+    return sql_statements
+
+
+def month_start(timestamp, months=0):
+    """Get the start of a month in UTC.
+
+    Args:
+        timestamp: Timestamp within the month
+        months: Number of months to move forward from the month
+
+    Returns:
+        result: Timestamp of the start of the month
+
+    """
+    # Get the month
+    date = datetime.utcfromtimestamp(timestamp)
+    month = date.year * 12 + date.month - 1 + months
+
+    # Return
+    result = calendar.timegm((month // 12, month % 12 + 1, 1, 0, 0, 0))
+    return result
+
+
+def _definitions(boundaries):
+    """Create the definitions of monthly partitions.
+
+    Args:
+        boundaries: List of timestamps of the end of each partition
+
+    Returns:
+        result: Partition definitions, ending with LAST_PARTITION
+
+    """
+    # Name partitions after the month they hold
+    definitions = []
+    for boundary in boundaries:
+        name = datetime.utcfromtimestamp(
+            month_start(boundary, months=-1)).strftime('p%Y%m')
+        definitions.append(
+            ('PARTITION %s VALUES LESS THAN (%s)') % (name, boundary))
+    definitions.append(
+        ('PARTITION %s VALUES LESS THAN MAXVALUE') % (LAST_PARTITION))
+
+    # Return
+    result = ', '.join(definitions)
+    return result
+
+
+def _describe(session):
+    """Get the partitions and foreign keys of the table.
+
+    Args:
+        session: Database session
+
+    Returns:
+        result: Tuple of (partitions, foreign_keys) lists. Partitions
+            are (name, boundary) tuples.
+
+    """
+    # Initialize key variables
+    partitions = []
+
+    # Get partitions in order
+    rows = session.execute(text(
+        'SELECT PARTITION_NAME, PARTITION_DESCRIPTION '
+        'FROM information_schema.PARTITIONS '
+        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table '
+        'AND PARTITION_NAME IS NOT NULL '
+        'ORDER BY PARTITION_ORDINAL_POSITION'), {'table': TABLE})
+    for (name, description) in rows:
+        if description == 'MAXVALUE':
+            partitions.append((name, None))
+        else:
+            partitions.append((name, int(description)))
+
+    # Get foreign keys
+    rows = session.execute(text(
+        'SELECT CONSTRAINT_NAME '
+        'FROM information_schema.TABLE_CONSTRAINTS '
+        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table '
+        'AND CONSTRAINT_TYPE = \'FOREIGN KEY\''), {'table': TABLE})
+    foreign_keys = [name for (name,) in rows]
+
+    # Return
+    result = (partitions, foreign_keys)
+    return result
@@ -0,0 +1,380 @@
+"""Module of infoset database functions.
+
+Summarizes the data of datapoints into hourly and daily tables
+
+"""
+# Python standard libraries
+from collections import defaultdict
+from itertools import groupby
+
+# PIP libraries
+import numpy
+from sqlalchemy import and_, func
+
+# Infoset libraries
+from infoset.db import db
+from infoset.db import db_data
+from infoset.db.db_orm import Data, DataHourly, DataDaily, Datapoint
+
+# Maximum number of summaries created per datapoint per run
+MAX_SUMMARIES = 168
+
+# Maximum number of datapoints whose data is read by a single query
+CHUNK_SIZE = 500
+
+
+def process():
+    """Summarize the data ingested since the last run.
+
+    Args:
+        None
+
+    Returns:
+        count: Number of summaries created. More work remains to be
+            done if this is not zero.
+
+    """
+    # Create the hourly summaries first, daily summaries are made of them
+    count = _hourly()
+    count += _daily()
+    return count
+
+
+def _hourly():
+    """Summarize data into the iset_data_hourly table.
+
+    Args:
+        None
+
+    Returns:
+        count: Number of summaries created
+
+    """
+    # Initialize key variables
+    step = 3600
+    ends = {}
+    base_types = {}
+    count = 0
+
+    # Get the chartable datapoints and the end of their data
+    database = db.Database()
+    session = database.session()
+    result = session.query(
+        Datapoint.idx, Datapoint.base_type,
+        Datapoint.last_timestamp).filter(and_(
+            Datapoint.base_type.in_([1, 32, 64]),
+            Datapoint.last_timestamp > 0))
+    for instance in result:
+        ends[instance.idx] = instance.last_timestamp + 300
+        base_types[instance.idx] = instance.base_type
+    database.close()
+
+    # Summarize data
+    for (ts_start, ts_stop), idx_list in _pending(
+            DataHourly, Data, step, ends).items():
+        for pointer in range(0, len(idx_list), CHUNK_SIZE):
+            chunk = idx_list[pointer:pointer + CHUNK_SIZE]
+
+            # Counters need the value before the first period
+            data = _read(
+                chunk, ts_start - 300, ts_stop, Data,
+                lambda instance: instance.value)
+
+            # Summarize values per second
+            rows = []
+            for idx in chunk:
+                values = db_data.rates(data.get(idx, {}), base_types[idx])
+                summaries = db_data.summarize(
+                    {timestamp: value for timestamp, value in values.items()
+                     if timestamp >= ts_start}, step)
+                rows.extend(_rows(idx, summaries, ts_start, ts_stop, step))
+
+            # Update the database
+            count += _insert(DataHourly, rows)
+
+    # Return
+    return count
+
+
+def _daily():
+    """Summarize hourly summaries into the iset_data_daily table.
+
+    Args:
+        None
+
+    Returns:
+        count: Number of summaries created
+
+    """
+    # Initialize key variables
+    step = 86400
+    count = 0
+
+    # The end of the data is the end of the last hourly summary
+    ends = {
+        idx: timestamp + 3600
+        for idx, timestamp in _lasts(DataHourly).items()}
+
+    # Summarize data
+    for (ts_start, ts_stop), idx_list in _pending(
+            DataDaily, DataHourly, step, ends).items():
+        for pointer in range(0, len(idx_list), CHUNK_SIZE):
+            chunk = idx_list[pointer:pointer + CHUNK_SIZE]
+            data = _read(
+                chunk, ts_start, ts_stop, DataHourly,
+                lambda instance: (
+                    instance.value_min, instance.value_max,
+                    instance.value_avg, instance.value_last,
+                    instance.samples))
+
+            # Combine summaries
+            rows = []
+            for idx in chunk:
+                summaries = combine(data.get(idx, {}), step)
+                rows.extend(_rows(idx, summaries, ts_start, ts_stop, step))
+
+            # Update the database
+            count += _insert(DataDaily, rows)
+
+    # Return
+    return count
+
+
+def combine(summaries, step):
+    """Combine summaries into summaries of longer periods of time.
+
+    Args:
+        summaries: Dict of (minimum, maximum, average, last, samples)
+            tuples keyed by timestamp
+        step: Number of seconds per period
+
+    Returns:
+        combined: Dict of (minimum, maximum, average, last, samples)
+            tuples keyed by the starting timestamp of each period
+
+    """
+    # Ignore summaries of periods without data
+    summaries = {
+        timestamp: summary for timestamp, summary in summaries.items()
+        if bool(summary[4]) is True}
+
+    # Nothing to do
+    if bool(summaries) is False:
+        return {}
+
+    # Load data into arrays sorted by timestamp
+    timestamps = numpy.array(sorted(summaries.keys()), dtype=numpy.int64)
+    columns = numpy.array(
+        [summaries[timestamp] for timestamp in timestamps.tolist()],
+        dtype=numpy.float64)
+    samples = columns[:, 4]
+
+    # Get the index of the first summary of each period
+    periods = timestamps - (timestamps % step)
+    (starts, firsts) = numpy.unique(periods, return_index=True)
+    lasts = numpy.append(firsts[1:], len(timestamps)) - 1
+
+    # Combine. Averages are weighted by the number of samples.
+    totals = numpy.add.reduceat(samples, firsts)
+    combined = dict(zip(starts.tolist(), zip(
+        numpy.minimum.reduceat(columns[:, 0], firsts).tolist(),
+        numpy.maximum.reduceat(columns[:, 1], firsts).tolist(),
+        (numpy.add.reduceat(
+            columns[:, 2] * samples, firsts) / totals).tolist(),
+        columns[lasts, 3].tolist(),
+        totals.astype(numpy.int64).tolist())))
+
+    # Return
+    return combined
+
+
+def _pending(table, source, step, ends):
+    """Get the periods that need to be summarized for each datapoint.
+
+    A period is summarized once its source data is complete.
+
+    Args:
+        table: Summary table
+        source: Table with the data to summarize
+        step: Number of seconds per summary
+        ends: Dict of timestamps at which the source data of each
+            datapoint ends, keyed by datapoint idx
+
+    Returns:
+        pending: Dict of lists of datapoint idx values keyed by the
+            (start, stop) tuple of the periods to summarize
+
+    """
+    # Initialize key variables
+    pending = defaultdict(list)
+    lasts = _lasts(table)
+
+    # Get the start of the source data of datapoints without summaries
+    firsts = _firsts(
+        source, [idx for idx in ends.keys() if idx not in lasts])
+
+    # Limit the number of summaries made per run
+    for idx, end in sorted(ends.items()):
+        if idx in lasts:
+            ts_start = lasts[idx] + step
+        elif idx in firsts:
+            ts_start = firsts[idx] - (firsts[idx] % step)
+        else:
+            continue
+        ts_stop = min(end - (end % step), ts_start + step * MAX_SUMMARIES)
+        if ts_stop > ts_start:
+            pending[(ts_start, ts_stop)].append(idx)
+
+    # Return
+    return pending
+
+
+def _lasts(table):
+    """Get the timestamp of the newest row of each datapoint in a table.
+
+    Args:
+        table: Table to query
+
+    Returns:
+        lasts: Dict of timestamps keyed by datapoint idx
+
+    """
+    # Query the database
+    database = db.Database()
+    session = database.session()
+    result = session.query(
+        table.idx_datapoint, func.max(table.timestamp)).group_by(
+            table.idx_datapoint)
+    lasts = {idx: timestamp for idx, timestamp in result}
+    database.close()
+
+    # Return
+    return lasts
+
+
+def _firsts(table, idx_list):
+    """Get the timestamp of the oldest row of datapoints in a table.
+
+    Args:
+        table: Table to query
+        idx_list: List of datapoint idx values
+
+    Returns:
+        firsts: Dict of timestamps keyed by datapoint idx
+
+    """
+    # Initialize key variables
+    firsts = {}
+
+    # Query the database
+    database = db.Database()
+    session = database.session()
+    for pointer in range(0, len(idx_list), CHUNK_SIZE):
+        result = session.query(
+            table.idx_datapoint, func.min(table.timestamp)).filter(
+                table.idx_datapoint.in_(
+                    idx_list[pointer:pointer + CHUNK_SIZE])).group_by(
+                        table.idx_datapoint)
+        firsts.update({idx: timestamp for idx, timestamp in result})
+    database.close()
+
+    # Return
+    return firsts
+
+
+def _read(idx_list, ts_start, ts_stop, table, getter):
+    """Read rows of many datapoints from a table.
+
+    Args:
+        idx_list: List of datapoint idx values
+        ts_start: Starting timestamp
+        ts_stop: Ending timestamp, not included
+        table: Table to query
+        getter: Function returning the value of a row
+
+    Returns:
+        data: Dict of dicts of values keyed by timestamp, keyed by
+            datapoint idx
+
+    """
+    # Initialize key variables
+    data = {}
+
+    # Query the database. Rows are fetched from the server in batches.
+    database = db.Database()
+    session = database.session()
+    result = session.query(table).filter(and_(
+        table.timestamp >= ts_start,
+        table.timestamp < ts_stop,
+        table.idx_datapoint.in_(idx_list))).order_by(
+            table.idx_datapoint, table.timestamp).yield_per(10000)
+    for idx, rows in groupby(
+            result, key=lambda instance: instance.idx_datapoint):
+        data[idx] = {
+            instance.timestamp: getter(instance) for instance in rows}
+    database.close()
+
+    # Return
+    return data
+
+
+def _rows(idx, summaries, ts_start, ts_stop, step):
+    """Create the rows of a summary table for a datapoint.
+
+    Periods without data get rows without samples, so that they are not
+    summarized again.
+
+    Args:
+        idx: Datapoint idx
+        summaries: Dict of (minimum, maximum, average, last, samples)
+            tuples keyed by timestamp
+        ts_start: Starting timestamp of the first period
+        ts_stop: Ending timestamp of the last period, not included
+        step: Number of seconds per period
+
+    Returns:
+        rows: List of dicts of column values keyed by column name
+
+    """
+    # Initialize key variables
+    rows = []
+    empty = (None, None, None, None, 0)
+
+    # Create rows
+    for timestamp in range(ts_start, ts_stop, step):
+        (value_min, value_max, value_avg, value_last, samples) = (
+            summaries.get(timestamp, empty))
+        rows.append({
+            'idx_datapoint': idx,
+            'timestamp': timestamp,
+            'value_min': value_min,
+            'value_max': value_max,
+            'value_avg': value_avg,
+            'value_last': value_last,
+            'samples': samples})
+
+    # Return
+    return rows
+
+
+def _insert(table, rows):
+    """Insert rows into a summary table.
+
+    Args:
+        table: Summary table
+        rows: List of dicts of column values keyed by column name
+
+    Returns:
+        count: Number of rows inserted
+
+    """
+    # Insert rows. Rows created by another run are skipped.
+    database = db.Database()
+    success = database.insert_ignore(table.__table__, rows, 1135, die=False)
+
+    # Return
+    if success is True:
+        count = len(rows)
+    else:
+        count = 0
+    return count
@@ -9,6 +9,7 @@ Manages connection pooling among other things.
 from infoset.utils import jm_general
 from infoset.db.db_orm import OID
 from infoset.db import db_oid
+from infoset.db import db_hostoid
 from infoset.db import db
 
 
@@ -25,6 +26,7 @@ def insert_oids(directory=None):
     # Initialize key variables
     root_dir = jm_general.root_directory()
     oids_directories = [('%s/infoset/metadata/oids') % (root_dir)]
+    updated = False
 
     # Create a list of existing agent labels, that are unique by definition
     agent_labels = []
@@ -59,3 +61,8 @@ def insert_oids(directory=None):
                     multiplier=multiplier)
                 database = db.Database()
                 database.add(record, 1091)
+                updated = True
+
+    # Make the snmp agent read the OIDs of its hosts again
+    if updated is True:
+        db_hostoid.invalidate()
@@ -7,6 +7,26 @@ import binascii
 
 from infoset.snmp.base_query import Query
 
+# Layer 1 columns of the ifTable and ifXTable
+LAYER1_OIDS = {
+    'ifDescr': '.1.3.6.1.2.1.2.2.1.2',
+    'ifAlias': '.1.3.6.1.2.1.31.1.1.1.18',
+    'ifSpeed': '.1.3.6.1.2.1.2.2.1.5',
+    'ifOperStatus': '.1.3.6.1.2.1.2.2.1.8',
+    'ifAdminStatus': '.1.3.6.1.2.1.2.2.1.7',
+    'ifType': '.1.3.6.1.2.1.2.2.1.3',
+    'ifName': '.1.3.6.1.2.1.31.1.1.1.1',
+    'ifIndex': '.1.3.6.1.2.1.2.2.1.1',
+    'ifPhysAddress': '.1.3.6.1.2.1.2.2.1.6',
+    'ifInOctets': '.1.3.6.1.2.1.2.2.1.10',
+    'ifOutOctets': '.1.3.6.1.2.1.2.2.1.16',
+    'ifInBroadcastPkts': '.1.3.6.1.2.1.31.1.1.1.3',
+    'ifOutBroadcastPkts': '.1.3.6.1.2.1.31.1.1.1.5',
+    'ifInMulticastPkts': '.1.3.6.1.2.1.31.1.1.1.2',
+    'ifOutMulticastPkts': '.1.3.6.1.2.1.31.1.1.1.4',
+    'ifLastChange': '.1.3.6.1.2.1.2.2.1.9'
+}
+
 
 def get_query():
     """Return this module's Query class."""
@@ -86,53 +106,20 @@ class IfQuery(Query):
         # Initialize key variables
         final = defaultdict(lambda: defaultdict(dict))
 
-        # Get interface ifDescr data
-        _get_data('ifDescr', self.ifdescr, final)
-
-        # Get interface ifAlias data
-        _get_data('ifAlias', self.ifalias, final)
-
-        # Get interface ifSpeed data
-        _get_data('ifSpeed', self.ifspeed, final)
-
-        # Get interface ifOperStatus data
-        _get_data('ifOperStatus', self.ifoperstatus, final)
-
-        # Get interface ifAdminStatus data
-        _get_data('ifAdminStatus', self.ifadminstatus, final)
-
-        # Get interface ifType data
-        _get_data('ifType', self.iftype, final)
-
-        # Get interface ifName data
-        _get_data('ifName', self.ifname, final)
-
-        # Get interface ifIndex data
-        _get_data('ifIndex', self.ifindex, final)
-
-        # Get interface ifPhysAddress data
-        _get_data('ifPhysAddress', self.ifphysaddress, final)
-
-        # Get interface ifInOctets data
-        _get_data('ifInOctets', self.ifinoctets, final)
-
-        # Get interface ifOutOctets data
-        _get_data('ifOutOctets', self.ifoutoctets, final)
-
-        # Get interface ifInBroadcastPkts data
-        _get_data('ifInBroadcastPkts', self.ifinbroadcastpkts, final)
-
-        # Get interface ifOutBroadcastPkts data
-        _get_data('ifOutBroadcastPkts', self.ifoutbroadcastpkts, final)
-
-        # Get interface ifInMulticastPkts data
-        _get_data('ifInMulticastPkts', self.ifinmulticastpkts, final)
-
-        # Get interface ifOutMulticastPkts data
-        _get_data('ifOutMulticastPkts', self.ifoutmulticastpkts, final)
-
-        # Get interface ifLastChange data
-        _get_data('ifLastChange', self.iflastchange, final)
+        # Get the columns of the ifTable and ifXTable with the same requests
+        rows = self.snmp_object.walk_columns(list(LAYER1_OIDS.values()))
+        for index, values in rows.items():
+            for title, oid in LAYER1_OIDS.items():
+                if oid not in values:
+                    continue
+
+                # Convert strings and MAC addresses
+                value = values[oid]
+                if title in ['ifDescr', 'ifAlias', 'ifName']:
+                    value = str(bytes(value), encoding='utf-8')
+                elif title == 'ifPhysAddress':
+                    value = binascii.hexlify(value).decode('utf-8').lower()
+                final[int(index)][title] = value
 
         # Return
         return final
@@ -597,23 +584,3 @@ class IfQuery(Query):
 
         # Return the interface descriptions
         return final
-
-
-def _get_data(title, func, dest):
-    """Populate dest with data from the given function.
-
-    Args:
-        title: The name of the data
-        func: The function which will return the data
-        dest: a dict which will store the data
-
-    Returns:
-        dest: The modified destination dict
-
-    """
-    # Get interface ifDescr data
-    values = func()
-    for key, value in values.items():
-        dest[key][title] = value
-
-    return dest
@@ -6,6 +6,19 @@ from collections import defaultdict
 
 from infoset.snmp.base_query import Query
 
+# Layer 1 columns of the ifXTable with 64 bit counters
+LAYER1_OIDS = {
+    'ifHCOutBroadcastPkts': '.1.3.6.1.2.1.31.1.1.1.13',
+    'ifHCOutMulticastPkts': '.1.3.6.1.2.1.31.1.1.1.12',
+    'ifHCOutUcastPkts': '.1.3.6.1.2.1.31.1.1.1.11',
+    'ifHCOutOctets': '.1.3.6.1.2.1.31.1.1.1.10',
+    'ifHCInBroadcastPkts': '.1.3.6.1.2.1.31.1.1.1.9',
+    'ifHCInMulticastPkts': '.1.3.6.1.2.1.31.1.1.1.8',
+    'ifHCInUcastPkts': '.1.3.6.1.2.1.31.1.1.1.7',
+    'ifHCInOctets': '.1.3.6.1.2.1.31.1.1.1.6',
+    'ifHighSpeed': '.1.3.6.1.2.1.31.1.1.1.15'
+}
+
 
 def get_query():
     """Return this module's Query class."""
@@ -87,32 +100,12 @@ class If64Query(Query):
         # Initialize key variables
         final = defaultdict(lambda: defaultdict(dict))
 
-        # Get interface ifHCOutBroadcastPkts data
-        _get_data('ifHCOutBroadcastPkts', self.ifhcoutbroadcastpkts, final)
-
-        # Get interface ifHCOutMulticastPkts data
-        _get_data('ifHCOutMulticastPkts', self.ifhcoutmulticastpkts, final)
-
-        # Get interface ifHCOutUcastPkts data
-        _get_data('ifHCOutUcastPkts', self.ifhcoutucastpkts, final)
-
-        # Get interface ifHCOutOctets data
-        _get_data('ifHCOutOctets', self.ifhcoutoctets, final)
-
-        # Get interface ifHCInBroadcastPkts data
-        _get_data('ifHCInBroadcastPkts', self.ifhcinbroadcastpkts, final)
-
-        # Get interface ifHCInMulticastPkts data
-        _get_data('ifHCInMulticastPkts', self.ifhcinmulticastpkts, final)
-
-        # Get interface ifHCInUcastPkts data
-        _get_data('ifHCInUcastPkts', self.ifhcinucastpkts, final)
-
-        # Get interface ifHCInOctets data
-        _get_data('ifHCInOctets', self.ifhcinoctets, final)
-
-        # Get interface ifHighSpeed data
-        _get_data('ifHighSpeed', self.ifhighspeed, final)
+        # Get the columns of the ifXTable with the same requests
+        rows = self.snmp_object.walk_columns(list(LAYER1_OIDS.values()))
+        for index, values in rows.items():
+            for title, oid in LAYER1_OIDS.items():
+                if oid in values:
+                    final[int(index)][title] = values[oid]
 
         # Return
         return final
@@ -329,23 +322,3 @@ class If64Query(Query):
 
         # Return
         return data_dict
-
-
-def _get_data(title, func, dest):
-    """Populate dest with data from the given function.
-
-    Args:
-        title: The name of the data
-        func: The function which will return the data
-        dest: a dict which will store the data
-
-    Returns:
-        dest: The modified destination dict
-
-    """
-    # Process data
-    values = func()
-    for key, value in values.items():
-        dest[key][title] = value
-
-    return dest
@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+"""Asynchronous SNMP manager class.
+
+Queries are made with the asyncio API of pysnmp so that many hosts can
+be polled concurrently from a single thread. The number of requests in
+flight is limited both per host and overall.
+
+"""
+
+# Standard libraries
+import os
+import asyncio
+
+# PIP libraries
+from pysnmp.entity.engine import SnmpEngine
+from pysnmp.proto import rfc1902
+from pysnmp.proto import rfc1905
+
+# The asyncio API of pysnmp. Older releases use the asyncio.coroutine
+# decorator, which was removed from Python 3.11.
+try:
+    from pysnmp.hlapi import asyncio as hlapi
+except AttributeError:
+    hlapi = None
+
+# Import project libraries
+from infoset.utils import log
+from infoset.utils import hidden
+from infoset.utils import jm_configuration
+from infoset.snmp import snmp_manager
+
+
+class Engine(object):
+    """Class shared by concurrent SNMP queries.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        session:
+        requests:
+        host:
+        close:
+    """
+
+    def __init__(self, config=None):
+        """Function for intializing the class.
+
+        Args:
+            config: Config object
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if config is None:
+            config = jm_configuration.Config()
+        self._engines = {}
+        self._sessions = {}
+        self._max_requests = config.agent_snmp_requests()
+        self._max_host_requests = config.agent_snmp_host_requests()
+
+        # Semaphores are created in the event loop that uses them
+        self._requests = None
+        self._hosts = {}
+
+    def session(self, snmp_params):
+        """Get the session used to query a host.
+
+        Sessions are kept for the life of the Engine. Their SNMP engines
+        are shared by the sessions using the same credentials.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+
+        Returns:
+            result: snmp_manager.Session object
+
+        """
+        # Initialize key variables
+        credentials = snmp_manager._credentials_key(snmp_params)
+        key = (
+            snmp_params['snmp_hostname'], snmp_params['snmp_port'],
+            credentials)
+
+        # Create the session
+        if key not in self._sessions:
+            if credentials not in self._engines:
+                self._engines[credentials] = SnmpEngine()
+            self._sessions[key] = snmp_manager.Session(
+                snmp_params, self._engines[credentials],
+                target=hlapi.UdpTransportTarget)
+
+        # Return
+        result = self._sessions[key]
+        return result
+
+    def requests(self):
+        """Get the semaphore limiting the number of requests in flight.
+
+        Args:
+            None
+
+        Returns:
+            semaphore: asyncio.Semaphore object
+
+        """
+        # Return
+        if self._requests is None:
+            self._requests = asyncio.Semaphore(self._max_requests)
+        semaphore = self._requests
+        return semaphore
+
+    def host(self, hostname):
+        """Get the semaphore limiting the requests in flight to a host.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            semaphore: asyncio.Semaphore object
+
+        """
+        # Return
+        if hostname not in self._hosts:
+            self._hosts[hostname] = asyncio.Semaphore(
+                self._max_host_requests)
+        semaphore = self._hosts[hostname]
+        return semaphore
+
+    def close(self):
+        """Close the transports opened by the engine.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Close
+        for snmp_engine in self._engines.values():
+            if snmp_engine.transportDispatcher is not None:
+                snmp_engine.transportDispatcher.closeDispatcher()
+
+
+class Validate(object):
+    """Class Verify SNMP data.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        credentials:
+    """
+
+    def __init__(self, hostname, snmp_config, engine):
+        """Function for intializing the class.
+
+        Args:
+            hostname: Hostname
+            snmp_config: List of dicts of SNMP credentials to try
+            engine: Engine object
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.snmp_config = snmp_config
+        self.hostname = hostname
+        self.engine = engine
+
+    async def credentials(self):
+        """Determine the valid SNMP credentials for a host.
+
+        Args:
+            None
+
+        Returns:
+            credentials: Dict of snmp_credentials to use
+
+        """
+        # Initialize key variables
+        credentials = None
+        group_name = None
+
+        # Determine whether cached value exists
+        filez = hidden.File()
+        dirz = hidden.Directory()
+        snmp_dir = dirz.snmp_cache()
+        filename = filez.snmp_cache(self.hostname)
+
+        # Create UID directory / file if not yet created
+        if os.path.exists(snmp_dir) is False:
+            os.makedirs(snmp_dir, exist_ok=True)
+        if os.path.isfile(filename) is True:
+            with open(filename) as f_handle:
+                group_name = f_handle.readline()
+
+        # Try the cached credentials first, then the rest
+        if group_name is not None:
+            credentials = await self._credentials(group_name)
+        if credentials is None:
+            credentials = await self._credentials()
+
+        # Update cache if found
+        if credentials is not None:
+            snmp_manager._update_cache(filename, credentials['group_name'])
+
+        # Return
+        return credentials
+
+    async def _credentials(self, group=None):
+        """Determine the valid SNMP credentials for a host.
+
+        Args:
+            group: SNMP group name to try
+
+        Returns:
+            credentials: Dict of snmp_credentials to use
+
+        """
+        # Probe device with all SNMP options. The configuration is shared
+        # by concurrent queries, so it is copied before it is updated.
+        for params_dict in self.snmp_config:
+            if (group is not None) and (params_dict['group_name'] != group):
+                continue
+            params_dict = dict(params_dict)
+            params_dict['snmp_hostname'] = self.hostname
+
+            # Verify connectivity
+            query = Interact(params_dict, self.engine)
+            if await query.contactable() is True:
+                return params_dict
+
+        # Return
+        return None
+
+
+class Interact(object):
+    """Class Gets SNMP data concurrently.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        hostname:
+        contactable:
+        sysobjectid:
+        swalk:
+        walk:
+        walk_columns:
+        get:
+        query:
+    """
+
+    def __init__(self, snmp_parameters, engine):
+        """Function for intializing the class.
+
+        Args:
+            snmp_parameters: Dict of SNMP parameters
+            engine: Engine object
+
+        Returns:
+            None
+
+        """
+        # Fail if snmp_parameters dictionary is empty. Exceptions are
+        # raised instead of dying so that other hosts are still polled.
+        if not snmp_parameters:
+            log_message = ('SNMP parameters provided are blank. '
+                           'Non existent host?')
+            raise ValueError(log_message)
+
+        # Fail if the SNMP version is unknown
+        if snmp_parameters['snmp_version'] is None:
+            log_message = (
+                'SNMP version is "None". Non existent host? - %s'
+                '') % (snmp_parameters['snmp_hostname'])
+            raise ValueError(log_message)
+
+        # Initialize key variables
+        self.snmp_params = snmp_parameters
+        self.engine = engine
+
+    def hostname(self):
+        """Return SNMP hostname for the interaction.
+
+        Args:
+            None
+
+        Returns:
+            hostname: SNMP hostname
+
+        """
+        # Initialize key variables
+        hostname = self.snmp_params['snmp_hostname']
+
+        # Return
+        return hostname
+
+    async def contactable(self):
+        """Check if device is contactable.
+
+        Args:
+            None
+
+        Returns:
+            contactable: True if a contactable
+
+        """
+        # Define key variables
+        contactable = False
+
+        # Try to reach device
+        try:
+            # If we can poll the SNMP sysObjectID,
+            # then the device is contactable
+            result = await self.sysobjectid(connectivity_check=True)
+            if bool(result) is True:
+                contactable = True
+
+        except Exception as _:
+            # Not contactable
+            contactable = False
+
+        # Return
+        return contactable
+
+    async def sysobjectid(self, connectivity_check=False):
+        """Get the sysObjectID of the device.
+
+        Args:
+            connectivity_check:
+                Set if testing for connectivity. Some session
+                errors are ignored so that a null result is returned
+        Returns:
+            object_id: sysObjectID value
+
+        """
+        # Initialize key variables
+        oid = '.1.3.6.1.2.1.1.2.0'
+        object_id = None
+
+        # Get sysObjectID
+        results = await self.get(oid, connectivity_check=connectivity_check)
+        if bool(results) is True:
+            object_id = ('.%s') % (results[oid].decode('utf-8'))
+
+        # Return
+        return object_id
+
+    async def swalk(self, oid_to_get, normalized=False):
+        """Do a failsafe SNMPwalk.
+
+        Args:
+            oid_to_get: OID to get
+            normalized: If True, then return results as a dict keyed by
+                only the last node of an OID, otherwise return results
+                keyed by the entire OID string.
+
+        Returns:
+            results: Results
+
+        """
+        # Initialize key variables
+        results = {}
+
+        # Process data
+        data = await self.walk(
+            oid_to_get, normalized=normalized, connectivity_check=True)
+
+        # If oid not found then return blank dict
+        for value in data.values():
+            if isinstance(value, rfc1905.NoSuchInstance) is False:
+                results = data
+            # If nothing is retuned, then fail
+            elif bool(value) is True:
+                results = data
+            break
+
+        # Return
+        return results
+
+    async def walk(
+            self, oid_to_get, normalized=False, connectivity_check=False):
+        """Do an SNMPwalk.
+
+        Args:
+            oid_to_get: OID to walk
+            normalized: If True, then return results as a dict keyed by
+                only the last node of an OID, otherwise return results
+                keyed by the entire OID string.
+            connectivity_check:
+                Set if testing for connectivity. Some session
+                errors are ignored so that a null result is returned
+
+        Returns:
+            Dictionary of tuples (OID, value)
+
+        """
+        return await self.query(
+            oid_to_get, get=False,
+            connectivity_check=connectivity_check, normalized=normalized)
+
+    async def walk_columns(self, oids, safe=False):
+        """Walk several columns of a table with the same requests.
+
+        Args:
+            oids: List of OIDs of table columns
+            safe: If True, return blank results instead of failing
+                if the device can't be contacted
+
+        Returns:
+            rows: Dict of dicts of values keyed by column OID, keyed by
+                the index of each row
+
+        """
+        # Walk
+        results = await self.query(oids, get=False, connectivity_check=safe)
+
+        # Return
+        rows = snmp_manager.columns(oids, results)
+        return rows
+
+    async def get(
+            self, oid_to_get, connectivity_check=False, normalized=False):
+        """Do an SNMPget.
+
+        Args:
+            oid_to_get: OID to get
+            normalized: If True, then return results as a dict keyed by
+                only the last node of an OID, otherwise return results
+                keyed by the entire OID string.
+            connectivity_check:
+                Set if testing for connectivity. Some session
+                errors are ignored so that a null result is returned
+
+        Returns:
+            Dictionary of tuples (OID, value)
+
+        """
+        return await self.query(
+            oid_to_get, get=True,
+            connectivity_check=connectivity_check, normalized=normalized)
+
+    async def query(
+            self, oid_to_get, get=False, connectivity_check=False,
+            normalized=False):
+        """Do an SNMP query.
+
+        Args:
+            oid_to_get: OID to walk, or a list of OIDs to get or walk
+                with the same requests
+            get: Flag determining whether to do a GET or WALK
+            normalized: If True, then return results as a dict keyed by
+                only the last node of an OID, otherwise return results
+                keyed by the entire OID string.
+            connectivity_check:
+                Set if testing for connectivity. Some session
+                errors are ignored so that a null result is returned
+
+        Returns:
+            Dictionary of tuples (OID, value). Blank if the query failed.
+
+        """
+        # Check if OIDs are valid
+        if isinstance(oid_to_get, list) is True:
+            oids = oid_to_get
+        else:
+            oids = [oid_to_get]
+        for oid in oids:
+            valid_format = snmp_manager.oid_valid_format(oid)
+            if valid_format is False:
+                log_message = ('OID %s has an invalid format') % (oid)
+                raise ValueError(log_message)
+
+        # Fill the results object by getting OID data
+        try:
+            if get is True:
+                (session_error_string, session_error_status,
+                 session_error_index, var_binds) = await self._request(
+                     hlapi.getCmd, *[_object_type(oid) for oid in oids])
+            else:
+                (session_error_string, session_error_status,
+                 session_error_index, var_binds) = await self._walk(oids)
+
+        except Exception as exception_error:
+            # Check for errors and print out results
+            log_message = (
+                'Error occurred during SNMPget on host '
+                'OID %s from %s: (%s)') % (oid_to_get,
+                                           self.hostname(),
+                                           exception_error)
+            log.log2warn(1139, log_message)
+            return {}
+
+        # Return blank results on error. Unlike snmp_manager, this doesn't
+        # die, so one host can't stop the polling of the others.
+        if session_error_string:
+            log_message = (
+                'Error occurred for OID %s on host %s: '
+                '(%s) ErrorNum: %s, ErrorInd: '
+                '%s') % (oid_to_get,
+                         self.hostname(),
+                         session_error_string,
+                         session_error_status, session_error_index)
+
+            if snmp_manager._ignore_error(
+                    connectivity_check=connectivity_check,
+                    session_error_status=session_error_status,
+                    session_error_index=session_error_index) is False:
+                log.log2warn(1140, log_message)
+            return {}
+
+        # Format results
+        return_results = snmp_manager._format_results(
+            normalized=normalized, get=get, var_binds=var_binds)
+
+        # Return
+        return return_results
+
+    async def _walk(self, oids):
+        """Walk OIDs with successive GETBULK or GETNEXT requests.
+
+        Args:
+            oids: List of OIDs to walk with the same requests
+
+        Returns:
+            result: Tuple of (error_indication, error_status,
+                error_index, var_binds). var_binds is a list of rows of
+                (OID, value) tuples.
+
+        """
+        # Initialize key variables
+        var_binds = []
+        prefixes = [rfc1902.ObjectName(oid[1:]) for oid in oids]
+        names = list(prefixes)
+        active = list(range(len(oids)))
+        max_repetitions = snmp_manager._max_repetitions(self.snmp_params)
+
+        # Request rows until the end of the subtree of every OID
+        while bool(active) is True:
+            requested = list(active)
+            object_types = [
+                _object_type(names[column]) for column in requested]
+            if max_repetitions > 0:
+                (error_indication, error_status,
+                 error_index, var_bind_table) = await self._request(
+                     hlapi.bulkCmd, 0, max_repetitions, *object_types)
+            else:
+                (error_indication, error_status,
+                 error_index, var_bind_table) = await self._request(
+                     hlapi.nextCmd, *object_types)
+
+            # Return what was found on error
+            if error_indication or error_status:
+                return (error_indication, error_status, error_index,
+                        var_binds)
+
+            # Stop walking an OID at the end of its subtree, or if the
+            # agent is not returning increasing OIDs. Incomplete rows
+            # are requested again.
+            found = False
+            for var_row in var_bind_table:
+                if len(var_row) != len(requested):
+                    break
+                row = []
+                for column, (name, value) in zip(requested, var_row):
+                    if column not in active:
+                        continue
+                    if (prefixes[column].isPrefixOf(name) is False) or (
+                            isinstance(
+                                value, rfc1905.EndOfMibView) is True) or (
+                                    name <= names[column]):
+                        active.remove(column)
+                        continue
+                    row.append((name, value))
+                    names[column] = name
+                if bool(row) is True:
+                    var_binds.append(row)
+                    found = True
+
+            # Nothing more to get
+            if found is False:
+                break
+
+        # Return
+        return (None, 0, 0, var_binds)
+
+    async def _request(self, command, *var_binds):
+        """Send a request within the concurrency limits.
+
+        Args:
+            command: pysnmp asyncio command coroutine
+            var_binds: Arguments of the command after its context
+
+        Returns:
+            result: Result of the command
+
+        """
+        # Get the engine, transport and auth objects of the host
+        session = self.engine.session(self.snmp_params)
+
+        # Wait for the host, then for any request to finish
+        async with self.engine.host(self.hostname()):
+            async with self.engine.requests():
+                result = await command(
+                    session.snmp_object, session.authentication_object,
+                    session.transport_object, hlapi.ContextData(),
+                    *var_binds, lookupMib=False)
+
+        # Return
+        return result
+
+
+def available():
+    """Determine whether the asyncio API of pysnmp can be used.
+
+    Args:
+        None
+
+    Returns:
+        result: True if available
+
+    """
+    # Return
+    result = hlapi is not None
+    return result
+
+
+def credentials(hostnames, snmp_config):
+    """Determine the valid SNMP credentials of many hosts concurrently.
+
+    Args:
+        hostnames: List of hostnames
+        snmp_config: ConfigSNMP object
+
+    Returns:
+        result: Dict of credentials keyed by hostname. Credentials are
+            None if the host could not be contacted.
+
+    """
+    # Initialize key variables
+    engine = Engine()
+    snmp_auth = snmp_config.snmp_auth()
+
+    async def _credentials():
+        """Get the credentials of all hosts."""
+        return await asyncio.gather(*[
+            Validate(hostname, snmp_auth, engine).credentials()
+            for hostname in hostnames])
+
+    # Query the hosts
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        found = loop.run_until_complete(_credentials())
+    finally:
+        engine.close()
+        asyncio.set_event_loop(None)
+        loop.close()
+
+    # Return
+    result = dict(zip(hostnames, found))
+    return result
+
+
+def _object_type(oid):
+    """Create the variable binding requesting an OID.
+
+    Args:
+        oid: OID string, or ObjectName object
+
+    Returns:
+        result: ObjectType object
+
+    """
+    # Return
+    result = hlapi.ObjectType(hlapi.ObjectIdentity(oid))
+    return result
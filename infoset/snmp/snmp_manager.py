@@ -2,6 +2,7 @@
 """SNMP manager class."""
 
 import os
+import threading
 
 from pysnmp.entity.rfc3413.oneliner import cmdgen
 from pysnmp.proto import rfc1905
@@ -13,6 +14,12 @@ from infoset.utils import log
 from infoset.utils import hidden
 from infoset.snmp import jm_iana_enterprise
 
+# Default number of table rows requested per GETBULK PDU
+MAX_REPETITIONS = 25
+
+# Sessions of each thread. SNMP engines are not thread safe.
+_THREAD_DATA = threading.local()
+
 
 class Validate(object):
     """Class Verify SNMP data.
@@ -125,6 +132,41 @@ class Validate(object):
         return credentials
 
 
+class Session(object):
+    """Class holding the objects used to query a host.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+    """
+
+    def __init__(
+            self, snmp_params, snmp_object,
+            target=cmdgen.UdpTransportTarget):
+        """Function for intializing the class.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+            snmp_object: SNMP engine object shared by the sessions using
+                the same credentials
+            target: Class of the transport object
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.snmp_object = snmp_object
+        self.transport_object = target(
+            (snmp_params['snmp_hostname'], snmp_params['snmp_port']))
+        self.authentication_object = _get_auth_object(snmp_params)
+
+
 class Interact(object):
     """Class Gets SNMP data.
 
@@ -138,6 +180,7 @@ class Interact(object):
         __init__:
         oid_exists:
         walk:
+        walk_columns:
         get:
         query:
     """
@@ -361,6 +404,9 @@ class Interact(object):
     def walk(self, oid_to_get, normalized=False, connectivity_check=False):
         """Do an SNMPwalk.
 
+        GETBULK requests are used unless the credentials are for SNMPv1
+        or snmp_max_repetitions is zero.
+
         Args:
             oid_to_get: OID to walk
             normalized: If True, then return results as a dict keyed by
@@ -381,6 +427,30 @@ class Interact(object):
             oid_to_get, get=False,
             connectivity_check=connectivity_check, normalized=normalized)
 
+    def walk_columns(self, oids, safe=False):
+        """Walk several columns of a table with the same requests.
+
+        Each request gets the next rows of all the columns, so the
+        number of requests doesn't grow with the number of columns.
+
+        Args:
+            oids: List of OIDs of table columns
+            safe: If True, return blank results instead of failing
+                if the device can't be contacted
+
+        Returns:
+            rows: Dict of dicts of values keyed by column OID, keyed by
+                the index of each row. The index is the part of the OID
+                of a value that follows the OID of its column.
+
+        """
+        # Walk
+        results = self.query(oids, get=False, connectivity_check=safe)
+
+        # Return
+        rows = columns(oids, results)
+        return rows
+
     def get(self, oid_to_get, connectivity_check=False, normalized=False):
         """Do an SNMPget.
 
@@ -410,7 +480,8 @@ class Interact(object):
         """Do an SNMP query.
 
         Args:
-            oid_to_get: OID to walk
+            oid_to_get: OID to walk, or a list of OIDs to get or walk
+                with the same requests
             get: Flag determining whether to do a GET or WALK
             normalized: If True, then return results as a dict keyed by
                 only the last node of an OID, otherwise return results
@@ -430,21 +501,25 @@ class Interact(object):
         return_results = {}
         snmp_params = self.snmp_params
 
-        # Check if OID is valid
-        valid_format = oid_valid_format(oid_to_get)
-        if valid_format is False:
-            log_message = ('OID %s has an invalid format') % (oid_to_get)
-            log.log2die(1020, log_message)
-
-        # Create the object
-        snmp_object = cmdgen.CommandGenerator()
-
-        # Setup Transport object
-        transport_object = cmdgen.UdpTransportTarget(
-            (snmp_params['snmp_hostname'], snmp_params['snmp_port']))
-
-        # Create the auth object
-        authentication_object = _get_auth_object(snmp_params)
+        # Check if OIDs are valid
+        if isinstance(oid_to_get, list) is True:
+            oids = oid_to_get
+        else:
+            oids = [oid_to_get]
+        for oid in oids:
+            valid_format = oid_valid_format(oid)
+            if valid_format is False:
+                log_message = ('OID %s has an invalid format') % (oid)
+                log.log2die(1020, log_message)
+
+        # Get the engine, transport and auth objects of the host
+        host_session = session(snmp_params)
+        snmp_object = host_session.snmp_object
+        transport_object = host_session.transport_object
+        authentication_object = host_session.authentication_object
+
+        # Get the number of rows to request per PDU when walking
+        max_repetitions = _max_repetitions(snmp_params)
 
         # Fill the results object by getting OID data
         try:
@@ -453,12 +528,18 @@ class Interact(object):
                 (session_error_string, session_error_status,
                  session_error_index, var_binds) = \
                     snmp_object.getCmd(
-                        authentication_object, transport_object, oid_to_get)
+                        authentication_object, transport_object, *oids)
+            elif max_repetitions > 0:
+                (session_error_string, session_error_status,
+                 session_error_index, var_binds) = \
+                    snmp_object.bulkCmd(
+                        authentication_object, transport_object,
+                        0, max_repetitions, *oids)
             else:
                 (session_error_string, session_error_status,
                  session_error_index, var_binds) = \
                     snmp_object.nextCmd(
-                        authentication_object, transport_object, oid_to_get)
+                        authentication_object, transport_object, *oids)
 
         # Do something here
         except Exception as exception_error:
@@ -499,6 +580,122 @@ class Interact(object):
         return return_results
 
 
+def session(snmp_params):
+    """Get the session of the current thread for querying a host.
+
+    Sessions are kept until close() is called by the thread, usually at
+    the end of a poll. Their SNMP engines are shared by the sessions
+    using the same credentials, and remember the results of SNMPv3
+    engine discovery and key localization.
+
+    Args:
+        snmp_params: Dict of SNMP parameters
+
+    Returns:
+        result: Session object
+
+    """
+    # Initialize key variables
+    credentials = _credentials_key(snmp_params)
+    key = (
+        snmp_params['snmp_hostname'], snmp_params['snmp_port'], credentials)
+
+    # Create the caches of the thread
+    if hasattr(_THREAD_DATA, 'sessions') is False:
+        _THREAD_DATA.sessions = {}
+        _THREAD_DATA.engines = {}
+
+    # Create the session
+    if key not in _THREAD_DATA.sessions:
+        if credentials not in _THREAD_DATA.engines:
+            _THREAD_DATA.engines[credentials] = cmdgen.CommandGenerator()
+        _THREAD_DATA.sessions[key] = Session(
+            snmp_params, _THREAD_DATA.engines[credentials])
+
+    # Return
+    result = _THREAD_DATA.sessions[key]
+    return result
+
+
+def close():
+    """Close the sessions of the current thread.
+
+    Threads of agents are kept between polls, so their sessions must be
+    closed to release the sockets of the SNMP engines.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Close the transports of the engines
+    for snmp_object in getattr(_THREAD_DATA, 'engines', {}).values():
+        snmp_engine = snmp_object.snmpEngine
+        if snmp_engine.transportDispatcher is not None:
+            snmp_engine.transportDispatcher.closeDispatcher()
+            snmp_engine.unregisterTransportDispatcher()
+
+    # Forget the sessions
+    _THREAD_DATA.__dict__.clear()
+
+
+def _credentials_key(snmp_params):
+    """Get the values of SNMP parameters that make up the credentials.
+
+    SNMP engines store one set of keys per SNMPv3 user name, so groups
+    with the same user name must not share an engine.
+
+    Args:
+        snmp_params: Dict of SNMP parameters
+
+    Returns:
+        key: Tuple of values
+
+    """
+    # Return
+    key = tuple([snmp_params.get(name) for name in [
+        'snmp_version', 'snmp_community', 'snmp_secname',
+        'snmp_authprotocol', 'snmp_authpassword',
+        'snmp_privprotocol', 'snmp_privpassword']])
+    return key
+
+
+def columns(oids, results):
+    """Align the results of walking table columns by row.
+
+    Args:
+        oids: List of OIDs of table columns
+        results: Dict of values keyed by OID
+
+    Returns:
+        rows: Dict of dicts of values keyed by column OID, keyed by the
+            index of each row
+
+    """
+    # Initialize key variables
+    rows = {}
+
+    # Match the most specific column first
+    prefixes = [
+        (('%s.') % (oid), oid) for oid in sorted(
+            oids, key=len, reverse=True)]
+
+    # Align values
+    for key, value in results.items():
+        for prefix, oid in prefixes:
+            if key.startswith(prefix) is True:
+                index = key[len(prefix):]
+                if index not in rows:
+                    rows[index] = {}
+                rows[index][oid] = value
+                break
+
+    # Return
+    return rows
+
+
 def _process_error(
         connectivity_check=False, session_error_status=None,
         session_error_index=None, get=False,
@@ -520,6 +717,41 @@ def _process_error(
     # Initialize key variables
     results = {}
 
+    # Return blank results for errors that are expected
+    if _ignore_error(
+            connectivity_check=connectivity_check,
+            session_error_status=session_error_status,
+            session_error_index=session_error_index) is True:
+        return results
+
+    # Otherwise Fail
+    if get is True:
+        action_taken = 'SNMPget'
+    else:
+        action_taken = 'SNMPwalk'
+    log_message = ('%s - %s') % (action_taken, log_message)
+    log.log2die(1003, log_message)
+
+
+def _ignore_error(
+        connectivity_check=False, session_error_status=None,
+        session_error_index=None):
+    """Determine whether an error should return blank results.
+
+    Args:
+        connectivity_check:
+                Set if testing for connectivity. Some session
+                errors are ignored so that a null result is returned
+        session_error_status: Error status
+        session_error_index: Error index
+
+    Returns:
+        ignore: True if the error should be ignored
+
+    """
+    # Initialize key variables
+    ignore = False
+
     # Timeout contacting device
     # (Timeout as OID requested does not exist, not because the
     # device is uncontactable)
@@ -530,30 +762,21 @@ def _process_error(
     if connectivity_check is False:
         if (session_error_status == 0) and (
                 session_error_index == -24):
-
-            # Return blank results
-            return results
+            ignore = True
 
     if connectivity_check is True:
         # Bad SNMP authentication during authentication check
         if (session_error_status == 0) and (
                 session_error_index == -4):
-            # Return blank results
-            return results
+            ignore = True
 
         # Device completely off the air (SNMP timeout)
         if (session_error_status == 0) and (
                 session_error_index == 0):
-            # Return blank results
-            return results
+            ignore = True
 
-    # Otherwise Fail
-    if get is True:
-        action_taken = 'SNMPget'
-    else:
-        action_taken = 'SNMPwalk'
-    log_message = ('%s - %s') % (action_taken, log_message)
-    log.log2die(1003, log_message)
+    # Return
+    return ignore
 
 
 def _format_results(normalized=False, get=False, var_binds=None):
@@ -588,9 +811,12 @@ def _format_results(normalized=False, get=False, var_binds=None):
             oid_fixed = ('.%s') % (oid_returned)
             return_results[oid_fixed] = _convert(value)
     else:
-        # Returns a list of tuples
+        # Returns a list of tuples. Walks report the end of the table
+        # as endOfMibView values that are tagged with the preceding OID.
         for var_row in var_binds:
             for oid_returned, value in var_row:
+                if isinstance(value, rfc1905.EndOfMibView) is True:
+                    continue
                 oid_fixed = ('.%s') % (oid_returned)
                 return_results[oid_fixed] = _convert(value)
     # ####################################################################
@@ -709,6 +935,29 @@ def _get_auth_object(snmp_params):
     return authentication_object
 
 
+def _max_repetitions(snmp_params):
+    """Get the number of rows to request per GETBULK PDU.
+
+    Args:
+        snmp_params: Dict of SNMP parameters
+
+    Returns:
+        max_repetitions: Number of rows. Zero if GETBULK is not to be used.
+
+    """
+    # GETBULK is not supported by SNMPv1
+    if snmp_params['snmp_version'] == 1:
+        max_repetitions = 0
+    else:
+        max_repetitions = snmp_params.get('snmp_max_repetitions')
+        if max_repetitions is None:
+            max_repetitions = MAX_REPETITIONS
+        max_repetitions = max(0, int(max_repetitions))
+
+    # Return
+    return max_repetitions
+
+
 def _normalized_walk(walk_results):
     """Normalize the results of an walk.
 
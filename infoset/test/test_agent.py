@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Test the agent module."""
+
+import asyncio
+import sys
+import unittest
+
+from infoset.agents import agent as testimport
+
+
+class Poller(object):
+    """Poller with a query_async coroutine."""
+
+    def __init__(self, fatal=False):
+        """Initialize the class.
+
+        Args:
+            fatal: If True, the query calls sys.exit()
+
+        Returns:
+            None
+
+        """
+        self.fatal = fatal
+        self.finished = False
+
+    async def query_async(self):
+        """Query a host."""
+        await asyncio.sleep(0)
+        if self.fatal is True:
+            sys.exit(2)
+        self.finished = True
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test__gather(self):
+        """Testing function _gather."""
+        # A fatal error only stops its own poller
+        pollers = [Poller(fatal=True), Poller()]
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(testimport._gather(pollers))
+        finally:
+            loop.close()
+        self.assertIsInstance(results[0], RuntimeError)
+        self.assertEqual(results[1], None)
+        self.assertEqual(pollers[1].finished, True)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Test the db module."""
+
+import unittest
+
+from infoset.cache import benchmark
+from infoset.db import db as testimport
+from infoset.db.db_orm import Datapoint
+
+
+class TestDatabase(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Use an SQLite database."""
+        cls.pool = testimport.POOL
+        benchmark.database()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restore the database pool."""
+        testimport.POOL = cls.pool
+
+    def _ids(self):
+        """Get the DIDs of all datapoints.
+
+        Args:
+            None
+
+        Returns:
+            ids: Sorted list of DIDs
+
+        """
+        session = testimport.Database().session()
+        ids = sorted([row.id for row in session.query(Datapoint.id)])
+        testimport.Database().close()
+        return ids
+
+    def test_insert_ignore(self):
+        """Testing method insert_ignore."""
+        # Initialize key variables
+        database = testimport.Database()
+        table = Datapoint.__table__
+        data_list = [{'id': str(did).encode()} for did in range(5)]
+
+        # Rows are inserted in chunks
+        self.assertTrue(database.insert_ignore(
+            table, data_list[:3], 1000, chunk_size=2))
+        self.assertEqual(self._ids(), [b'0', b'1', b'2'])
+
+        # Duplicates are skipped, including duplicates in other chunks
+        # and at the boundary between chunks
+        data_list = data_list + [{'id': b'4'}, {'id': b'1'}]
+        self.assertTrue(database.insert_ignore(
+            table, data_list, 1000, chunk_size=3))
+        self.assertEqual(self._ids(), [b'0', b'1', b'2', b'3', b'4'])
+
+        # Nothing to do
+        self.assertTrue(database.insert_ignore(table, [], 1000))
+
+        # Invalid chunk sizes are rejected
+        for chunk_size in [0, -1]:
+            self.assertFalse(database.insert_ignore(
+                table, data_list, 1000, die=False, chunk_size=chunk_size))
+            with self.assertRaises(SystemExit):
+                database.insert_ignore(
+                    table, data_list, 1000, chunk_size=chunk_size)
+
+    def test_update_many(self):
+        """Testing method update_many."""
+        # Initialize key variables
+        database = testimport.Database()
+        table = Datapoint.__table__
+        ids = [('update_%s' % (item)).encode() for item in range(5)]
+        self.assertTrue(database.insert_ignore(
+            table, [{'id': did, 'last_timestamp': 300, 'uncharted_value': b'a'}
+                    for did in ids], 1000))
+        session = testimport.Database().session()
+        idx_list = [row.idx for row in session.query(Datapoint.idx).filter(
+            Datapoint.id.in_(ids)).order_by(Datapoint.idx)]
+        testimport.Database().close()
+
+        # Rows span more than one chunk. The first row only gets a new
+        # value for one of the columns, and the last row isn't updated.
+        updates = {
+            'last_timestamp': {idx: idx * 600 for idx in idx_list[:4]},
+            'uncharted_value': {idx: b'b' for idx in idx_list[1:4]}}
+        self.assertTrue(database.update_many(
+            table, 'idx', updates, 1000, chunk_size=2))
+
+        # Verify
+        session = testimport.Database().session()
+        rows = {row.idx: (row.last_timestamp, row.uncharted_value)
+                for row in session.query(Datapoint).filter(
+                    Datapoint.idx.in_(idx_list))}
+        testimport.Database().close()
+        self.assertEqual(rows[idx_list[0]], (idx_list[0] * 600, b'a'))
+        for idx in idx_list[1:4]:
+            self.assertEqual(rows[idx], (idx * 600, b'b'))
+        self.assertEqual(rows[idx_list[4]], (300, b'a'))
+
+        # Nothing to do
+        self.assertTrue(database.update_many(table, 'idx', {}, 1000))
+        self.assertTrue(database.update_many(
+            table, 'idx', {'last_timestamp': {}}, 1000))
+
+        # Remove the rows so that other tests don't see them
+        session = testimport.Database().session()
+        session.query(Datapoint).filter(Datapoint.idx.in_(idx_list)).delete(
+            synchronize_session=False)
+        session.commit()
+        testimport.Database().close()
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Test the db_data module."""
+
+import itertools
+import unittest
+import random
+
+from infoset.db import db_data as testimport
+
+
+class TestCounter(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def _compare(self, data, base_type, ts_start, ts_stop, step=300):
+        """Compare the results of both counter conversions.
+
+        Args:
+            data: Dict of values keyed by timestamp
+            base_type: Base type of the datapoint
+            ts_start: Starting timestamp
+            ts_stop: Ending timestamp
+            step: Number of seconds between values
+
+        Returns:
+            None
+
+        """
+        # Compare values and types
+        expected = testimport._counter_loop(
+            data, base_type, ts_start, ts_stop, step=step)
+        result = testimport._counter_array(
+            data, base_type, ts_start, ts_stop, step=step)
+        self.assertEqual(list(result.items()), list(expected.items()))
+        for timestamp, value in result.items():
+            self.assertEqual(type(value), type(expected[timestamp]))
+
+    def test_counter_array(self):
+        """Testing function _counter_array."""
+        ts_start = 600 * 1000
+        ts_stop = ts_start + 600 * 200
+
+        for (base_type, step) in itertools.product([1, 32, 64], [300, 600]):
+            # No data
+            self._compare({}, base_type, ts_start, ts_stop, step=step)
+
+            # Random data with gaps and counter wraps
+            for _ in range(20):
+                data = {}
+                for timestamp in range(ts_start, ts_stop + step, step):
+                    if random.random() < 0.1:
+                        continue
+                    data[timestamp] = float(random.randint(0, 1000000))
+                self._compare(data, base_type, ts_start, ts_stop, step=step)
+
+    def test_counter(self):
+        """Testing function _counter with data off the 300s grid."""
+        data = {300: 1.0, 600: 2.0, 750: 4.0, 900: 5.0}
+        self.assertEqual(
+            testimport._counter_array(data, 32, 300, 900), None)
+        self.assertEqual(
+            testimport._counter(data, 32, 300, 900),
+            testimport._counter_loop(data, 32, 300, 900))
+
+    def test_counter_since(self):
+        """Testing function _counter_since."""
+        data = {600: 2.0, 900: 5.0, 1200: 11.0}
+
+        # Only newer values are returned, without zeros after the last one
+        self.assertEqual(testimport._counter_since(
+            data, 32, 600, 1800, 600), {900: 0.01, 1200: 0.02})
+        self.assertEqual(testimport._counter_since(
+            data, 1, 600, 1800, 900), {1200: 11.0})
+        self.assertEqual(testimport._counter_since(
+            {}, 32, 1200, 1800, 1200), {})
+
+        # All values are returned without "since"
+        self.assertEqual(
+            testimport._counter_since(data, 1, 600, 1500, None),
+            {600: 2.0, 900: 5.0, 1200: 11.0, 1500: 0})
+
+    def test_rates(self):
+        """Testing function rates."""
+        data = {300: 1.0, 600: 4.0, 900: None, 1200: 10.0, 1500: 13.0}
+        self.assertEqual(testimport.rates(data, 1), {
+            300: 1.0, 600: 4.0, 1200: 10.0, 1500: 13.0})
+        self.assertEqual(testimport.rates(data, 32), {
+            600: 0.01, 1500: 0.01})
+        self.assertEqual(testimport.rates({}, 64), {})
+
+        # Values are compared with those one step before them
+        self.assertEqual(testimport.rates(data, 32, step=600), {
+            600: 0.005, 1200: 0.01, 1500: 0.005})
+
+
+class TestSummarize(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_summarize(self):
+        """Testing function summarize."""
+        values = {7200: 4.0, 3600: 1.0, 3900: 3.0, 4200: 2.0}
+        self.assertEqual(testimport.summarize(values, 3600), {
+            3600: (1.0, 3.0, 2.0, 2.0, 3),
+            7200: (4.0, 4.0, 4.0, 4.0, 1)})
+        self.assertEqual(testimport.summarize({}, 3600), {})
+
+    def test_tier(self):
+        """Testing function _tier."""
+        day = 86400
+        self.assertEqual(testimport._tier(0, day, None), None)
+        self.assertEqual(testimport._tier(0, day * 30, None), None)
+        self.assertEqual(testimport._tier(0, day * 30, 500), 3600)
+        self.assertEqual(testimport._tier(0, day * 30, 10), day)
+        self.assertEqual(testimport._tier(0, day * 30, 1000), None)
+
+
+class TestDownsample(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_downsample(self):
+        """Testing function _downsample."""
+        values = {}
+        for timestamp in range(0, 300 * 1000, 300):
+            values[timestamp] = float(random.randint(0, 100))
+        values[300 * 500] = 1000.0
+
+        # Nothing is removed when there are few values
+        self.assertEqual(testimport._downsample(values, None), values)
+        self.assertEqual(testimport._downsample(values, 1000), values)
+
+        # The first, last and peak values are kept
+        result = testimport._downsample(values, 100)
+        self.assertEqual(len(result), 100)
+        self.assertEqual(result[0], values[0])
+        self.assertEqual(result[300 * 999], values[300 * 999])
+        self.assertEqual(result[300 * 500], 1000.0)
+        for timestamp, value in result.items():
+            self.assertEqual(value, values[timestamp])
+
+        # At least the first and last values are returned
+        self.assertEqual(
+            sorted(testimport._downsample(values, 1).keys()), [0, 300 * 999])
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Test the db_datapoint module."""
+
+import unittest
+
+from infoset.cache import benchmark
+from infoset.db import db
+from infoset.db import db_datapoint as testimport
+from infoset.db.db_orm import Datapoint
+
+
+class TestDatapoints(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Use an SQLite database with some datapoints."""
+        cls.pool = db.POOL
+        benchmark.database()
+        db.Database().insert_ignore(
+            Datapoint.__table__, [{'id': b'did1'}, {'id': b'did2'}], 1000)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restore the database pool."""
+        db.POOL = cls.pool
+
+    def test_dids_exist(self):
+        """Testing function dids_exist."""
+        self.assertEqual(
+            testimport.dids_exist(['did1', 'did2']), {'did1', 'did2'})
+        self.assertEqual(
+            testimport.dids_exist(['did1', 'did3', 'did1']), {'did1'})
+        self.assertEqual(testimport.dids_exist(['did3']), set())
+        self.assertEqual(testimport.dids_exist([]), set())
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
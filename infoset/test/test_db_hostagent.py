@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Test the db_hostagent module."""
+
+import unittest
+
+from infoset.db import db_hostagent
+from infoset.db import db_agent
+from infoset.db import db_host
+
+
+class TestHostAgents(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # The infoset server host and agent are created by setup.py
+    idx_host_good = 1
+    idx_agent_good = 1
+    good_agent = db_agent.GetIDX(idx_agent_good)
+    good_host = db_host.GetIDX(idx_host_good)
+
+    # Create a dict of all the expected values
+    expected = {
+        'idx_host': idx_host_good,
+        'idx_agent': idx_agent_good,
+        'hostname': good_host.hostname(),
+        'agent_name': good_agent.name(),
+        'uid': good_agent.uid(),
+        'enabled': good_agent.enabled()
+    }
+
+    def test_host_agents(self):
+        """Testing function host_agents."""
+        # Testing with known good value
+        result = db_hostagent.host_agents()
+        self.assertIn(self.expected, result)
+
+        # Only enabled agents
+        for data_dict in db_hostagent.host_agents(enabled=True):
+            self.assertEqual(data_dict['enabled'], True)
+
+    def test_host_agent(self):
+        """Testing function host_agent."""
+        # Testing with known good value
+        result = db_hostagent.host_agent(
+            self.idx_host_good, self.idx_agent_good)
+        self.assertEqual(result, self.expected)
+
+        # Testing with known bad value
+        result = db_hostagent.host_agent(-1, self.idx_agent_good)
+        self.assertEqual(result, None)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Test the db_hostoid module."""
+
+import unittest
+from unittest import mock
+
+from infoset.db import db_hostoid as testimport
+
+
+class TestOIDPlan(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # Poll plans returned by the database
+    plans = {
+        'host': {
+            '.1.3.6.1.2.1.2.2.1.2': {
+                'ifInOctets': {
+                    'values_oid': '.1.3.6.1.2.1.2.2.1.10',
+                    'base_type': 32,
+                    'multiplier': 8}}}}
+
+    def setUp(self):
+        """Forget the plans of earlier tests."""
+        testimport._PLANS.update(
+            {'plans': None, 'signature': None, 'timestamp': 0})
+
+    def test_oid_plan(self):
+        """Testing function oid_plan."""
+        with mock.patch.object(
+                testimport, 'oid_plans', return_value=self.plans) as loader:
+            with mock.patch.object(
+                    testimport, '_signature', return_value=1) as signature:
+                # The plans are read once
+                for _ in range(3):
+                    self.assertEqual(
+                        testimport.oid_plan('host'), self.plans['host'])
+                self.assertEqual(testimport.oid_plan('unknown'), {})
+                self.assertEqual(loader.call_count, 1)
+
+                # The plans are read again when invalidated by a process
+                signature.return_value = 2
+                testimport.oid_plan('host')
+                testimport.oid_plan('host')
+                self.assertEqual(loader.call_count, 2)
+
+                # The plans are read again when they expire
+                testimport._PLANS['timestamp'] -= (
+                    testimport.PLAN_LIFETIME + 1)
+                testimport.oid_plan('host')
+                self.assertEqual(loader.call_count, 3)
+
+                # The plans are read again when invalidated by this process
+                with mock.patch.object(testimport.hidden, 'Touch') as touch:
+                    testimport.invalidate()
+                touch.return_value.stamp.assert_called_once_with('oid_plans')
+                testimport.oid_plan('host')
+                self.assertEqual(loader.call_count, 4)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
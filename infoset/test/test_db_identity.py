@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test the db_identity module."""
+
+import unittest
+import time
+
+from infoset.db import db_identity as testimport
+
+
+class TestIdentityCache(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_get_set(self):
+        """Testing methods get and set."""
+        cache = testimport.IdentityCache()
+
+        # Test with non existent key
+        self.assertEqual(cache.get('bogus'), None)
+
+        # Test with known good value
+        cache.set('key', 1)
+        self.assertEqual(cache.get('key'), 1)
+
+        # None values are never cached
+        cache.set('key', None)
+        self.assertEqual(cache.get('key'), None)
+
+        # Zero is a valid value
+        cache.set('key', 0)
+        self.assertEqual(cache.get('key'), 0)
+
+    def test_ttl(self):
+        """Testing expiry of entries."""
+        cache = testimport.IdentityCache(ttl=0.1)
+        cache.set('key', 1)
+        self.assertEqual(cache.get('key'), 1)
+        time.sleep(0.2)
+        self.assertEqual(cache.get('key'), None)
+
+    def test_size(self):
+        """Testing the least recently used entries are dropped."""
+        cache = testimport.IdentityCache(size=2)
+        cache.set('one', 1)
+        cache.set('two', 2)
+
+        # Make 'one' the most recently used entry
+        self.assertEqual(cache.get('one'), 1)
+        cache.set('three', 3)
+        self.assertEqual(cache.get('two'), None)
+        self.assertEqual(cache.get('one'), 1)
+        self.assertEqual(cache.get('three'), 3)
+
+    def test_delete_clear(self):
+        """Testing methods delete and clear."""
+        cache = testimport.IdentityCache()
+        cache.set('one', 1)
+        cache.set('two', 2)
+        cache.delete('one')
+        self.assertEqual(cache.get('one'), None)
+        self.assertEqual(cache.get('two'), 2)
+        cache.clear()
+        self.assertEqual(cache.get('two'), None)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
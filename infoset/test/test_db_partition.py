@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Test the db_partition module."""
+
+import unittest
+import calendar
+from unittest import mock
+
+from infoset.db import db_partition as testimport
+
+
+class TestPartition(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # Month boundaries
+    jan = calendar.timegm((2017, 1, 1, 0, 0, 0))
+    feb = calendar.timegm((2017, 2, 1, 0, 0, 0))
+    mar = calendar.timegm((2017, 3, 1, 0, 0, 0))
+    apr = calendar.timegm((2017, 4, 1, 0, 0, 0))
+    may = calendar.timegm((2017, 5, 1, 0, 0, 0))
+    jun = calendar.timegm((2017, 6, 1, 0, 0, 0))
+
+    def test_month_start(self):
+        """Testing function month_start."""
+        self.assertEqual(testimport.month_start(self.feb), self.feb)
+        self.assertEqual(testimport.month_start(self.feb - 1), self.jan)
+        self.assertEqual(
+            testimport.month_start(self.feb + 100, months=2), self.apr)
+        self.assertEqual(
+            testimport.month_start(self.jan, months=-1),
+            calendar.timegm((2016, 12, 1, 0, 0, 0)))
+
+    def test_statements(self):
+        """Testing function statements."""
+        now = self.feb + 86400
+
+        # The table is partitioned on the first run
+        result = testimport.statements([], ['iset_data_ibfk_1'], now)
+        self.assertEqual(result, [
+            'ALTER TABLE iset_data DROP FOREIGN KEY iset_data_ibfk_1',
+            ('ALTER TABLE iset_data PARTITION BY RANGE (timestamp) ('
+             'PARTITION p201701 VALUES LESS THAN (%s), '
+             'PARTITION p201702 VALUES LESS THAN (%s), '
+             'PARTITION p201703 VALUES LESS THAN (%s), '
+             'PARTITION p201704 VALUES LESS THAN (%s), '
+             'PARTITION p201705 VALUES LESS THAN (%s), '
+             'PARTITION pmax VALUES LESS THAN MAXVALUE)') % (
+                 self.feb, self.mar, self.apr, self.may, self.jun)])
+
+        # Nothing to do
+        existing = [
+            ('p201701', self.feb), ('p201702', self.mar),
+            ('p201703', self.apr), ('p201704', self.may),
+            ('p201705', self.jun), ('pmax', None)]
+        self.assertEqual(testimport.statements(existing, [], now), [])
+
+        # A month later a partition is added and expired ones dropped
+        now = self.mar + 86400
+        result = testimport.statements(
+            existing, [], now, expiry=self.mar + 1)
+        self.assertEqual(result, [
+            ('ALTER TABLE iset_data REORGANIZE PARTITION pmax INTO ('
+             'PARTITION p201706 VALUES LESS THAN (%s), '
+             'PARTITION pmax VALUES LESS THAN MAXVALUE)') % (
+                 calendar.timegm((2017, 7, 1, 0, 0, 0))),
+            'ALTER TABLE iset_data DROP PARTITION p201701, p201702'])
+
+    def test_maintain(self):
+        """Testing function maintain."""
+        config = mock.Mock()
+        config.data_retention.return_value = 0
+        with mock.patch.object(testimport.db, 'Database') as database:
+            session = database.return_value.session.return_value
+            session.bind.dialect.name = 'mysql'
+            with mock.patch.object(
+                    testimport, '_describe', return_value=([], [])):
+                # Tables are only partitioned when asked to
+                self.assertTrue(
+                    testimport.maintain(config, timestamp=self.feb))
+                self.assertEqual(session.execute.call_count, 0)
+                self.assertTrue(testimport.maintain(
+                    config, timestamp=self.feb, partition=True))
+                self.assertEqual(session.execute.call_count, 1)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
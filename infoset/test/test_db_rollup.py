@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Test the db_rollup module."""
+
+import unittest
+
+from infoset.db import db_rollup as testimport
+
+
+class TestCombine(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_combine(self):
+        """Testing function combine."""
+        day = 86400
+        summaries = {
+            0: (1.0, 5.0, 2.0, 4.0, 12),
+            3600: (0.0, 3.0, 1.0, 3.0, 4),
+            7200: (None, None, None, None, 0),
+            day: (7.0, 7.0, 7.0, 7.0, 1)}
+
+        # Averages are weighted by the number of samples
+        self.assertEqual(testimport.combine(summaries, day), {
+            0: (0.0, 5.0, 1.75, 3.0, 16),
+            day: (7.0, 7.0, 7.0, 7.0, 1)})
+
+        # Periods without samples are ignored
+        self.assertEqual(testimport.combine({
+            0: (None, None, None, None, 0)}, day), {})
+
+    def test_rows(self):
+        """Testing function _rows."""
+        rows = testimport._rows(
+            5, {3600: (1.0, 3.0, 2.0, 2.0, 3)}, 0, 7200, 3600)
+        self.assertEqual(rows, [
+            {'idx_datapoint': 5, 'timestamp': 0, 'value_min': None,
+             'value_max': None, 'value_avg': None, 'value_last': None,
+             'samples': 0},
+            {'idx_datapoint': 5, 'timestamp': 3600, 'value_min': 1.0,
+             'value_max': 3.0, 'value_avg': 2.0, 'value_last': 2.0,
+             'samples': 3}])
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
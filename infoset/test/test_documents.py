@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Test the documents module."""
+
+import os
+import unittest
+import tempfile
+
+from infoset.topology import documents as testimport
+
+
+class TestLoad(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_load(self):
+        """Testing function load."""
+        # Create a file
+        (_, filepath) = tempfile.mkstemp(suffix='.yaml')
+        with open(filepath, 'w') as f_handle:
+            f_handle.write('layer1:\n  1: {ifName: ge-0/0/0}\nlayer2: {}\n')
+
+        # Files are parsed once
+        result = testimport.load(filepath)
+        self.assertEqual(result, {
+            'layer1': {1: {'ifName': 'ge-0/0/0'}}, 'layer2': {}})
+        self.assertIs(testimport.load(filepath), result)
+        self.assertEqual(
+            testimport.load(filepath, layer='layer1'), result['layer1'])
+
+        # Changed files are parsed again
+        with open(filepath, 'w') as f_handle:
+            f_handle.write('layer1: {}\n')
+        os.utime(filepath, ns=(0, 0))
+        self.assertEqual(testimport.load(filepath), {'layer1': {}})
+
+        # Missing files
+        os.remove(filepath)
+        with self.assertRaises(OSError):
+            testimport.load(filepath)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Test the drain module."""
+
+import unittest
+
+from infoset.cache import drain as testimport
+from infoset.utils import jm_general
+
+
+class TestDIDs(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_dids(self):
+        """Testing function dids."""
+        indexes = [0, 1, 'eth0', 2.5]
+        result = testimport.dids('uid', 'label', indexes, 'agent', 'host')
+
+        # DIDs must be the same as those created before they were cached
+        for index, did in zip(indexes, result):
+            expected = jm_general.hashstring(
+                ('uid%s%sagenthost') % ('label', index))
+            self.assertEqual(did, expected)
+
+        # Cached values must be returned the next time
+        self.assertEqual(
+            testimport.dids('uid', 'label', indexes, 'agent', 'host'),
+            result)
+        self.assertEqual(
+            testimport._did('uid', 'label', 1, 'agent', 'host'), result[1])
+
+    def test_cache_size(self):
+        """Testing the number of DIDs remembered is bounded."""
+        size = testimport.DID_CACHE_SIZE
+        testimport.DID_CACHE_SIZE = 2
+        try:
+            testimport.dids('uid', 'other', [0, 1, 2, 3], 'agent', 'host')
+            self.assertLessEqual(len(testimport._DID_CACHE), 2)
+        finally:
+            testimport.DID_CACHE_SIZE = size
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
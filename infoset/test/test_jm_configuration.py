@@ -508,6 +508,51 @@ def _agent_config(agent_name, config_dict):
     # Return
     return result
 
+
+class TestReadConfiguration(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Create a temporary configuration directory."""
+        self.config_dir = tempfile.mkdtemp()
+        self.environment = os.environ.get('INFOSET_CONFIGDIR')
+        os.environ['INFOSET_CONFIGDIR'] = self.config_dir
+
+    def tearDown(self):
+        """Restore the configuration directory."""
+        if self.environment is None:
+            del os.environ['INFOSET_CONFIGDIR']
+        else:
+            os.environ['INFOSET_CONFIGDIR'] = self.environment
+        shutil.rmtree(self.config_dir)
+
+    def test_read_configuration(self):
+        """Testing function read_configuration."""
+        # Create a configuration file
+        config_dir = self.config_dir
+        config_file = ('%s/config.yaml') % (config_dir)
+        with open(config_file, 'w') as f_handle:
+            f_handle.write('common:\n    language: en\n')
+
+        # The same configuration is returned while files are unchanged
+        result = test_class.read_configuration()
+        self.assertEqual(result, {'common': {'language': 'en'}})
+        self.assertIs(test_class.read_configuration(), result)
+
+        # Changed files are read again
+        with open(config_file, 'w') as f_handle:
+            f_handle.write('common:\n    language: fr\n')
+        os.utime(config_file, ns=(0, 0))
+        result = test_class.read_configuration()
+        self.assertEqual(result, {'common': {'language': 'fr'}})
+
+        # New files are read
+        with open(('%s/extra.yaml') % (config_dir), 'w') as f_handle:
+            f_handle.write('server:\n    db_name: infoset\n')
+        result = test_class.read_configuration()
+        self.assertEqual(result['server'], {'db_name': 'infoset'})
+
+
 if __name__ == '__main__':
 
     # Do the unit test
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Test the snmp_async module."""
+
+import asyncio
+import unittest
+from collections import defaultdict
+from unittest import mock
+
+from pysnmp.proto import rfc1902
+from pysnmp.proto import rfc1905
+
+from infoset.snmp import snmp_async as testimport
+
+
+class Agent(object):
+    """Mock of the asyncio API of pysnmp querying an ifTable."""
+
+    def __init__(self, rows=60):
+        """Initialize the class.
+
+        Args:
+            rows: Number of rows in the table
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.mib = [
+            (rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.1.%s' % (row)),
+             rfc1902.Integer(row)) for row in range(1, rows + 1)]
+        self.mib.append(
+            (rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.2.1'),
+             rfc1902.OctetString('eth0')))
+        self.requests = defaultdict(int)
+        self.in_flight = defaultdict(int)
+        self.max_in_flight = defaultdict(int)
+
+        # Names used by the module
+        self.UdpTransportTarget = lambda address: address[0]
+        self.ContextData = lambda: None
+        self.ObjectType = lambda name: name
+        self.ObjectIdentity = lambda name: rfc1902.ObjectName(
+            str(name).lstrip('.'))
+
+    async def _respond(self, command, hostname, rows):
+        """Track the concurrency of requests.
+
+        Args:
+            command: Name of the command
+            hostname: Host queried
+            rows: Response
+
+        Returns:
+            result: Response
+
+        """
+        # Count requests in flight
+        self.requests[command] += 1
+        for key in [hostname, None]:
+            self.in_flight[key] += 1
+            self.max_in_flight[key] = max(
+                self.max_in_flight[key], self.in_flight[key])
+
+        # Respond later
+        await asyncio.sleep(0)
+        for key in [hostname, None]:
+            self.in_flight[key] -= 1
+        result = (None, 0, 0, rows)
+        return result
+
+    def _next(self, names, count):
+        """Get the rows following OIDs.
+
+        Args:
+            names: List of OIDs
+            count: Number of rows
+
+        Returns:
+            rows: List of rows
+
+        """
+        columns = []
+        for name in names:
+            following = [row for row in self.mib if row[0] > name][:count]
+            following.extend(
+                [(name, rfc1905.endOfMibView)] * (count - len(following)))
+            columns.append(following)
+        rows = [list(row) for row in zip(*columns)]
+        return rows
+
+    async def getCmd(self, engine, auth, hostname, context, *names, **_):
+        """Mock of getCmd."""
+        rows = [row for row in self.mib if row[0] in names]
+        return await self._respond('get', hostname, rows)
+
+    async def nextCmd(self, engine, auth, hostname, context, *names, **_):
+        """Mock of nextCmd."""
+        return await self._respond('next', hostname, self._next(names, 1))
+
+    async def bulkCmd(
+            self, engine, auth, hostname, context, non_repeaters,
+            max_repetitions, *names, **_):
+        """Mock of bulkCmd."""
+        return await self._respond(
+            'bulk', hostname, self._next(names, max_repetitions))
+
+
+def _params(hostname, max_repetitions=None):
+    """Create SNMP parameters for testing.
+
+    Args:
+        hostname: Hostname
+        max_repetitions: Value of snmp_max_repetitions
+
+    Returns:
+        params: Dict of SNMP parameters
+
+    """
+    params = {
+        'snmp_hostname': hostname,
+        'snmp_version': 2,
+        'snmp_community': 'public',
+        'snmp_port': 161,
+        'snmp_max_repetitions': max_repetitions,
+        'group_name': 'test'
+    }
+    return params
+
+
+def _engine(requests=500, host_requests=2):
+    """Create an Engine for testing.
+
+    Args:
+        requests: Maximum number of requests in flight
+        host_requests: Maximum number of requests in flight per host
+
+    Returns:
+        engine: Engine object
+
+    """
+    config = mock.Mock()
+    config.agent_snmp_requests.return_value = requests
+    config.agent_snmp_host_requests.return_value = host_requests
+    engine = testimport.Engine(config=config)
+    return engine
+
+
+def _run(coroutine):
+    """Run a coroutine in a new event loop.
+
+    Args:
+        coroutine: Coroutine
+
+    Returns:
+        result: Result of the coroutine
+
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+    return result
+
+
+class TestInteract(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_walk(self):
+        """Testing method walk."""
+        # GETBULK requests
+        agent = Agent()
+        with mock.patch.object(testimport, 'hlapi', agent):
+            interact = testimport.Interact(_params('host'), _engine())
+            results = _run(
+                interact.walk('.1.3.6.1.2.1.2.2.1.1', normalized=True))
+        self.assertEqual(results, {str(row): row for row in range(1, 61)})
+        self.assertEqual(agent.requests, {'bulk': 3})
+
+        # GETNEXT requests
+        agent = Agent(rows=5)
+        with mock.patch.object(testimport, 'hlapi', agent):
+            interact = testimport.Interact(_params('host', 0), _engine())
+            results = _run(interact.swalk('.1.3.6.1.2.1.2.2.1.1'))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results['.1.3.6.1.2.1.2.2.1.1.5'], 5)
+        self.assertEqual(agent.requests, {'next': 6})
+
+    def test_walk_columns(self):
+        """Testing method walk_columns."""
+        # Walk ifIndex and ifDescr
+        agent = Agent(rows=30)
+        oids = ['.1.3.6.1.2.1.2.2.1.1', '.1.3.6.1.2.1.2.2.1.2']
+        with mock.patch.object(testimport, 'hlapi', agent):
+            interact = testimport.Interact(_params('host'), _engine())
+            results = _run(interact.walk_columns(oids))
+        self.assertEqual(len(results), 30)
+        self.assertEqual(results['1'], {oids[0]: 1, oids[1]: b'eth0'})
+        self.assertEqual(results['30'], {oids[0]: 30})
+
+        # The columns are walked together until each ends
+        self.assertEqual(agent.requests, {'bulk': 2})
+
+    def test_get(self):
+        """Testing method get."""
+        agent = Agent()
+        with mock.patch.object(testimport, 'hlapi', agent):
+            interact = testimport.Interact(_params('host'), _engine())
+            results = _run(interact.get('.1.3.6.1.2.1.2.2.1.2.1'))
+        self.assertEqual(results, {'.1.3.6.1.2.1.2.2.1.2.1': b'eth0'})
+
+    def test_query_errors(self):
+        """Testing method query with errors."""
+        # Errors return blank results instead of stopping other hosts
+        agent = Agent()
+
+        async def _error(*args, **kwargs):
+            """Respond with an SNMP error status."""
+            return ('genErr', 5, 1, [])
+
+        agent.bulkCmd = _error
+        with mock.patch.object(testimport, 'hlapi', agent):
+            interact = testimport.Interact(_params('host'), _engine())
+            results = _run(interact.walk('.1.3.6.1.2.1.2.2.1.1'))
+        self.assertEqual(results, {})
+
+        # Invalid OIDs raise ordinary exceptions
+        with mock.patch.object(testimport, 'hlapi', agent):
+            interact = testimport.Interact(_params('host'), _engine())
+            with self.assertRaises(ValueError):
+                _run(interact.walk('1.3.6.1'))
+
+    def test_limits(self):
+        """Testing the concurrency limits."""
+        # Initialize key variables
+        agent = Agent()
+        hostnames = [('host%s') % (count) for count in range(10)]
+        engine = _engine(requests=4, host_requests=1)
+
+        async def _walks():
+            """Walk each host three times."""
+            return await asyncio.gather(*[
+                testimport.Interact(_params(hostname, 10), engine).walk(
+                    '.1.3.6.1.2.1.2.2.1.1')
+                for hostname in hostnames for _ in range(3)])
+
+        # Walk
+        with mock.patch.object(testimport, 'hlapi', agent):
+            results = _run(_walks())
+        for result in results:
+            self.assertEqual(len(result), 60)
+        self.assertEqual(agent.max_in_flight[None], 4)
+        for hostname in hostnames:
+            self.assertEqual(agent.max_in_flight[hostname], 1)
+
+        # Hosts have a session each, and share the engine of the group
+        self.assertEqual(len(engine._sessions), len(hostnames))
+        self.assertEqual(len(engine._engines), 1)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Test the snmp_manager module."""
+
+import threading
+import unittest
+from unittest import mock
+
+from pysnmp.proto import rfc1902
+from pysnmp.proto import rfc1905
+
+from infoset.snmp import snmp_manager as testimport
+
+
+def _params(version, max_repetitions=None):
+    """Create SNMP parameters for testing.
+
+    Args:
+        version: SNMP version
+        max_repetitions: Value of snmp_max_repetitions
+
+    Returns:
+        params: Dict of SNMP parameters
+
+    """
+    params = {
+        'snmp_hostname': '127.0.0.1',
+        'snmp_version': version,
+        'snmp_secname': 'woohoo',
+        'snmp_community': 'public',
+        'snmp_port': 161,
+        'snmp_authprotocol': 'sha',
+        'snmp_authpassword': 'auth1234',
+        'snmp_privprotocol': 'aes',
+        'snmp_privpassword': 'priv1234',
+        'snmp_max_repetitions': max_repetitions,
+        'group_name': 'test'
+    }
+    return params
+
+
+class TestInteract(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # Rows returned by a walk of ifIndex
+    var_binds = [
+        [(rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.1.1'),
+          rfc1902.Integer(1))],
+        [(rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.1.2'),
+          rfc1902.Integer(2))],
+        [(rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.1.2'),
+          rfc1905.endOfMibView)]]
+
+    def _walk(self, params):
+        """Walk ifIndex with a mock command generator.
+
+        Args:
+            params: Dict of SNMP parameters
+
+        Returns:
+            result: Tuple of (results, command generator)
+
+        """
+        # Forget the sessions using earlier mocks
+        testimport._THREAD_DATA.__dict__.clear()
+        with mock.patch.object(
+                testimport.cmdgen, 'CommandGenerator') as generator:
+            snmp_object = generator.return_value
+            snmp_object.bulkCmd.return_value = (None, 0, 0, self.var_binds)
+            snmp_object.nextCmd.return_value = (None, 0, 0, self.var_binds)
+            results = testimport.Interact(params).walk(
+                '.1.3.6.1.2.1.2.2.1.1', normalized=True)
+        return (results, snmp_object)
+
+    def test_walk(self):
+        """Testing method walk."""
+        # GETBULK is used by default
+        for version in [2, 3]:
+            (results, snmp_object) = self._walk(_params(version))
+            self.assertEqual(results, {'1': 1, '2': 2})
+            self.assertEqual(snmp_object.nextCmd.call_count, 0)
+            args = snmp_object.bulkCmd.call_args[0]
+            self.assertEqual(
+                args[2:], (0, testimport.MAX_REPETITIONS,
+                           '.1.3.6.1.2.1.2.2.1.1'))
+
+        # Configured number of rows
+        (_, snmp_object) = self._walk(_params(2, max_repetitions=50))
+        self.assertEqual(snmp_object.bulkCmd.call_args[0][3], 50)
+
+        # GETNEXT is used when GETBULK is disabled
+        (results, snmp_object) = self._walk(_params(2, max_repetitions=0))
+        self.assertEqual(results, {'1': 1, '2': 2})
+        self.assertEqual(snmp_object.bulkCmd.call_count, 0)
+        self.assertEqual(snmp_object.nextCmd.call_count, 1)
+
+    def test_walk_columns(self):
+        """Testing method walk_columns."""
+        # Rows of ifIndex and ifDescr
+        var_binds = [
+            [(rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.1.1'),
+              rfc1902.Integer(1)),
+             (rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.2.1'),
+              rfc1902.OctetString('eth0'))],
+            [(rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.1.2'),
+              rfc1902.Integer(2)),
+             (rfc1902.ObjectName('1.3.6.1.2.1.2.2.1.2.1'),
+              rfc1905.endOfMibView)]]
+        oids = ['.1.3.6.1.2.1.2.2.1.1', '.1.3.6.1.2.1.2.2.1.2']
+
+        # Walk both columns with the same requests
+        testimport._THREAD_DATA.__dict__.clear()
+        with mock.patch.object(
+                testimport.cmdgen, 'CommandGenerator') as generator:
+            snmp_object = generator.return_value
+            snmp_object.bulkCmd.return_value = (None, 0, 0, var_binds)
+            results = testimport.Interact(_params(2)).walk_columns(oids)
+        self.assertEqual(results, {
+            '1': {oids[0]: 1, oids[1]: b'eth0'}, '2': {oids[0]: 2}})
+        self.assertEqual(snmp_object.bulkCmd.call_count, 1)
+        self.assertEqual(snmp_object.bulkCmd.call_args[0][4:], tuple(oids))
+
+
+class TestSession(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Forget the sessions of earlier tests."""
+        testimport._THREAD_DATA.__dict__.clear()
+
+    def test_session(self):
+        """Testing function session."""
+        # Sessions are reused
+        params = _params(3)
+        result = testimport.session(params)
+        self.assertIs(testimport.session(dict(params)), result)
+        self.assertEqual(
+            result.transport_object.transportAddr, ('127.0.0.1', 161))
+
+        # Engines are shared by hosts with the same credentials
+        other = _params(3)
+        other['snmp_hostname'] = '127.0.0.2'
+        session = testimport.session(other)
+        self.assertIsNot(session, result)
+        self.assertIs(session.snmp_object, result.snmp_object)
+
+        # Engines aren't shared by different credentials
+        other['snmp_authpassword'] = 'auth5678'
+        session = testimport.session(other)
+        self.assertIsNot(session.snmp_object, result.snmp_object)
+
+        # Sessions aren't shared by threads
+        sessions = []
+        thread = threading.Thread(
+            target=lambda: sessions.append(testimport.session(params)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], result)
+
+    def test_close(self):
+        """Testing function close."""
+        # Open a socket
+        session = testimport.session(_params(2))
+        snmp_engine = session.snmp_object.snmpEngine
+        session.snmp_object.getCmd(
+            session.authentication_object,
+            testimport.cmdgen.UdpTransportTarget(
+                ('127.0.0.1', 161), timeout=0.1, retries=0),
+            '.1.3.6.1.2.1.1.2.0')
+        dispatcher = snmp_engine.transportDispatcher
+        self.assertIsNotNone(dispatcher)
+
+        # The sockets are closed and the sessions are forgotten
+        with mock.patch.object(
+                dispatcher, 'closeDispatcher',
+                wraps=dispatcher.closeDispatcher) as close_dispatcher:
+            testimport.close()
+        self.assertEqual(close_dispatcher.call_count, 1)
+        self.assertIsNone(snmp_engine.transportDispatcher)
+        self.assertIsNot(testimport.session(_params(2)), session)
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test__max_repetitions(self):
+        """Testing function _max_repetitions."""
+        self.assertEqual(
+            testimport._max_repetitions(_params(2)),
+            testimport.MAX_REPETITIONS)
+        self.assertEqual(testimport._max_repetitions(_params(3, 40)), 40)
+        self.assertEqual(testimport._max_repetitions(_params(3, 0)), 0)
+        self.assertEqual(testimport._max_repetitions(_params(1, 40)), 0)
+
+    def test_columns(self):
+        """Testing function columns."""
+        oids = ['.1.3.6.1.2.1.17.4.3.1.1', '.1.3.6.1.2.1.17.4.3.1.2']
+        results = {
+            '.1.3.6.1.2.1.17.4.3.1.1.0.1.2.3.4.5': b'mac',
+            '.1.3.6.1.2.1.17.4.3.1.2.0.1.2.3.4.5': 7,
+            '.1.3.6.1.2.1.17.4.3.1.2.0.1.2.3.4.6': 8,
+            '.1.3.6.1.2.1.17.4.3.1.3.0.1.2.3.4.6': 3}
+        self.assertEqual(testimport.columns(oids, results), {
+            '0.1.2.3.4.5': {oids[0]: b'mac', oids[1]: 7},
+            '0.1.2.3.4.6': {oids[1]: 8}})
+
+    def test_oid_valid_format(self):
+        """Testing function oid_valid_format."""
+        self.assertTrue(testimport.oid_valid_format('.1.3.6.1'))
+        self.assertFalse(testimport.oid_valid_format('1.3.6.1'))
+        self.assertFalse(testimport.oid_valid_format('.1.3.6.1.'))
+        self.assertFalse(testimport.oid_valid_format('.1.3.a.1'))
+        self.assertFalse(testimport.oid_valid_format(1))
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test the spool module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from infoset.cache import spool as testimport
+
+
+class TestSpool(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Create a temporary spool directory."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Delete the temporary spool directory."""
+        shutil.rmtree(self.directory)
+
+    def test_append_read_commit(self):
+        """Testing methods append, read and commit."""
+        records = testimport.Spool(self.directory)
+        records.append({'uid': 1})
+        records.append({'uid': 2})
+
+        # Records are read in the order they were appended
+        result = records.read()
+        self.assertEqual(
+            [item[2] for item in result], [{'uid': 1}, {'uid': 2}])
+
+        # Records are read until they are committed
+        self.assertEqual(records.read(), result)
+        records.commit(result[0:1])
+        self.assertEqual([item[2] for item in records.read()], [{'uid': 2}])
+        records.commit(result)
+        self.assertEqual(records.read(), [])
+
+        # The segment being appended to is never deleted
+        self.assertEqual(len(records.segments()), 1)
+
+        # The offset file is replaced atomically
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            ['.lock', records.segments()[0],
+             ('%s.offset') % (records.segments()[0])])
+
+    def test_rotation(self):
+        """Testing deletion of committed segments."""
+        records = testimport.Spool(self.directory, segment_size=1)
+        for uid in range(3):
+            records.append({'uid': uid})
+        self.assertEqual(len(records.segments()), 3)
+
+        # All but the newest segment are deleted
+        records.commit(records.read())
+        self.assertEqual(len(records.segments()), 1)
+        self.assertEqual(records.read(), [])
+
+        # Appends continue with a new segment
+        records.append({'uid': 3})
+        self.assertEqual(len(records.segments()), 2)
+        self.assertEqual(
+            [item[2] for item in records.read()], [{'uid': 3}])
+
+    def test_read_incomplete(self):
+        """Testing records that have not been completely written."""
+        records = testimport.Spool(self.directory, segment_size=1)
+        records.append({'uid': 1})
+        filepath = os.path.join(self.directory, records.segments()[0])
+        with open(filepath, 'ab') as f_handle:
+            f_handle.write(b'\x00\x00')
+
+        # Partial records in the newest segment may still be completed
+        result = records.read()
+        self.assertEqual([item[2] for item in result], [{'uid': 1}])
+
+        # Partial records in older segments are skipped
+        records.append({'uid': 2})
+        result = records.read()
+        self.assertEqual(
+            [item[2] for item in result], [{'uid': 1}, None, {'uid': 2}])
+        records.commit(result)
+        self.assertEqual(records.read(), [])
+
+    def test_read_corrupt(self):
+        """Testing records after corrupted data."""
+        records = testimport.Spool(self.directory)
+        records.append({'uid': 1})
+        filepath = os.path.join(self.directory, records.segments()[0])
+
+        # Records torn by a crashed writer, or with a huge length
+        for garbage in [
+                testimport.HEADER.pack(1000, 0) + b'{"ui',
+                testimport.HEADER.pack(0xffffffff, 0) + b'{}']:
+            with open(filepath, 'ab') as f_handle:
+                f_handle.write(garbage)
+            records.append({'uid': 2})
+
+        # Records appended after them are still read
+        result = records.read()
+        self.assertEqual(
+            [item[2] for item in result], [{'uid': 1}, {'uid': 2}, {'uid': 2}])
+        self.assertEqual(
+            len([item for item in os.listdir(self.directory)
+                 if item.endswith('.corrupt')]), 2)
+
+        # Committing them skips the corrupted data
+        records.commit(result)
+        self.assertEqual(records.read(), [])
+
+    def test_append_limit(self):
+        """Testing the maximum size of records."""
+        records = testimport.Spool(self.directory)
+        with self.assertRaises(ValueError):
+            records.append(
+                {'data': 'x' * (testimport.MAX_RECORD_SIZE + 1)})
+        self.assertEqual(records.read(), [])
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
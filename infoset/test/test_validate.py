@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Test the validate module."""
+
+import unittest
+
+from infoset.cache import validate as testimport
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # A valid group of data
+    group = {
+        'base_type': 1,
+        'description': 'CPU load',
+        'data': [[0, 1.5, 'source']]}
+
+    def test_check_group(self):
+        """Testing function check_group."""
+        self.assertTrue(testimport.check_group('chartable', self.group))
+        group = dict(self.group)
+        group['base_type'] = 'one'
+        self.assertFalse(testimport.check_group('chartable', group))
+        self.assertTrue(testimport.check_group('other', group))
+        del group['data']
+        self.assertFalse(testimport.check_group('other', group))
+
+    def test_check_datapoint(self):
+        """Testing function check_datapoint."""
+        self.assertTrue(testimport.check_datapoint('chartable', [0, 1, 'x']))
+        self.assertFalse(
+            testimport.check_datapoint('chartable', [0, 'one', 'x']))
+        self.assertTrue(testimport.check_datapoint('other', [0, 'one', 'x']))
+        self.assertFalse(testimport.check_datapoint('other', [0, 'one']))
+        self.assertFalse(testimport.check_datapoint('other', 1))
+
+    def test_check_reported_data(self):
+        """Testing function _check_reported_data."""
+        information = {'chartable': {'cpu': self.group}}
+        self.assertTrue(testimport._check_reported_data(information))
+        information['other'] = {'name': {
+            'base_type': None, 'description': 'Name', 'data': [[0, 'x']]}}
+        self.assertFalse(testimport._check_reported_data(information))
+        self.assertFalse(testimport._check_reported_data([]))
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Test the watch module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from infoset.utils import jm_general
+from infoset.cache import watch as testimport
+
+
+class Names(set):
+    """Set of filenames that remembers the names added to it."""
+
+    def __init__(self):
+        """Initialize the class."""
+        set.__init__(self)
+        self.added = []
+
+    def add(self, name):
+        """Add a filename."""
+        self.added.append(name)
+        set.add(self, name)
+
+
+class TestWatcher(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Create a temporary cache directory."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Delete the temporary cache directory."""
+        shutil.rmtree(self.directory)
+
+    def _watcher(self):
+        """Watch the temporary directory with inotify.
+
+        Args:
+            None
+
+        Returns:
+            watcher: Watcher object
+
+        """
+        watcher = testimport.Watcher(self.directory)
+        self.addCleanup(watcher.close)
+        if watcher.fd is None:
+            self.skipTest('inotify is not available')
+        return watcher
+
+    def test_filenames(self):
+        """Testing method filenames."""
+        # Files present before watching are found by the first scan
+        jm_general.write_json(os.path.join(self.directory, 'old.json'), {})
+        watcher = self._watcher()
+        self.assertEqual(watcher.filenames(), ['old.json'])
+
+        # Only the final names of atomically written files are found
+        filepath = os.path.join(self.directory, 'new.json')
+        jm_general.write_json(filepath, {'uid': 1})
+        self.assertEqual(watcher.filenames(), ['new.json', 'old.json'])
+        self.assertEqual(watcher.rescan, False)
+
+        # Deleted files disappear
+        os.remove(filepath)
+        self.assertEqual(watcher.filenames(), ['old.json'])
+
+    def test_read_events(self):
+        """Testing method _read_events."""
+        watcher = self._watcher()
+        watcher.filenames()
+        jm_general.write_json(os.path.join(self.directory, 'new.json'), {})
+
+        # The hidden temporary file is closed, then renamed
+        watcher.files = Names()
+        self.assertTrue(watcher._read_events())
+        self.assertEqual(watcher.files, {'new.json'})
+        self.assertEqual(len(watcher.files.added), 2)
+        self.assertTrue(watcher.files.added[0].startswith('.new.json.'))
+        self.assertEqual(watcher.files.added[1], 'new.json')
+
+        # No more events
+        self.assertFalse(watcher._read_events())
+
+    def test_wait(self):
+        """Testing method wait."""
+        watcher = self._watcher()
+        watcher.filenames()
+
+        # Time out without new files
+        self.assertFalse(watcher.wait(0.1))
+
+        # Deleted files don't end the wait
+        filepath = os.path.join(self.directory, 'new.json')
+        jm_general.write_json(filepath, {})
+        self.assertTrue(watcher.wait(1))
+        os.remove(filepath)
+        self.assertFalse(watcher.wait(0.1))
+        self.assertEqual(watcher.filenames(), [])
+
+    def test_polling(self):
+        """Testing Watcher without inotify."""
+        with mock.patch.object(testimport, '_inotify', return_value=None):
+            watcher = testimport.Watcher(self.directory)
+        self.assertIsNone(watcher.fd)
+
+        # The directory is scanned each time
+        filepath = os.path.join(self.directory, 'new.json')
+        jm_general.write_json(filepath, {})
+        with mock.patch.object(
+                testimport, 'scan', wraps=testimport.scan) as scan:
+            self.assertEqual(watcher.filenames(), ['new.json'])
+            os.remove(filepath)
+            self.assertEqual(watcher.filenames(), [])
+            self.assertEqual(scan.call_count, 2)
+
+        # Waiting sleeps, then the directory must be scanned again
+        with mock.patch.object(testimport.time, 'sleep') as sleep:
+            self.assertTrue(watcher.wait(5))
+        sleep.assert_called_once_with(5)
+        watcher.close()
+
+    def test_scan(self):
+        """Testing function scan."""
+        os.mkdir(os.path.join(self.directory, 'directory'))
+        jm_general.write_json(os.path.join(self.directory, 'new.json'), {})
+        self.assertEqual(testimport.scan(self.directory), ['new.json'])
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Test the workers module."""
+
+import queue as Queue
+import unittest
+from unittest import mock
+
+from infoset.cache import workers as testimport
+
+
+class Results(object):
+    """Queue of results returned in a scripted order."""
+
+    def __init__(self, script):
+        """Initialize the class.
+
+        Args:
+            script: List of results. Functions are called, and then
+                Queue.Empty is raised, instead of returning a result.
+
+        Returns:
+            None
+
+        """
+        self.script = list(script)
+
+    def get(self, timeout=None):
+        """Get the next result."""
+        item = self.script.pop(0)
+        if callable(item) is True:
+            item()
+            raise Queue.Empty
+        return item
+
+
+class TestShardedPool(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_process(self):
+        """Testing method process."""
+        # Worker processes that are running
+        processes = [mock.Mock() for _ in range(3)]
+        for process in processes:
+            process.is_alive.return_value = True
+
+        with mock.patch.object(testimport, 'multiprocessing') as module:
+            module.Process.side_effect = processes
+            pool = testimport.ShardedPool(workers=2)
+            pool.start()
+            self.assertEqual(pool.generations, [1, 1])
+
+            # The worker of shard 0 dies, and its result arrives after it
+            # was restarted. The work of shard 1 is still waited for.
+            def _die():
+                """Stop the worker of shard 0."""
+                processes[0].is_alive.return_value = False
+
+            pool.results = Results([_die, (0, 1, True), (1, 1, True)])
+            success = pool.process({'hosthash': {
+                'uid0': [(300, 'file0', None)],
+                'uid1': [(300, 'file1', None)]}})
+
+        self.assertFalse(success)
+        self.assertEqual(pool.results.script, [])
+        self.assertEqual(pool.generations, [2, 1])
+        self.assertIs(pool.processes[0], processes[2])
+
+    def test_process_failed(self):
+        """Testing method process when files fail to be processed."""
+        # Worker processes that are running
+        processes = [mock.Mock() for _ in range(2)]
+        for process in processes:
+            process.is_alive.return_value = True
+
+        # Get the result of a worker that fails to process its files
+        work_queue = Queue.Queue()
+        results = Queue.Queue()
+        work_queue.put([(300, 'file0', None)])
+        work_queue.put(None)
+        with mock.patch.object(testimport, 'jm_configuration'):
+            with mock.patch.object(testimport, 'log'):
+                with mock.patch.object(testimport.cache, 'ProcessUID') as uid:
+                    uid.return_value.process.side_effect = KeyError('did')
+                    testimport._worker(0, 1, work_queue, results)
+        result = results.get(timeout=1)
+        self.assertEqual(result, (0, 1, False))
+
+        with mock.patch.object(testimport, 'multiprocessing') as module:
+            module.Process.side_effect = processes
+            pool = testimport.ShardedPool(workers=2)
+            pool.start()
+            pool.results = Results([result, (1, 1, True)])
+            success = pool.process({'hosthash': {
+                'uid0': [(300, 'file0', None)],
+                'uid1': [(300, 'file1', None)]}})
+
+        # The spool must not be committed
+        self.assertFalse(success)
+        self.assertEqual(pool.generations, [1, 1])
+
+    def test_shard(self):
+        """Testing function _shard."""
+        self.assertEqual(testimport._shard('000000ff', 4), 3)
+        self.assertEqual(testimport._shard('0000000a', 4), 2)
+        self.assertEqual(testimport._shard('uid', 1), 0)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
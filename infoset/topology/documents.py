@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Cache of parsed topology YAML files.
+
+Files are parsed again only when their modification time or size
+changes. The libyaml C loader is used when PyYAML was built with it.
+
+"""
+
+# Standard libraries
+import os
+import threading
+from collections import OrderedDict
+
+# PIP libraries
+import yaml
+
+# Use the fastest loader available
+LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Maximum number of parsed files kept in memory
+CACHE_SIZE = 32
+
+# Parsed files keyed by path, with the state of the file when parsed.
+# Shared by the threads of the web server.
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def load(filepath, layer=None):
+    """Get the contents of a topology YAML file.
+
+    The data is shared by all callers and must not be modified.
+
+    Args:
+        filepath: Path of the file
+        layer: Top level key of the data to return, such as "layer1".
+            All the data is returned if None.
+
+    Returns:
+        data: Parsed data
+
+    """
+    # Get the state of the file. Raises OSError if it doesn't exist.
+    status = os.stat(filepath)
+    signature = (status.st_mtime_ns, status.st_size)
+
+    # Use the cached data if the file hasn't changed
+    with _CACHE_LOCK:
+        cached = _CACHE.get(filepath)
+        if (cached is not None) and (cached[0] == signature):
+            _CACHE.move_to_end(filepath)
+            data = cached[1]
+        else:
+            data = None
+
+    # Parse the file
+    if data is None:
+        with open(filepath, 'r') as file_handle:
+            data = yaml.load(file_handle, Loader=LOADER)
+        with _CACHE_LOCK:
+            _CACHE[filepath] = (signature, data)
+            _CACHE.move_to_end(filepath)
+            while len(_CACHE) > CACHE_SIZE:
+                _CACHE.popitem(last=False)
+
+    # Return
+    if layer is not None:
+        data = data[layer]
+    return data
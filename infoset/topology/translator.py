@@ -2,11 +2,11 @@
 """Class for normalizing the data read from YAML files."""
 
 import os
-import yaml
 
 
 # Infoset imports
 from infoset.utils import log
+from infoset.topology import documents
 
 
 class Translator(object):
@@ -113,10 +113,8 @@ class Translator(object):
                 'Try polling devices first.') % (yaml_file, host)
             log.log2die(1017, log_message)
 
-        # Read file
-        with open(yaml_file, 'r') as file_handle:
-            yaml_from_file = file_handle.read()
-        yaml_data = yaml.load(yaml_from_file)
+        # Read file. The data is cached and shared, so it isn't modified.
+        yaml_data = documents.load(yaml_file)
 
         # Create dict for layer1 Ethernet data
         for ifindex, metadata in yaml_data['layer1'].items():
@@ -125,6 +123,9 @@ class Translator(object):
                 if int(ifindex) not in ifindices:
                     continue
 
+            # Add the infoset metadata values to a copy
+            metadata = dict(metadata)
+
             # Process metadata
             if _is_ethernet(metadata) is True:
                 # Get the ifIndex of the lower layer interface
@@ -278,7 +279,7 @@ def _vlan(metadata, ifindex):
     if 'jnxExVlanTag' in metadata['layer1'][ifindex]:
         tags = metadata['layer1'][ifindex]['jnxExVlanTag']
         if bool(tags) is True:
-            vlans = tags
+            vlans = list(tags)
 
     # Return
     return vlans
@@ -80,6 +80,20 @@ class Directory:
         value = ('%s/lock') % self.root
         return value
 
+    def stamp(self):
+        """Method for defining the hidden stamp directory.
+
+        Args:
+            None
+
+        Returns:
+            value: stamp directory
+
+        """
+        # Return
+        value = ('%s/stamp') % self.root
+        return value
+
 
 class File:
     """A class for creating the names of hidden files."""
@@ -157,6 +171,21 @@ class File:
         value = ('%s/%s.lock') % (self.directory.lock(), prefix)
         return value
 
+    def stamp(self, prefix):
+        """Method for defining the hidden stamp directory.
+
+        Args:
+            prefix: Prefix of file
+
+        Returns:
+            value: stamp directory
+
+        """
+        # Return
+        _mkdir(self.directory.stamp())
+        value = ('%s/%s.stamp') % (self.directory.stamp(), prefix)
+        return value
+
 
 class Touch:
     """A class for updating modifed times for hidden files."""
@@ -189,6 +218,23 @@ class Touch:
         filename = self.filez.pid(prefix)
         os.utime(filename, (timestamp, timestamp))
 
+    def stamp(self, prefix):
+        """Method for updating the hidden stamp file.
+
+        The file is created if it doesn't exist.
+
+        Args:
+            prefix: Prefix of file
+
+        Returns:
+            None
+
+        """
+        # Return
+        filename = self.filez.stamp(prefix)
+        with open(filename, 'a'):
+            os.utime(filename, None)
+
 
 def _mkdir(directory):
     """Create a directory if it doesn't already exist.
@@ -3,11 +3,17 @@
 
 import os.path
 import os
+import threading
 
 # Import project libraries
 from infoset.utils import jm_general
 from infoset.utils import log
 
+# Parsed configurations keyed by the tuple of configuration directories.
+# Each is stored with the state of the files it was read from.
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
 
 class Config(object):
     """Class gathers all configuration information.
@@ -34,16 +40,8 @@ class Config(object):
             None
 
         """
-        # Update the configuration directory
-        # 'INFOSET_CONFIGDIR' is used for unittesting
-        if 'INFOSET_CONFIGDIR' in os.environ:
-            config_directory = os.environ['INFOSET_CONFIGDIR']
-        else:
-            config_directory = ('%s/etc') % (jm_general.root_directory())
-        directories = [config_directory]
-
-        # Return
-        self.config_dict = jm_general.read_yaml_files(directories)
+        # Get the configuration, parsed again only if files changed
+        self.config_dict = read_configuration()
 
     def server(self):
         """Get server.
@@ -198,6 +196,45 @@ class Config(object):
         # Return
         return value
 
+    def ingest_spool(self):
+        """Determine whether received agent data is appended to a spool.
+
+        Args:
+            None
+
+        Returns:
+            result: True if the spool is used instead of one file per post
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'ingest_spool'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to False
+        result = bool(result)
+        return result
+
+    def ingest_spool_directory(self):
+        """Determine the ingest_spool_directory.
+
+        Args:
+            None
+
+        Returns:
+            value: Directory in which spool segments are stored
+
+        """
+        # Get parameter
+        value = ('%s/spool') % (self.ingest_cache_directory())
+
+        # Check if value exists
+        if os.path.exists(value) is False:
+            os.makedirs(value, exist_ok=True)
+
+        # Return
+        return value
+
     def db_name(self):
         """Get db_name.
 
@@ -298,6 +335,48 @@ class Config(object):
             result = 20
         return result
 
+    def agent_snmp_requests(self):
+        """Get agent_snmp_requests.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum number of SNMP requests agents polling
+                remote systems concurrently can have in flight
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'agent_snmp_requests'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 500
+        if result is None:
+            result = 500
+        return int(result)
+
+    def agent_snmp_host_requests(self):
+        """Get agent_snmp_host_requests.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum number of SNMP requests agents polling
+                remote systems concurrently can have in flight per host
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'agent_snmp_host_requests'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 2
+        if result is None:
+            result = 2
+        return int(result)
+
     def ingest_threads(self):
         """Get ingest_threads.
 
@@ -318,6 +397,66 @@ class Config(object):
             result = 20
         return result
 
+    def ingest_chunk_size(self):
+        """Get ingest_chunk_size.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum number of rows inserted per SQL statement
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'ingest_chunk_size'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 1000
+        if result is None:
+            result = 1000
+        return int(result)
+
+    def ingest_load_data(self):
+        """Get ingest_load_data.
+
+        Args:
+            None
+
+        Returns:
+            result: True if data is inserted using LOAD DATA LOCAL INFILE
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'ingest_load_data'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to False
+        result = bool(result)
+        return result
+
+    def data_retention(self):
+        """Get data_retention.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of days of performance data to keep. Data is
+                kept forever if zero.
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'data_retention'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 0
+        if result is None:
+            result = 0
+        return int(result)
+
     def log_file(self):
         """Get log_file.
 
@@ -391,16 +530,8 @@ class ConfigAgent(object):
             None
 
         """
-        # Update the configuration directory
-        # 'INFOSET_CONFIGDIR' is used for unittesting
-        if 'INFOSET_CONFIGDIR' in os.environ:
-            config_directory = os.environ['INFOSET_CONFIGDIR']
-        else:
-            config_directory = ('%s/etc') % (jm_general.root_directory())
-        directories = [config_directory]
-
-        # Return
-        self.config_dict = jm_general.read_yaml_files(directories)
+        # Get the configuration, parsed again only if files changed
+        self.config_dict = read_configuration()
         self.name = agent_name
 
     def agent_name(self):
@@ -721,16 +852,8 @@ class ConfigSNMP(object):
         # Initialize key variables
         self.none = None
 
-        # Update the configuration directory
-        # 'INFOSET_CONFIGDIR' is used for unittesting
-        if 'INFOSET_CONFIGDIR' in os.environ:
-            config_directory = os.environ['INFOSET_CONFIGDIR']
-        else:
-            config_directory = ('%s/etc') % (jm_general.root_directory())
-        directories = [config_directory]
-
-        # Return
-        self.config_dict = jm_general.read_yaml_files(directories)
+        # Get the configuration, parsed again only if files changed
+        self.config_dict = read_configuration()
 
     def snmp_auth(self):
         """Get list of dicts of SNMP information in configuration file.
@@ -752,6 +875,7 @@ class ConfigSNMP(object):
         seed_dict['snmp_privprotocol'] = None
         seed_dict['snmp_privpassword'] = None
         seed_dict['snmp_port'] = 161
+        seed_dict['snmp_max_repetitions'] = None
         seed_dict['group_name'] = None
 
         # Read configuration's SNMP information. Return 'None' if none found
@@ -780,6 +904,9 @@ class ConfigSNMP(object):
             # Convert relevant strings to integers
             new_dict['snmp_version'] = int(new_dict['snmp_version'])
             new_dict['snmp_port'] = int(new_dict['snmp_port'])
+            if new_dict['snmp_max_repetitions'] is not None:
+                new_dict['snmp_max_repetitions'] = int(
+                    new_dict['snmp_max_repetitions'])
 
             # Append data to list
             snmp_data.append(new_dict)
@@ -802,6 +929,75 @@ class ConfigSNMP(object):
         return none
 
 
+def read_configuration():
+    """Get the configuration of the configuration directory.
+
+    The YAML files are only read and parsed again if a file was added,
+    removed or changed since they were last read by this process.
+
+    Args:
+        None
+
+    Returns:
+        config_dict: Dict of the configuration
+
+    """
+    # Update the configuration directory
+    # 'INFOSET_CONFIGDIR' is used for unittesting
+    if 'INFOSET_CONFIGDIR' in os.environ:
+        config_directory = os.environ['INFOSET_CONFIGDIR']
+    else:
+        config_directory = ('%s/etc') % (jm_general.root_directory())
+    directories = (config_directory,)
+
+    # Use the cached configuration if the files haven't changed
+    signature = _signature(directories)
+    with _CACHE_LOCK:
+        if directories in _CACHE:
+            (cached_signature, config_dict) = _CACHE[directories]
+            if (signature is not None) and (signature == cached_signature):
+                return config_dict
+
+    # Read the files
+    config_dict = jm_general.read_yaml_files(list(directories))
+    with _CACHE_LOCK:
+        _CACHE[directories] = (signature, config_dict)
+
+    # Return
+    return config_dict
+
+
+def _signature(directories):
+    """Get the state of the YAML files of configuration directories.
+
+    Args:
+        directories: Tuple of configuration directories
+
+    Returns:
+        signature: Tuple of the path, modification time and size of each
+            file. None if a directory can't be read.
+
+    """
+    # Initialize key variables
+    signature = []
+
+    # Get the state of each file
+    try:
+        for directory in directories:
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith('.yaml'):
+                    file_path = ('%s/%s') % (directory, filename)
+                    status = os.stat(file_path)
+                    signature.append(
+                        (file_path, status.st_mtime_ns, status.st_size))
+    except OSError:
+        return None
+
+    # Return
+    signature = tuple(signature)
+    return signature
+
+
 def _key_sub_key(key, sub_key, config_dict, die=True):
     """Get config parameter from YAML.
 
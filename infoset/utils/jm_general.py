@@ -180,6 +180,36 @@ def dict2yaml(data_dict):
     return yaml_string
 
 
+def write_json(filepath, data):
+    """Atomically write data to a JSON file.
+
+    The data is written to a hidden temporary file in the same directory
+    which is then renamed. Readers never see a partially written file.
+
+    Args:
+        filepath: Path of file to create
+        data: Data to write
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    (directory, filename) = os.path.split(filepath)
+    temp_path = os.path.join(
+        directory, ('.%s.%s.tmp') % (filename, os.getpid()))
+
+    # Write data then move it into place
+    try:
+        with open(temp_path, 'w') as f_handle:
+            json.dump(data, f_handle)
+        os.replace(temp_path, filepath)
+    except:
+        if os.path.exists(temp_path) is True:
+            os.remove(temp_path)
+        raise
+
+
 def move_files(source_dir, target_dir):
     """Delete files in a directory.
 
@@ -32,6 +32,7 @@ from infoset.db import db_billtype
 from infoset.db import db_department
 from infoset.db import db_host
 from infoset.db import db_hostagent
+from infoset.db import db_partition
 from infoset.db import db
 from infoset.agents import agent
 
@@ -184,6 +185,10 @@ def server_setup():
         print('Applying Schemas')
         BASE.metadata.create_all(engine)
 
+        # Partition the data table
+        print('Partitioning Data')
+        db_partition.maintain(config, partition=True)
+
         # Insert database entries
         insert_agent_host()
         insert_billtype()
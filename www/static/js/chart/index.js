@@ -11,6 +11,9 @@ function AreaChart(uid, datapoint, target, width, height, fill, title ,yLabel, s
 	*/
 	//Create URL to request data
 	var dataroute = "/fetch/agent/graph/" + uid + "/" + datapoint+ "?start=" + start +"&stop=" + stop;
+
+	//Create URL to request new data. It has no fixed end.
+	var liveroute = "/fetch/agent/graph/" + uid + "/" + datapoint+ "?start=" + start;
 	var graph_width = width;
 	var graph_height = height;
 
@@ -79,34 +82,46 @@ function AreaChart(uid, datapoint, target, width, height, fill, title ,yLabel, s
 		x.domain(d3.extent(data, function(d) { return d.x; }));
 		y.domain([0, d3.max(data, function(d) { return d.y; })]);
 
-		svg.append("path")
+		var path = svg.append("path")
 		  .datum(data)
 		  .attr("class", "area")
 		  .attr("fill", fill)
 		  .attr("d", area);
 
-		svg.append("g")
+		var xGrid = svg.append("g")
 		  .attr("class", "x axis")
 		  .attr("class", "grid")
 		  .attr("transform", "translate(0," + height + ")")
 		  .call(xAxis);
 
 
-		  svg.append("g")
+		  var yGrid = svg.append("g")
 		  .attr("class", "grid")
 		  .call(yAxis);
 
-		svg.append("g")
+		var yGridLabel = svg.append("g")
 		  .attr("class", "y axis")
 		  .attr("class", "grid")
-		  .call(yAxis)
-		.append("text")
+		  .call(yAxis);
+
+		yGridLabel.append("text")
 		  .attr("transform", "rotate(-90)")
 		  .attr("y", 8)
 		  .attr("dy", "-6em")
 		  .attr("dx", "-1.1em")
 		  .style("text-anchor", "end")
 		  .text(yLabel);
+
+		//Append new values as they arrive
+		LiveUpdate(liveroute, data, function(values) {
+			data = values;
+			x.domain(d3.extent(data, function(d) { return d.x; }));
+			y.domain([0, d3.max(data, function(d) { return d.y; })]);
+			path.datum(data).attr("d", area);
+			xGrid.call(xAxis);
+			yGrid.call(yAxis);
+			yGridLabel.call(yAxis);
+		});
     });
 }
 
@@ -201,16 +216,29 @@ function StackedArea(uid, datapoint, target, width, height, colors){
 	      .attr("d", function(d) { return area(d.values); })
 	      .style("fill", function(d, i) { return colors[i]; })
 
-	  svg.append("g")
+	  var xGrid = svg.append("g")
 	      .attr("class", "x axis")
 	      .attr("class", "grid")
 	      .attr("transform", "translate(0," + height + ")")
 	      .call(xAxis);
 
-	  svg.append("g")
+	  var yGrid = svg.append("g")
 	      .attr("class", "y axis")
   	      .attr("class", "grid")
 	      .call(yAxis);
+
+	  //Append new values as they arrive
+	  LiveUpdate(dataroute, data, function(values) {
+	      data = values;
+	      layers = stack(nest.entries(data));
+	      x.domain(d3.extent(data, function(d) { return d.x; }));
+	      y.domain([0, d3.max(data, function(d) { return d.y0 + d.y; })]);
+	      svg.selectAll(".layer")
+	          .data(layers)
+	          .attr("d", function(d) { return area(d.values); });
+	      xGrid.call(xAxis);
+	      yGrid.call(yAxis);
+	  });
 	
 	});
 }
@@ -284,15 +312,89 @@ function MultiLineChart(uid, datapoint, target, width, height, colors){
 		    .attr('fill', 'none');
 	    });
 
-	  svg.append("g")
+	  var xGrid = svg.append("g")
 	      .attr("class", "x axis")
 	      .attr("class", "grid")
 	      .attr("transform", "translate(0," + height + ")")
 	      .call(xAxis);
 
-	  svg.append("g")
+	  var yGrid = svg.append("g")
 	      .attr("class", "y axis")
   	      .attr("class", "grid")
 	      .call(yAxis);
+
+	  //Append new values as they arrive
+	  LiveUpdate(dataroute, data, function(values) {
+	      data = values;
+	      x.domain(d3.extent(data, function(d) { return d.x; }));
+	      y.domain([0, d3.max(data, function(d) { return d.y; })]);
+	      svg.selectAll(".line")
+	          .data(nest.entries(data))
+	          .attr("d", function(d) { return line(d.values); });
+	      xGrid.call(xAxis);
+	      yGrid.call(yAxis);
+	  });
 	});
 }
+
+function LiveUpdate(dataroute, data, redraw){
+	/*
+	Function for appending the newest values to a chart every 5 minutes
+
+    Only values newer than the "since" timestamp are fetched. The
+    server returns them with the timestamp of the newest value it
+    read, which is used for the next request. Values older than the
+    width of the chart are removed.
+
+    Args:
+        dataroute: URL of the chart's data
+        data: List of the chart's values
+        redraw: Function called with the updated list of values
+
+    Returns:
+        None
+	*/
+	var period = 300000;
+	var separator = (dataroute.indexOf("?") < 0) ? "?" : "&";
+	var width = 0;
+	var since = 0;
+
+	//Nothing to update
+	if (data.length === 0) {
+		return;
+	}
+
+	//Start with the newest values the chart has. The newest values may
+	//be zeros standing in for data that hadn't arrived yet, so these
+	//are fetched again.
+	var newest = d3.max(data, function(d) { return d.x; });
+	width = newest - d3.min(data, function(d) { return d.x; });
+	since = (newest.getTime() / 1000) - 900;
+
+	function update() {
+		d3.json(dataroute + separator + "since=" + since, function(error, result) {
+			if (!error && result.data.length > 0) {
+				//Replace values the chart has with the new ones
+				result.data.forEach(function(d) { d.x = new Date(d.x * 1000); });
+				var first = d3.min(result.data, function(d) { return d.x; });
+				data = data.filter(function(d) { return d.x < first; }).concat(result.data);
+
+				//Keep the width of the chart
+				newest = d3.max(data, function(d) { return d.x; });
+				data = data.filter(function(d) { return newest - d.x <= width; });
+				redraw(data);
+			}
+
+			//Use the newest value read by the server for the next request
+			if (!error) {
+				for (var idx in result.state) {
+					if (result.state[idx] !== null) {
+						since = Math.max(since, result.state[idx][0]);
+					}
+				}
+			}
+			setTimeout(update, period);
+		});
+	}
+	setTimeout(update, period);
+}
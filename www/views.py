@@ -5,20 +5,21 @@ Contains all routes that infoset's Flask webserver uses
 """
 # Standard imports
 from datetime import datetime
+from collections import OrderedDict
 import time
-import json
 import operator
+import threading
 from os import path
 from os import walk
 
 # Pip imports
-import yaml
-from flask import render_template, jsonify, request
+from flask import render_template, jsonify, request, abort
 
 # Infoset imports
 from infoset.utils import Config
 from infoset.db.db_agent import GetUID
 from infoset.db.db_data import GetIDX
+from infoset.db.db_data import GetIDXs
 from infoset.db.db_agent import GetDataPoint
 from infoset.db.db_orm import Agent
 from infoset.db import db_hostagent
@@ -28,12 +29,25 @@ from infoset.charts import TimeStamp
 from infoset.charts import ColorWheel
 from infoset.utils import jm_general
 from infoset.metadata import language
+from infoset.db import db_data
 from infoset.db import db_datapoint
 from infoset.db import db_agent
-from infoset.db import db_host
 from infoset.topology import pages
+from infoset.topology import documents
+from infoset.cache import spool
 from www import infoset
 
+# Number of fetch responses kept in memory
+RESPONSE_CACHE_SIZE = 256
+
+# Number of points a chart gets if it doesn't ask for a number. Summary
+# tables are read for ranges that have many more values than this.
+CHART_POINTS = 500
+
+# Fetch responses keyed by ETag. Shared by the threads of the server.
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
 
 @infoset.template_filter('strftime')
 def _jinja2_filter_datetime(timestamp):
@@ -138,28 +152,12 @@ def search():
     # Initialize key variables
     data = []
 
-    # Get list of all host indices
-    host_idx_list = db_hostagent.all_host_indices()
-
-    for idx_host in host_idx_list:
-        # Get names for host
-        hostname = db_host.GetIDX(idx_host).hostname()
-
-        # Create list of enabled agents
-        all_agent_indices = db_hostagent.agent_indices(idx_host)
-        enabled_agent_idx_list = []
-        for idx_agent in all_agent_indices:
-            enabled = db_agent.GetIDX(idx_agent).enabled()
-            if enabled is True:
-                enabled_agent_idx_list.append(idx_agent)
-
-        # Append agent data to list
-        for idx_agent in enabled_agent_idx_list:
-            agent_name = db_agent.GetIDX(idx_agent).name()
-            # Append to data
-            data.append(
-                (hostname, idx_host, agent_name, idx_agent)
-            )
+    # Get all the hosts with enabled agents at once
+    for host_agent in db_hostagent.host_agents(enabled=True):
+        data.append(
+            (host_agent['hostname'], host_agent['idx_host'],
+             host_agent['agent_name'], host_agent['idx_agent'])
+        )
 
     # Render data on screen
     return render_template('search.html', agent_list=data)
@@ -180,12 +178,13 @@ def search_host(idx_host, idx_agent):
     # Initialize key variables
     data = []
 
-    # Get Hostname
-    hostname = db_host.GetIDX(idx_host).hostname()
-
-    # Get agent details
-    agent_name = db_agent.GetIDX(idx_agent).name()
-    uid = db_agent.GetIDX(idx_agent).uid()
+    # Get hostname and agent details at once
+    host_agent = db_hostagent.host_agent(idx_host, idx_agent)
+    if host_agent is None:
+        abort(404)
+    hostname = host_agent['hostname']
+    agent_name = host_agent['agent_name']
+    uid = host_agent['uid']
 
     # Get a description of the datapoint
     lang = language.Agent(agent_name)
@@ -256,14 +255,7 @@ def host(host):
         JSON response of different layers of specified host
 
     """
-    filename = host + ".yaml"
-    filepath = path.join("./www/static/yaml/", filename)
-    yaml_dump = {}
-    with open(filepath, 'r') as stream:
-        try:
-            yaml_dump = yaml.load(stream)
-        except Exception as error:
-            raise error
+    yaml_dump = _host_yaml(host)
     return jsonify(yaml_dump)
 
 
@@ -278,17 +270,7 @@ def layerOne(host):
         JSON response of layer1 of the OSI model of the specified host
 
     """
-    filename = host + ".yaml"
-    filepath = path.join("./www/static/yaml/", filename)
-    yaml_dump = {}
-
-    with open(filepath, 'r') as stream:
-        try:
-            yaml_dump = yaml.load(stream)
-        except Exception as error:
-            raise error
-
-    layer1 = yaml_dump['layer1']
+    layer1 = _host_yaml(host, layer='layer1')
     return jsonify(layer1)
 
 
@@ -303,18 +285,8 @@ def layerTwo(host):
         JSON response of layer2 of the OSI model of the specified host
 
     """
-    filename = host + ".yaml"
-    filepath = path.join("./www/static/yaml/", filename)
-    yaml_dump = {}
-
-    with open(filepath, 'r') as stream:
-        try:
-            yaml_dump = yaml.load(stream)
-        except Exception as error:
-            raise error
-
     # Gets layer2 from loaded yaml
-    layer2 = yaml_dump['layer2']
+    layer2 = _host_yaml(host, layer='layer2')
 
     return jsonify(layer2)
 
@@ -372,6 +344,13 @@ def receive(uid):
 
     # Get Json from incoming agent POST
     data = request.json
+
+    # Append the data to the spool if configured
+    if config.ingest_spool() is True:
+        records = spool.Spool(config.ingest_spool_directory())
+        records.append(data)
+        return "Received"
+
     timestamp = data['timestamp']
     uid = data['uid']
     hostname = data['hostname']
@@ -380,9 +359,8 @@ def receive(uid):
     host_hash = jm_general.hashstring(hostname, sha=1)
     json_path = ('%s/%s_%s_%s.json') % (cache_dir, timestamp, uid, host_hash)
 
-    with open(json_path, "w+") as temp_file:
-        json.dump(data, temp_file)
-        temp_file.close()
+    # Write the file atomically so the ingester never reads partial data
+    jm_general.write_json(json_path, data)
 
     return "Received"
 
@@ -419,11 +397,11 @@ def fetch_dp(uid, datapoint):
 
     """
     # TODO implement start and stop times
-    data = GetIDX(datapoint)
-    data_values = data.everything()
+    window = db_data.time_range(None, None)
 
     # Return
-    return jsonify(data_values)
+    return _fetch_response(
+        [datapoint], window, lambda: GetIDX(datapoint).everything())
 
 
 @infoset.route('/fetch/agent/graph/<uid>/<datapoint>', methods=["GET", "POST"])
@@ -441,13 +419,26 @@ def fetch_graph(uid, datapoint):
     # Getting start and stop parameters from url
     start = request.args.get('start')
     stop = request.args.get('stop')
+    since = request.args.get('since')
+
+    # Get only the values the client doesn't have
+    window = db_data.time_range(start, stop)
+    if since is not None:
+        return _fetch_response(
+            [datapoint], (window, since),
+            lambda: _since_values(GetIDX(
+                datapoint, start=start, stop=stop, since=since),
+                                  idx=datapoint))
 
     # Get data as dict
-    datapointer = GetIDX(datapoint, start=start, stop=stop)
-    data = datapointer.chart_everything()
+    points = _chart_points(*window)
 
     # Return
-    return jsonify(data)
+    return _fetch_response(
+        [datapoint], (window, points),
+        lambda: GetIDX(
+            datapoint, start=start, stop=stop,
+            points=points).chart_everything(points=points))
 
 
 @infoset.route(
@@ -527,13 +518,22 @@ def fetch_graph_stacked(uid, stack_type):
         # Do disk
         pass
 
-    values = []
-    for datapoint in datapoint_list:
-        get_idx = GetIDX(datapoint)
-        data = get_idx.chart_everything()
-        values.extend(data)
+    # Get only the values the client doesn't have
+    window = db_data.time_range(None, None)
+    since = request.args.get('since')
+    if since is not None:
+        return _fetch_response(
+            datapoint_list, (window, since),
+            lambda: _since_values(GetIDXs(datapoint_list, since=since)))
 
-    return jsonify(values)
+    # Get the data of all the datapoints at once
+    points = _chart_points(*window)
+
+    # Return
+    return _fetch_response(
+        datapoint_list, (window, points),
+        lambda: GetIDXs(
+            datapoint_list, points=points).chart_everything(points=points))
 
 
 @infoset.route('/fetch/agent/<ip_address>/table', methods=["GET"])
@@ -554,6 +554,118 @@ def fetch_table(ip_address):
     return html
 
 
+def _fetch_response(idx_list, window, function):
+    """Create a JSON response of datapoint data for conditional GETs.
+
+    The ETag of the response changes when the window changes or new data
+    arrives for any of the datapoints. Clients with the current ETag get
+    a "304 Not Modified" response. Other responses are cached.
+
+    Args:
+        idx_list: List of datapoint idx values of the response
+        window: Tuple of the request parameters used to get the data
+        function: Function returning the data of the response
+
+    Returns:
+        response: Flask response
+
+    """
+    # Create the ETag
+    timestamps = db_datapoint.last_timestamps(idx_list)
+    key = (request.path, window, sorted(timestamps.items()))
+    etag = jm_general.hashstring(repr(key))
+
+    # Get the response data
+    if request.if_none_match.contains(etag) is True:
+        response = infoset.response_class(status=304)
+    else:
+        with _RESPONSE_CACHE_LOCK:
+            body = _RESPONSE_CACHE.get(etag)
+            if body is not None:
+                _RESPONSE_CACHE.move_to_end(etag)
+
+        # Create the data and cache it
+        if body is None:
+            body = jsonify(function()).get_data()
+            with _RESPONSE_CACHE_LOCK:
+                _RESPONSE_CACHE[etag] = body
+                while len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+                    _RESPONSE_CACHE.popitem(last=False)
+
+        response = infoset.response_class(
+            body, mimetype='application/json')
+
+    # Clients must check whether the data has changed before reusing it.
+    # There is no Last-Modified header, as the window of the data can
+    # move while no new data arrives. Only the ETag includes it.
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+
+    # Return
+    response = response.make_conditional(request)
+    return response
+
+
+def _since_values(datapointer, idx=None):
+    """Get the chart values of a request for values "since" a timestamp.
+
+    Args:
+        datapointer: db_data.GetIDX or db_data.GetIDXs object
+        idx: Datapoint idx of a db_data.GetIDX object
+
+    Returns:
+        values: Dict of the new chart values, and of the timestamp and
+            value of the latest data read for each datapoint. Clients
+            use the newest timestamp as "since" in their next request.
+
+    """
+    # Get the state of each datapoint
+    if idx is None:
+        state = datapointer.state()
+    else:
+        state = {idx: datapointer.state()}
+
+    # Return
+    values = {'data': datapointer.chart_everything(), 'state': state}
+    return values
+
+
+def _chart_points(ts_start, ts_stop):
+    """Get the maximum number of points a chart request wants.
+
+    Uses the "points" URL parameter, or the "resolution" parameter,
+    which is the number of seconds per point. Charts that use neither
+    get CHART_POINTS points.
+
+    Args:
+        ts_start: Starting timestamp of the chart
+        ts_stop: Ending timestamp of the chart
+
+    Returns:
+        points: Number of points
+
+    """
+    # Initialize key variables
+    points = CHART_POINTS
+
+    # Get parameters
+    try:
+        if request.args.get('points') is not None:
+            points = int(request.args.get('points'))
+        elif request.args.get('resolution') is not None:
+            resolution = int(request.args.get('resolution'))
+            points = ((ts_stop - ts_start) // resolution) + 1
+    except (ValueError, ZeroDivisionError):
+        points = CHART_POINTS
+
+    # Ignore bad values
+    if points < 1:
+        points = CHART_POINTS
+
+    # Return
+    return points
+
+
 def _datapoint_labels(idx_host, idx_agent, labels):
     """Get datapoint IDXes for a host / agent with specific labels.
 
@@ -596,6 +708,31 @@ def _infoset_hostname():
     host = host_object.hostname()
     return host
 
+
+def _host_yaml(host, layer=None):
+    """Get the contents of the topology YAML file of a host.
+
+    Args:
+        host: IP address of a local host
+        layer: Top level key of the data to return. All the data is
+            returned if None.
+
+    Returns:
+        yaml_dump: Parsed data
+
+    """
+    # Get the parsed file
+    filename = host + ".yaml"
+    filepath = path.join("./www/static/yaml/", filename)
+    try:
+        yaml_dump = documents.load(filepath, layer=layer)
+    except (OSError, KeyError):
+        abort(404)
+
+    # Return
+    return yaml_dump
+
+
 def _get_yaml_hosts():
     """Get hosts listed in toplogy YAML files.
 